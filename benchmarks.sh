@@ -54,3 +54,9 @@ time python -O examples/$name/client.py -c 100 -r 10000 > /dev/null
 disown -r
 kill $sid
 echo 'done '${name}', clients: 100, request/client: 10000'
+
+echo
+name='footprint'
+echo 'checking '${name}', connections: 10000'
+python -O examples/$name/main.py -n 10000 | grep -v '|'
+echo 'done '${name}', connections: 10000'
@@ -1,9 +1,10 @@
 import pymaid
+from pymaid.net.datagram import Datagram
 
 from examples.template import get_client_parser, parse_args
 
 
-class Echo(pymaid.net.datagram.Datagram):
+class Echo(Datagram):
 
     def init(self):
         self.nbytes = 0
@@ -14,39 +15,29 @@ class Echo(pymaid.net.datagram.Datagram):
         self.receive_event.set()
 
     def error_received(self, exc):
-        self.transport.close()
+        self.close(exc)
 
 
-async def wrapper(loop, address, count):
-    if isinstance(address, str):
-        raise ValueError(
-            'does not support unix domain socket with datagram'
-        )
-        # transport, protocol = await pymaid.create_unix_datagram(Echo, addres)
-    else:
-        transport, protocol = await pymaid.create_datagram(Echo, address)
+async def wrapper(address, count):
+    transport = await pymaid.net.dial_datagram(address, transport_class=Echo)
 
-    write = transport.sendto
     req = b'a' * args.msize
-    receive_event = protocol.receive_event = pymaid.Event()
+    receive_event = transport.receive_event
     for x in range(count):
-        write(req)
+        transport.sendto(req)
         await receive_event.wait()
         receive_event.clear()
     transport.close()
-    assert protocol.nbytes == count * args.msize, \
-        (protocol.nbytes, count * args.msize)
+    assert transport.nbytes == count * args.msize, \
+        (transport.nbytes, count * args.msize)
 
 
 async def main():
     global args
     args = parse_args(get_client_parser())
-    loop = pymaid.get_event_loop()
     tasks = []
     for x in range(args.concurrency):
-        tasks.append(pymaid.create_task(
-            wrapper(loop, args.address, args.request)
-        ))
+        tasks.append(pymaid.create_task(wrapper(args.address, args.request)))
 
     await pymaid.gather(*tasks)
 
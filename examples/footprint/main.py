@@ -0,0 +1,57 @@
+'''Report memory used by idle rpc connections.
+
+    python examples/footprint/main.py -n 10000
+'''
+import gc
+import socket
+import tracemalloc
+
+from argparse import ArgumentParser
+
+import pymaid
+
+from pymaid.rpc.pb import serve_stream
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '-n', dest='count', type=int, default=10000, help='connections',
+    )
+    args = parser.parse_args()
+
+    ch = await serve_stream(
+        'unix:///tmp/pymaid_footprint.sock', services=[],
+    )
+    # sockets are created before measuring, only count pymaid objects
+    pairs = [socket.socketpair() for _ in range(args.count)]
+    for sock, _ in pairs:
+        sock.setblocking(False)
+    # warm up, e.g. caches and freelists
+    ch.connection_made(socket.socketpair()[0])
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for sock, _ in pairs:
+        ch.connection_made(sock)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    total = sum(stat.size_diff for stat in stats)
+    print(f'connections: {args.count}')
+    print(f'bytes per idle connection: {total / args.count:.1f}')
+    for stat in stats[:5]:
+        print(f'    {stat}')
+
+    ch.close()
+    for conn in list(ch.transports.values()):
+        conn.close()
+    for _, peer in pairs:
+        peer.close()
+
+
+if __name__ == "__main__":
+    pymaid.run(main())
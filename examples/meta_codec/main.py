@@ -0,0 +1,53 @@
+'''Compare the protobuf meta codec with the fast one.
+
+    python examples/meta_codec/main.py -n 100000
+'''
+from argparse import ArgumentParser
+from timeit import timeit
+
+from pymaid.rpc.pb.protocol import FastProtocol, Protocol
+from pymaid.rpc.pb.pymaid_pb2 import Context as Meta, Void
+
+FIELDS = {
+    'transmission_id': 1000,
+    'service_method': 'pymaid.EchoService.UnaryUnaryEcho',
+    'packet_type': Meta.REQUEST,
+    'packet_flags': Meta.PacketFlag.END,
+}
+
+
+def encode(protocol, number):
+    meta_class, message = protocol.META_CLASS, Void()
+    encode_parts = protocol.encode_parts
+
+    def run():
+        # created per packet, the same as contexts do
+        encode_parts(meta_class(**FIELDS), message)
+    return timeit(run, number=number)
+
+
+def decode(protocol, number):
+    data = memoryview(Protocol.encode(Meta(**FIELDS), Void()) * 16)
+    feed_data = protocol.feed_data
+    return timeit(lambda: feed_data(data), number=number // 16)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '-n', dest='number', type=int, default=100000, help='packets',
+    )
+    args = parser.parse_args()
+
+    for name, bench in (('encode', encode), ('decode', decode)):
+        base = bench(Protocol, args.number)
+        fast = bench(FastProtocol, args.number)
+        print(
+            f'{name}: protobuf {base / args.number * 1e6:.2f}us, '
+            f'fast {fast / args.number * 1e6:.2f}us, '
+            f'speedup {base / fast:.2f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import importlib
 import json
+import os
 import re
 import sys
 import tempfile
@@ -11,6 +12,8 @@ from psutil import Process, NoSuchProcess
 from pymaid.conf import settings
 from pymaid.core import run, run_in_processpool, gather
 from pymaid.core import CancelledError, ProcessPoolExecutor
+from pymaid.net.prefork import PreforkMaster, handoff_key
+from pymaid.net.utils.uri import parse_uri
 from pymaid.utils.daemon import daemonize, list_worker
 from pymaid.utils.logger import get_logger
 
@@ -36,7 +39,20 @@ def entry_run(args):
     if args.parallel < 1:
         print(f'-p/--parallel should be positive, got {args.parallel}')
         exit(1)
-    if args.parallel > 1:
+    if args.master:
+        if args.daemon:
+            print('-d/--daemon does not support --master')
+            exit(1)
+        # workers get the connections from the master, inherited by fork
+        settings.pymaid.update({
+            'PREFORK_HANDOFF_PATH': (
+                f'{tempfile.gettempdir()}/pymaid-{os.getpid()}.handoff'
+            ),
+            'PREFORK_ADDRESSES': [
+                handoff_key(parse_uri(address)) for address in args.master
+            ],
+        })
+    elif args.parallel > 1:
         # enabled REUSE_PORT for parallel workers
         settings.pymaid.update({'REUSE_PORT': True})
 
@@ -49,10 +65,17 @@ def entry_run(args):
             name=args.name or args.main,
             count=args.parallel,
         )
-    elif args.parallel == 1:
+    elif args.parallel == 1 and not args.master:
         run(main_not_call(*args.args, **args.kwargs))
     else:
         async def wrapper():
+            master = None
+            if args.master:
+                # workers connect to the master once forked
+                master = PreforkMaster(
+                    args.master, settings.pymaid.PREFORK_HANDOFF_PATH,
+                )
+                await master.start()
             executor = ProcessPoolExecutor(args.parallel)
             results = [
                 run_in_processpool(
@@ -67,6 +90,9 @@ def entry_run(args):
                 await gather(*results, return_exceptions=False)
             except (SystemExit, KeyboardInterrupt, CancelledError):
                 pass
+            finally:
+                if master is not None:
+                    master.close()
         run(wrapper())
 
 
@@ -143,6 +169,17 @@ parser_run.add_argument(
     default=1,
     help='run entry parallelly',
 )
+parser_run.add_argument(
+    '--master',
+    type=str,
+    action='append',
+    metavar='ADDRESS',
+    help=(
+        'listen on ADDRESS in a master process, and hand off the accepted '
+        'connections to the least loaded worker instead of SO_REUSEPORT; '
+        'workers serve ADDRESS as usual, can be repeated'
+    ),
+)
 parser_run.add_argument(
     '--args',
     type=json.loads,
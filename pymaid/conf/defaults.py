@@ -41,6 +41,7 @@ LOGGING = {
 # connections.
 # Default is 64. Note, that in case of multiple working processes on the
 # same listening value, it should be set to a lower value.
+# The budget is shared by all the listeners of a channel.
 MAX_ACCEPT = 64
 MAX_TASKS = 32
 
@@ -59,6 +60,104 @@ MAX_CONNECTIONS = 10000
 MAX_CONCURRENCY = 10000
 MAX_METHOD_CONCURRENCY = 10000
 
+#
+# Read side flow control.
+# Connection stops reading from socket when its handler has more than
+# PENDING_TASKS_HIGH_WATER pending tasks, unless some contexts are waiting
+# for its messages, or all its living contexts are inbound ones with more
+# than REQUEST_QUEUE_HIGH_WATER queued requests; and resumes reading after
+# they drop to the *_LOW_WATER marks.
+#
+PENDING_TASKS_HIGH_WATER = 1024
+PENDING_TASKS_LOW_WATER = 256
+REQUEST_QUEUE_HIGH_WATER = 64
+REQUEST_QUEUE_LOW_WATER = 16
+
+#
+# DNS cache of `pymaid.net.raw.getaddrinfo`, in seconds.
+# Concurrent lookups of the same address share one resolution, results are
+# cached for DNS_CACHE_TTL seconds, and failures for DNS_CACHE_NEGATIVE_TTL
+# seconds, 0 disables the caching.
+#
+DNS_CACHE_TTL = 30
+DNS_CACHE_NEGATIVE_TTL = 5
+DNS_CACHE_MAXSIZE = 1024
+
+# Happy Eyeballs (RFC 8305) connection attempt delay of `sock_connect`,
+# in seconds, 0 disables racing and tries the addresses one by one.
+HAPPY_EYEBALLS_DELAY = 0.25
+
+#
+# Admission control of stream channels.
+# New connections are shed (accepted and closed at once) when the event loop
+# lags more than ADMISSION_MAX_LOOP_LAG seconds, or all the handlers have
+# more than ADMISSION_MAX_PENDING_TASKS pending tasks in total, 0 disables the
+# check. The loop lag is measured every LOOP_LAG_PROBE_INTERVAL seconds, its
+# histogram covers the samples of the last one to two LOOP_LAG_WINDOW seconds.
+#
+ADMISSION_MAX_LOOP_LAG = 0
+ADMISSION_MAX_PENDING_TASKS = 0
+LOOP_LAG_PROBE_INTERVAL = 0.1
+LOOP_LAG_WINDOW = 60
+
+# Stream channels stop accepting when the loop lag exceeds
+# LOOP_LAG_PAUSE_THRESHOLD seconds, and start again once it drops below
+# LOOP_LAG_RESUME_THRESHOLD seconds (half of the pause threshold if 0).
+# 0 disables pausing.
+LOOP_LAG_PAUSE_THRESHOLD = 0
+LOOP_LAG_RESUME_THRESHOLD = 0
+
+#
+# Pre-fork master, set by `pymaid worker run --master`.
+# Stream channels serving one of the PREFORK_ADDRESSES get the connections
+# accepted by the master through the unix socket at PREFORK_HANDOFF_PATH,
+# instead of listening by themselves.
+#
+PREFORK_HANDOFF_PATH = ''
+PREFORK_ADDRESSES = []
+
+#
+# Hashed timing wheel for connection-scale timers, i.e. heartbeats, context
+# timeouts and `pymaid.utils.timeout`, instead of the loop timers.
+# Timers run up to TIMING_WHEEL_TICK seconds late, the wheel covers
+# TIMING_WHEEL_TICK * TIMING_WHEEL_SLOTS ** TIMING_WHEEL_LEVELS seconds,
+# longer timers are rescheduled on the way.
+#
+TIMING_WHEEL = False
+TIMING_WHEEL_TICK = 0.1
+TIMING_WHEEL_SLOTS = 64
+TIMING_WHEEL_LEVELS = 4
+
+#
+# Framing v2 of pb rpc, with 32-bit lengths, negotiated per connection: the
+# packets advertise it, and once the peer does, v2 packets are sent.
+# Messages larger than PB_CHUNK_SIZE bytes are sent in chunks, interleaved
+# with the packets of the other contexts, and reassembled by the peer, which
+# holds PB_MAX_REASSEMBLY_SIZE bytes of partial messages per connection at
+# most. PB_CHUNK_SIZE should not exceed MAX_CHUNK_LENGTH of the protocol.
+# Off by default, the packets are the same as before unless enabled, and the
+# peers without it, or with it disabled, are always sent v1 packets, so it
+# can be enabled one side at a time.
+#
+PB_FRAMING_V2 = False
+PB_CHUNK_SIZE = 64 * 1024
+PB_MAX_REASSEMBLY_SIZE = 64 * 1024 * 1024
+
+#
+# Payload compression of pb rpc, see `pymaid.rpc.pb.compression`.
+# PB_COMPRESSION advertises accepting compressed payloads, and the payloads
+# of the methods in PB_COMPRESSION_METHODS, {method full name: codec name},
+# are compressed for the peers advertising it, if PB_COMPRESSION_THRESHOLD
+# bytes or larger. Payloads of PB_COMPRESSION_OFFLOAD_SIZE bytes or larger
+# are compressed in the thread pool. Decompressed payloads are limited to
+# PB_MAX_REASSEMBLY_SIZE bytes. Off by default, as PB_FRAMING_V2, only the
+# peers advertising it are sent compressed payloads.
+#
+PB_COMPRESSION = False
+PB_COMPRESSION_METHODS = {}
+PB_COMPRESSION_THRESHOLD = 1024
+PB_COMPRESSION_OFFLOAD_SIZE = 256 * 1024
+
 # connection/socket related settings
 PM_WEBSOCKET_TIMEOUT = 15
 MAX_BODY_SIZE = 10 * 1024 * 1024
@@ -26,6 +26,7 @@ __all__ = (
     'all_tasks',
     'wait_for',
     'wait',
+    'FIRST_COMPLETED',
     'gather',
     'Task',
     'TimeoutError',
@@ -109,6 +110,7 @@ all_tasks = asyncio.all_tasks
 
 wait_for = asyncio.wait_for
 wait = asyncio.wait
+FIRST_COMPLETED = asyncio.FIRST_COMPLETED
 gather = asyncio.gather
 shield = asyncio.shield
 
@@ -130,6 +130,9 @@ class ErrorManager(metaclass=abc.ABCMeta):
     @classmethod
     def assemble(cls, code, message, data):
         ex = ErrorManager.get_exception(code)
+        if ex is None:
+            # added once, the same unknown code can be received again
+            ex = ErrorManager.get_exception('Unknown_%s' % code)
         if ex is None:
             ex = ErrorManager.add_warning('Unknown_%s' % code, message)
         ex = ex()
@@ -3,6 +3,7 @@ import abc
 from queue import deque
 from typing import Callable, Coroutine, List, Optional, Union
 
+from pymaid.conf import settings
 from pymaid.core import create_task, current_task, Event, Task
 from pymaid.core import get_running_loop, iscoroutine, iscoroutinefunction
 from pymaid.error import BaseEx
@@ -11,7 +12,18 @@ from pymaid.utils.logger import logger_wrapper
 
 
 class Handler(abc.ABC):
-    '''Handle the *received* tasks.'''
+    '''Handle the *received* tasks.
+
+    When pending tasks reach `high_water`, `on_pause` callbacks are called,
+    and `on_resume` callbacks are called after they drop to `low_water`,
+    producers can use them to stop feeding tasks.
+
+    The running task is started on the first :meth:`submit`, so idle
+    handlers do not hold a task.
+    '''
+
+    # pending tasks of all handlers, e.g. for admission control
+    total_pending_tasks = 0
 
     def __init__(
         self,
@@ -19,11 +31,28 @@ class Handler(abc.ABC):
         on_close: Optional[List[Callable[['Handler'], None]]] = None,
         error_handler: Optional[Callable[[Task], Coroutine]] = None,
         close_on_exception: bool = False,
+        high_water: Optional[int] = None,
+        low_water: Optional[int] = None,
     ):
         self.task = None
         self.on_close = on_close or []
+        self.on_pause = []
+        self.on_resume = []
         self.close_on_exception = close_on_exception
 
+        if high_water is None:
+            high_water = settings.pymaid.PENDING_TASKS_HIGH_WATER
+        if low_water is None:
+            low_water = settings.pymaid.PENDING_TASKS_LOW_WATER
+        if not 0 <= low_water <= high_water:
+            raise ValueError(
+                f'high_water ({high_water!r}) must be >= '
+                f'low_water ({low_water!r}) must be >= 0'
+            )
+        self.high_water = high_water
+        self.low_water = low_water
+        self.is_paused = False
+
         if error_handler:
             if not iscoroutinefunction(error_handler):
                 raise ValueError('required error_handler as coroutinefunction')
@@ -31,12 +60,27 @@ class Handler(abc.ABC):
         else:
             self.error_handler = self.handle_error
 
-        self.pending_tasks = deque()
-        self.new_task_received = Event()
-        self.closed_event = Event()
+        self.pending_tasks = None
+        self.new_task_received = None
+        self._closed_event = None
         self.is_closing = False
         self.is_closed = False
 
+    @property
+    def closed_event(self) -> Event:
+        if self._closed_event is None:
+            self._closed_event = Event()
+            if self.is_closed:
+                self._closed_event.set()
+        return self._closed_event
+
+    def start(self):
+        '''Start the running task, called by :meth:`submit` if needed.'''
+        if self.pending_tasks is None:
+            self.pending_tasks = deque()
+        if self.task is not None or self.is_closed:
+            return
+        self.new_task_received = Event()
         self.task = create_task(self.run())
 
     @abc.abstractmethod
@@ -48,6 +92,10 @@ class Handler(abc.ABC):
             return
         self.logger.debug(f'{self!r} shutdown with reason={reason!r}')
         self.is_closing = True
+        if self.task is None:
+            # nothing submitted yet
+            self.close(reason)
+            return
         self.pending_tasks.append(None)
         self.new_task_received.set()
 
@@ -56,6 +104,8 @@ class Handler(abc.ABC):
             raise RuntimeError('cannot join self')
         if not self.is_closing:
             raise RuntimeError('cannot join, call shutdown first')
+        if self.is_closed:
+            return
         await self.closed_event.wait()
 
     def close(self, reason: Optional[Union[str, Exception]] = None):
@@ -63,22 +113,49 @@ class Handler(abc.ABC):
             return
         self.logger.info(f'{self!r} close with reason={reason!r}')
         self.is_closed = True
-        for task in self.pending_tasks:
-            if iscoroutine(task):
-                task.close()
-        self.pending_tasks.clear()
+        if self.pending_tasks:
+            for task in self.pending_tasks:
+                if task is not None:
+                    Handler.total_pending_tasks -= 1
+                if iscoroutine(task):
+                    task.close()
+            self.pending_tasks.clear()
 
         for cb in self.on_close:
             cb(self)
-        self.closed_event.set()
-        if not self.task.done():
+        if self._closed_event is not None:
+            self._closed_event.set()
+        if self.task is not None and not self.task.done():
             self.task.cancel()
         self.task = None
 
     def submit(self, task: Callable, *args, **kwargs):
         # self.logger.debug(f'{self!r} get task={task}')
+        if self.is_closed:
+            # never run, and never counted as pending
+            self.logger.debug(f'{self!r} is closed, dropped task={task}')
+            if iscoroutine(task):
+                task.close()
+            return
+        if self.task is None:
+            self.start()
         self.pending_tasks.append((task, args, kwargs))
-        self.new_task_received.set()
+        Handler.total_pending_tasks += 1
+        if self.new_task_received is not None:
+            self.new_task_received.set()
+        if not self.is_paused and len(self.pending_tasks) >= self.high_water:
+            self.is_paused = True
+            self.logger.debug(f'{self!r} reached high water, pause')
+            for cb in self.on_pause:
+                cb(self)
+
+    def check_low_water(self):
+        '''Call on_resume callbacks if paused and drained to low water.'''
+        if self.is_paused and len(self.pending_tasks) <= self.low_water:
+            self.is_paused = False
+            self.logger.debug(f'{self!r} drained to low water, resume')
+            for cb in self.on_resume:
+                cb(self)
 
     async def handle_error(self, error: Exception):
         '''Default error handler.
@@ -97,7 +174,8 @@ class Handler(abc.ABC):
     def __repr__(self):
         return (
             f'<{self.__class__.__name__} '
-            f'pending={len(self.pending_tasks)} '
+            f'pending={len(self.pending_tasks or ())} '
+            f'paused={self.is_paused} '
             f'close_on_exception={self.close_on_exception}'
             f'>'
         )
@@ -126,6 +204,8 @@ class SerialHandler(Handler):
                 if not task:
                     running = False
                     break
+                Handler.total_pending_tasks -= 1
+                self.check_low_water()
 
                 task, args, kwargs = task
                 try:
@@ -158,12 +238,16 @@ class ParallelHandler(Handler):
         on_close: Optional[List[Callable[['Handler'], None]]] = None,
         error_handler: Optional[Callable[[Task], Coroutine]] = None,
         close_on_exception: bool = False,
+        high_water: Optional[int] = None,
+        low_water: Optional[int] = None,
         concurrency: int = 5,
     ):
         super().__init__(
             on_close=on_close,
             error_handler=error_handler,
             close_on_exception=close_on_exception,
+            high_water=high_water,
+            low_water=low_water,
         )
         self.worker = AioPool(concurrency)
         self.got_exception = False
@@ -210,6 +294,8 @@ class ParallelHandler(Handler):
                 if not task:
                     running = False
                     break
+                Handler.total_pending_tasks -= 1
+                self.check_low_water()
 
                 task, args, kwargs = task
                 try:
@@ -1,5 +1,5 @@
 from collections import defaultdict
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 
 class BaseMiddleware:
@@ -24,6 +24,25 @@ class BaseMiddleware:
         pass
 
 
+class RegistryMiddleware(BaseMiddleware):
+    '''Tag the connections in the registry of the channel once made.
+
+    `tag` is called with the registry and the new connection, e.g.::
+
+        RegistryMiddleware(
+            lambda registry, conn: registry.add(conn, 'peer', conn.peername)
+        )
+
+    The tags are removed by the channel once the connection is lost.
+    '''
+
+    def __init__(self, tag: Callable[..., None]):
+        self.tag = tag
+
+    def on_connection_made(self, channel, transport):
+        self.tag(channel.registry, transport)
+
+
 class MiddlewareManager:
 
     def __init__(self, middlewares: Optional[List[BaseMiddleware]] = None):
@@ -5,3 +5,4 @@ MonitorError = ErrorManager.create_manager('MonitorError')
 MonitorError.add_error(
     'HeartbeatTimeout', 'has not received heartbeat notification in time'
 )
+MonitorError.add_error('InvalidOrderBy', 'cannot order transports by field')
@@ -1,5 +1,5 @@
-from pymaid.core import get_running_loop
 from pymaid.ext.middleware import BaseMiddleware
+from pymaid.utils.wheel import get_timer
 
 from .error import MonitorError
 
@@ -16,13 +16,14 @@ class HeartbeatMiddleware(BaseMiddleware):
         self.heartbeat_count = heartbeat_count
 
     def on_connection_made(self, channel, transport):
-        loop = get_running_loop()
+        # one timer per connection, the timing wheel suits it well
+        timer = get_timer()
 
         def clear_heartbeat_counter():
             transport.heartbeat_count = 0
             transport.heartbeat_timer.cancel()
-            transport.heartbeat_timer = loop.call_later(
-                self.heartbeat_timer, heartbeat_timeout,
+            transport.heartbeat_timer = timer.call_later(
+                self.heartbeat_interval, heartbeat_timeout,
             )
 
         def heartbeat_timeout():
@@ -30,12 +31,12 @@ class HeartbeatMiddleware(BaseMiddleware):
             if transport.heartbeat_count >= self.heartbeat_count:
                 transport.close(MonitorError.HeartbeatTimeout())
             else:
-                transport.heartbeat_timer = loop.call_later(
+                transport.heartbeat_timer = timer.call_later(
                     self.heartbeat_interval, heartbeat_timeout,
                 )
 
         transport.heartbeat_count = 0
-        transport.heartbeat_timer = loop.call_later(
+        transport.heartbeat_timer = timer.call_later(
             self.heartbeat_interval, heartbeat_timeout,
         )
         transport.clear_heartbeat_counter = clear_heartbeat_counter
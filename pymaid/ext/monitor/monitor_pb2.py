@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
     syntax='proto3',
     serialized_options=b'\220\001\001',
     create_key=_descriptor._internal_create_key,
-    serialized_pb=b'\n pymaid/ext/monitor/monitor.proto\x12\x12pymaid.ext.monitor\x1a\x1apymaid/rpc/pb/pymaid.proto\"\x06\n\x04Pong2G\n\x0eMonitorService\x12\x35\n\x04Ping\x12\x13.pymaid.rpc.pb.Void\x1a\x18.pymaid.ext.monitor.PongB\x03\x90\x01\x01\x62\x06proto3',
+    serialized_pb=b'\n pymaid/ext/monitor/monitor.proto\x12\x12pymaid.ext.monitor\x1a\x1apymaid/rpc/pb/pymaid.proto\"\x06\n\x04Pong\"G\n\tHistogram\x12\x0e\n\x06\x62ounds\x18\x01 \x03(\x01\x12\x0e\n\x06\x63ounts\x18\x02 \x03(\x04\x12\r\n\x05\x63ount\x18\x03 \x01(\x04\x12\x0b\n\x03sum\x18\x04 \x01(\x01\"\x86\x02\n\x0eTransportStats\x12\n\n\x02id\x18\x01 \x01(\r\x12\x10\n\x08peername\x18\x02 \x01(\t\x12\x10\n\x08\x62ytes_in\x18\x03 \x01(\x04\x12\x11\n\tbytes_out\x18\x04 \x01(\x04\x12\x13\n\x0bmessages_in\x18\x05 \x01(\x04\x12\x14\n\x0cmessages_out\x18\x06 \x01(\x04\x12\x12\n\nrecv_calls\x18\x07 \x01(\x04\x12\x12\n\nsend_calls\x18\x08 \x01(\x04\x12\x16\n\x0e\x62uffered_bytes\x18\t \x01(\x04\x12\x1a\n\x12\x64\x61ta_received_time\x18\n \x01(\x01\x12*\n\x03rtt\x18\x0b \x01(\x0b\x32\x1d.pymaid.ext.monitor.Histogram\"\xa0\x01\n\x0c\x43hannelStats\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x17\n\x0ftransport_count\x18\x02 \x01(\r\x12\x31\n\x05total\x18\x03 \x01(\x0b\x32\".pymaid.ext.monitor.TransportStats\x12\x36\n\ntransports\x18\x04 \x03(\x0b\x32\".pymaid.ext.monitor.TransportStats\"-\n\x0cStatsRequest\x12\x0b\n\x03top\x18\x01 \x01(\r\x12\x10\n\x08order_by\x18\x02 \x01(\t\"\x80\x01\n\x05Stats\x12\x32\n\x08\x63hannels\x18\x01 \x03(\x0b\x32 .pymaid.ext.monitor.ChannelStats\x12/\n\x08loop_lag\x18\x02 \x01(\x0b\x32\x1d.pymaid.ext.monitor.Histogram\x12\x12\n\nlag_paused\x18\x03 \x01(\x08\x32\x90\x01\n\x0eMonitorService\x12\x35\n\x04Ping\x12\x13.pymaid.rpc.pb.Void\x1a\x18.pymaid.ext.monitor.Pong\x12G\n\x08GetStats\x12 .pymaid.ext.monitor.StatsRequest\x1a\x19.pymaid.ext.monitor.StatsB\x03\x90\x01\x01\x62\x06proto3',
     dependencies=[pymaid_dot_rpc_dot_pb_dot_pymaid__pb2.DESCRIPTOR, ])
 
 
@@ -48,7 +48,310 @@ _PONG = _descriptor.Descriptor(
     serialized_end=90,
 )
 
+
+_HISTOGRAM = _descriptor.Descriptor(
+    name='Histogram',
+    full_name='pymaid.ext.monitor.Histogram',
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name='bounds', full_name='pymaid.ext.monitor.Histogram.bounds', index=0,
+            number=1, type=1, cpp_type=5, label=3,
+            has_default_value=False, default_value=[],
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='counts', full_name='pymaid.ext.monitor.Histogram.counts', index=1,
+            number=2, type=4, cpp_type=4, label=3,
+            has_default_value=False, default_value=[],
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='count', full_name='pymaid.ext.monitor.Histogram.count', index=2,
+            number=3, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='sum', full_name='pymaid.ext.monitor.Histogram.sum', index=3,
+            number=4, type=1, cpp_type=5, label=1,
+            has_default_value=False, default_value=float(0),
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+    ],
+    extensions=[
+    ],
+    nested_types=[],
+    enum_types=[
+    ],
+    serialized_options=None,
+    is_extendable=False,
+    syntax='proto3',
+    extension_ranges=[],
+    oneofs=[
+    ],
+    serialized_start=92,
+    serialized_end=163,
+)
+
+
+_TRANSPORTSTATS = _descriptor.Descriptor(
+    name='TransportStats',
+    full_name='pymaid.ext.monitor.TransportStats',
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name='id', full_name='pymaid.ext.monitor.TransportStats.id', index=0,
+            number=1, type=13, cpp_type=3, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='peername', full_name='pymaid.ext.monitor.TransportStats.peername', index=1,
+            number=2, type=9, cpp_type=9, label=1,
+            has_default_value=False, default_value=b"".decode('utf-8'),
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='bytes_in', full_name='pymaid.ext.monitor.TransportStats.bytes_in', index=2,
+            number=3, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='bytes_out', full_name='pymaid.ext.monitor.TransportStats.bytes_out', index=3,
+            number=4, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='messages_in', full_name='pymaid.ext.monitor.TransportStats.messages_in', index=4,
+            number=5, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='messages_out', full_name='pymaid.ext.monitor.TransportStats.messages_out', index=5,
+            number=6, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='recv_calls', full_name='pymaid.ext.monitor.TransportStats.recv_calls', index=6,
+            number=7, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='send_calls', full_name='pymaid.ext.monitor.TransportStats.send_calls', index=7,
+            number=8, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='buffered_bytes', full_name='pymaid.ext.monitor.TransportStats.buffered_bytes', index=8,
+            number=9, type=4, cpp_type=4, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='data_received_time', full_name='pymaid.ext.monitor.TransportStats.data_received_time', index=9,
+            number=10, type=1, cpp_type=5, label=1,
+            has_default_value=False, default_value=float(0),
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='rtt', full_name='pymaid.ext.monitor.TransportStats.rtt', index=10,
+            number=11, type=11, cpp_type=10, label=1,
+            has_default_value=False, default_value=None,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+    ],
+    extensions=[
+    ],
+    nested_types=[],
+    enum_types=[
+    ],
+    serialized_options=None,
+    is_extendable=False,
+    syntax='proto3',
+    extension_ranges=[],
+    oneofs=[
+    ],
+    serialized_start=166,
+    serialized_end=428,
+)
+
+
+_CHANNELSTATS = _descriptor.Descriptor(
+    name='ChannelStats',
+    full_name='pymaid.ext.monitor.ChannelStats',
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name='name', full_name='pymaid.ext.monitor.ChannelStats.name', index=0,
+            number=1, type=9, cpp_type=9, label=1,
+            has_default_value=False, default_value=b"".decode('utf-8'),
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='transport_count', full_name='pymaid.ext.monitor.ChannelStats.transport_count', index=1,
+            number=2, type=13, cpp_type=3, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='total', full_name='pymaid.ext.monitor.ChannelStats.total', index=2,
+            number=3, type=11, cpp_type=10, label=1,
+            has_default_value=False, default_value=None,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='transports', full_name='pymaid.ext.monitor.ChannelStats.transports', index=3,
+            number=4, type=11, cpp_type=10, label=3,
+            has_default_value=False, default_value=[],
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+    ],
+    extensions=[
+    ],
+    nested_types=[],
+    enum_types=[
+    ],
+    serialized_options=None,
+    is_extendable=False,
+    syntax='proto3',
+    extension_ranges=[],
+    oneofs=[
+    ],
+    serialized_start=431,
+    serialized_end=591,
+)
+
+
+_STATSREQUEST = _descriptor.Descriptor(
+    name='StatsRequest',
+    full_name='pymaid.ext.monitor.StatsRequest',
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name='top', full_name='pymaid.ext.monitor.StatsRequest.top', index=0,
+            number=1, type=13, cpp_type=3, label=1,
+            has_default_value=False, default_value=0,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='order_by', full_name='pymaid.ext.monitor.StatsRequest.order_by', index=1,
+            number=2, type=9, cpp_type=9, label=1,
+            has_default_value=False, default_value=b"".decode('utf-8'),
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+    ],
+    extensions=[
+    ],
+    nested_types=[],
+    enum_types=[
+    ],
+    serialized_options=None,
+    is_extendable=False,
+    syntax='proto3',
+    extension_ranges=[],
+    oneofs=[
+    ],
+    serialized_start=593,
+    serialized_end=638,
+)
+
+
+_STATS = _descriptor.Descriptor(
+    name='Stats',
+    full_name='pymaid.ext.monitor.Stats',
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name='channels', full_name='pymaid.ext.monitor.Stats.channels', index=0,
+            number=1, type=11, cpp_type=10, label=3,
+            has_default_value=False, default_value=[],
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='loop_lag', full_name='pymaid.ext.monitor.Stats.loop_lag', index=1,
+            number=2, type=11, cpp_type=10, label=1,
+            has_default_value=False, default_value=None,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+        _descriptor.FieldDescriptor(
+            name='lag_paused', full_name='pymaid.ext.monitor.Stats.lag_paused', index=2,
+            number=3, type=8, cpp_type=7, label=1,
+            has_default_value=False, default_value=False,
+            message_type=None, enum_type=None, containing_type=None,
+            is_extension=False, extension_scope=None,
+            serialized_options=None, file=DESCRIPTOR, create_key=_descriptor._internal_create_key),
+    ],
+    extensions=[
+    ],
+    nested_types=[],
+    enum_types=[
+    ],
+    serialized_options=None,
+    is_extendable=False,
+    syntax='proto3',
+    extension_ranges=[],
+    oneofs=[
+    ],
+    serialized_start=641,
+    serialized_end=769,
+)
+
+_TRANSPORTSTATS.fields_by_name['rtt'].message_type = _HISTOGRAM
+_CHANNELSTATS.fields_by_name['total'].message_type = _TRANSPORTSTATS
+_CHANNELSTATS.fields_by_name['transports'].message_type = _TRANSPORTSTATS
+_STATS.fields_by_name['channels'].message_type = _CHANNELSTATS
+_STATS.fields_by_name['loop_lag'].message_type = _HISTOGRAM
 DESCRIPTOR.message_types_by_name['Pong'] = _PONG
+DESCRIPTOR.message_types_by_name['Histogram'] = _HISTOGRAM
+DESCRIPTOR.message_types_by_name['TransportStats'] = _TRANSPORTSTATS
+DESCRIPTOR.message_types_by_name['ChannelStats'] = _CHANNELSTATS
+DESCRIPTOR.message_types_by_name['StatsRequest'] = _STATSREQUEST
+DESCRIPTOR.message_types_by_name['Stats'] = _STATS
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 Pong = _reflection.GeneratedProtocolMessageType('Pong', (_message.Message,), {
@@ -58,6 +361,41 @@ Pong = _reflection.GeneratedProtocolMessageType('Pong', (_message.Message,), {
 })
 _sym_db.RegisterMessage(Pong)
 
+Histogram = _reflection.GeneratedProtocolMessageType('Histogram', (_message.Message,), {
+    'DESCRIPTOR': _HISTOGRAM,
+    '__module__': 'pymaid.ext.monitor.monitor_pb2'
+    # @@protoc_insertion_point(class_scope:pymaid.ext.monitor.Histogram)
+})
+_sym_db.RegisterMessage(Histogram)
+
+TransportStats = _reflection.GeneratedProtocolMessageType('TransportStats', (_message.Message,), {
+    'DESCRIPTOR': _TRANSPORTSTATS,
+    '__module__': 'pymaid.ext.monitor.monitor_pb2'
+    # @@protoc_insertion_point(class_scope:pymaid.ext.monitor.TransportStats)
+})
+_sym_db.RegisterMessage(TransportStats)
+
+ChannelStats = _reflection.GeneratedProtocolMessageType('ChannelStats', (_message.Message,), {
+    'DESCRIPTOR': _CHANNELSTATS,
+    '__module__': 'pymaid.ext.monitor.monitor_pb2'
+    # @@protoc_insertion_point(class_scope:pymaid.ext.monitor.ChannelStats)
+})
+_sym_db.RegisterMessage(ChannelStats)
+
+StatsRequest = _reflection.GeneratedProtocolMessageType('StatsRequest', (_message.Message,), {
+    'DESCRIPTOR': _STATSREQUEST,
+    '__module__': 'pymaid.ext.monitor.monitor_pb2'
+    # @@protoc_insertion_point(class_scope:pymaid.ext.monitor.StatsRequest)
+})
+_sym_db.RegisterMessage(StatsRequest)
+
+Stats = _reflection.GeneratedProtocolMessageType('Stats', (_message.Message,), {
+    'DESCRIPTOR': _STATS,
+    '__module__': 'pymaid.ext.monitor.monitor_pb2'
+    # @@protoc_insertion_point(class_scope:pymaid.ext.monitor.Stats)
+})
+_sym_db.RegisterMessage(Stats)
+
 
 DESCRIPTOR._options = None
 
@@ -68,8 +406,8 @@ _MONITORSERVICE = _descriptor.ServiceDescriptor(
     index=0,
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
-    serialized_start=92,
-    serialized_end=163,
+    serialized_start=772,
+    serialized_end=916,
     methods=[
         _descriptor.MethodDescriptor(
             name='Ping',
@@ -81,6 +419,16 @@ _MONITORSERVICE = _descriptor.ServiceDescriptor(
             serialized_options=None,
             create_key=_descriptor._internal_create_key,
         ),
+        _descriptor.MethodDescriptor(
+            name='GetStats',
+            full_name='pymaid.ext.monitor.MonitorService.GetStats',
+            index=1,
+            containing_service=None,
+            input_type=_STATSREQUEST,
+            output_type=_STATS,
+            serialized_options=None,
+            create_key=_descriptor._internal_create_key,
+        ),
     ])
 _sym_db.RegisterServiceDescriptor(_MONITORSERVICE)
 
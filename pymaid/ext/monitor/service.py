@@ -1,6 +1,34 @@
+from pymaid.net.channel import channels
+from pymaid.net.transport import SocketTransport
 from pymaid.rpc.pb import implall
+from pymaid.utils.lag import get_loop_lag_probe
 
-from .monitor_pb2 import MonitorService, Pong
+from .error import MonitorError
+from .monitor_pb2 import (
+    ChannelStats, Histogram, MonitorService, Pong, Stats, StatsRequest,
+    TransportStats,
+)
+
+ORDER_BY_FIELDS = SocketTransport.STATS_FIELDS + ('buffered_bytes',)
+
+
+def transport_stats(stats) -> TransportStats:
+    message = TransportStats(
+        id=stats.get('id', 0),
+        peername=str(stats.get('peername') or ''),
+        bytes_in=stats['bytes_in'],
+        bytes_out=stats['bytes_out'],
+        messages_in=stats['messages_in'],
+        messages_out=stats['messages_out'],
+        recv_calls=stats['recv_calls'],
+        send_calls=stats['send_calls'],
+        buffered_bytes=stats['buffered_bytes'],
+        data_received_time=stats['data_received_time'],
+    )
+    rtt = stats.get('rtt')
+    if rtt is not None:
+        message.rtt.CopyFrom(Histogram(**rtt.to_dict()))
+    return message
 
 
 @implall
@@ -10,3 +38,35 @@ class MonitorServiceImpl(MonitorService):
         if not context.conn.is_closed:
             context.conn.clear_heartbeat_counter()
         await context.send_message(Pong())
+
+    async def GetStats(self, context) -> Stats:
+        # default request has an empty payload, received as None
+        request = await context.recv_message() or StatsRequest()
+        order_by = request.order_by or 'bytes_in'
+        if order_by not in ORDER_BY_FIELDS:
+            await context.close(MonitorError.InvalidOrderBy(
+                data={'order_by': order_by}
+            ))
+            return
+        response = Stats()
+        for channel in sorted(channels, key=lambda channel: channel.name):
+            if channel.state == channel.STATE.CLOSED:
+                continue
+            lag_guard = getattr(channel, 'lag_guard', None)
+            if lag_guard is not None and lag_guard.lagging:
+                response.lag_paused = True
+            stats = channel.get_stats(request.top, order_by)
+            response.channels.append(ChannelStats(
+                name=stats['name'],
+                transport_count=stats['transport_count'],
+                total=transport_stats(stats['total']),
+                transports=[
+                    transport_stats(item) for item in stats['transports']
+                ],
+            ))
+        # only read, empty unless the probe is started by the application
+        # or by the channels with loop lag admission control
+        response.loop_lag.CopyFrom(
+            Histogram(**get_loop_lag_probe().histogram.to_dict())
+        )
+        await context.send_message(response)
@@ -25,7 +25,8 @@ import ssl
 from typing import Callable, List, Optional, Union
 
 
-from .channel import ChannelType, StreamChannel
+from .channel import ChannelType, DatagramChannel, StreamChannel
+from .datagram import Datagram
 from .raw import sock_connect
 from .stream import Stream
 from .utils.uri import parse_uri
@@ -138,3 +139,67 @@ async def serve_stream(
     if start_serving:
         channel.start()
     return channel
+
+
+async def dial_datagram(
+    address: str,
+    *,
+    transport_class: Datagram = Datagram,
+    on_open: Optional[List[Callable]] = None,
+    on_close: Optional[List[Callable]] = None,
+    **kwargs,
+):
+    '''Create a `Datagram` instance that connect to `address`.
+
+    The address parameter should be an uri with `udp`, `udp4`, `udp6` or
+    `unix` scheme, e.g. `udp://localhost:8888`.
+
+    This method is a coroutine.
+
+    :returns: a `Datagram` object.
+    '''
+    uri = parse_uri(address)
+    sock = await sock_connect(
+        uri.scheme, uri.address, socket_kind=socket.SOCK_DGRAM,
+    )
+    return transport_class(
+        sock,
+        initiative=True,
+        on_open=on_open,
+        on_close=on_close,
+        uri=uri,
+        **kwargs,
+    )
+
+
+async def serve_datagram(
+    address: str,
+    *,
+    name: str = 'DatagramChannel',
+    channel_class: ChannelType = DatagramChannel,
+    transport_class: Datagram = Datagram,
+    flags: socket.AddressInfo = socket.AI_PASSIVE,
+    reuse_address: bool = True,
+    reuse_port: bool = False,
+    start_serving: bool = True,
+    **kwargs,
+):
+    '''Create a channel instance bound to `address` and serve forever.
+
+    The address parameter should be an uri with `udp`, `udp4`, `udp6` or
+    `unix` scheme, e.g. `udp://localhost:8888`.
+
+    This method is a coroutine.
+    '''
+    channel = channel_class(
+        name=name, transport_class=transport_class, **kwargs,
+    )
+    await channel.listen(
+        address,
+        flags=flags,
+        reuse_address=reuse_address,
+        reuse_port=reuse_port,
+    )
+    if start_serving:
+        channel.start()
+    return channel
@@ -2,24 +2,110 @@ import abc
 import os
 import socket
 import ssl as _ssl
+import struct
 import sys
 
-from typing import Optional, TypeVar, Union
+from heapq import nlargest
+from operator import itemgetter
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, TypeVar,
+    Union,
+)
+from weakref import WeakSet
 
 from pymaid.conf import settings
 from pymaid.core import get_running_loop, Event, CancelledError
+from pymaid.ext.handler import Handler
 from pymaid.ext.middleware import MiddlewareManager
+from pymaid.types import DataType
+from pymaid.utils.lag import get_loop_lag_probe
 
 from .base import logger, ChannelState
+from .datagram import Datagram, DatagramType
+from .prefork import (
+    PAUSED, connect_master, handoff_key, recv_handoff, report_load,
+)
 from .raw import sock_listen
+from .registry import Registry
 from .stream import Stream, StreamType
-from .transport import Transport, TransportType
+from .transport import SocketTransport, Transport, TransportType
 from .utils.uri import parse_uri
 
+# living channels, for monitoring
+channels = WeakSet()
+
+# l_onoff=1, l_linger=0, close() sends RST
+LINGER_RST = struct.pack('ii', 1, 0)
+
+
+def merge_stats(total: Dict[str, Any], stats: Dict[str, Any]):
+    '''Add the counters and rtt histogram of transport `stats` to `total`.'''
+    for name in SocketTransport.STATS_FIELDS:
+        total[name] += stats[name]
+    rtt = stats.get('rtt')
+    if rtt is not None:
+        if total.get('rtt') is None:
+            total['rtt'] = rtt.copy()
+        else:
+            total['rtt'].merge(rtt)
+
+
+class LoopLagGuard:
+    '''Pause accepting of all the stream channels while the loop lags.
+
+    Channels are paused once a lag sample exceeds `pause_lag`, and resumed
+    once a sample falls below `resume_lag`, the gap between them avoids
+    flapping.
+    '''
+
+    def __init__(self, pause_lag: float, resume_lag: float):
+        self.pause_lag = pause_lag
+        self.resume_lag = resume_lag
+        self.lagging = False
+        self.pause_count = 0
+        self.paused = WeakSet()
+
+    def __call__(self, lag: float):
+        if not self.lagging and lag > self.pause_lag:
+            self.lagging = True
+            self.pause_count += 1
+            for channel in list(channels):
+                if (
+                    isinstance(channel, StreamChannel)
+                    and channel.state == channel.STATE.STARTED
+                ):
+                    channel.pause(f'loop lag {lag:.3f}s')
+                    self.paused.add(channel)
+        elif self.lagging and lag < self.resume_lag:
+            self.lagging = False
+            for channel in list(self.paused):
+                if (
+                    channel.state == channel.STATE.PAUSED
+                    and not channel.is_full
+                ):
+                    channel.start()
+            self.paused.clear()
+
+
+def get_loop_lag_guard() -> LoopLagGuard:
+    '''Return the guard of the running loop, create it if needed.'''
+    probe = get_loop_lag_probe()
+    probe.start()
+    for callback in probe.callbacks:
+        if isinstance(callback, LoopLagGuard):
+            return callback
+    pause_lag = settings.pymaid.LOOP_LAG_PAUSE_THRESHOLD
+    guard = LoopLagGuard(
+        pause_lag, settings.pymaid.LOOP_LAG_RESUME_THRESHOLD or pause_lag / 2,
+    )
+    probe.callbacks.append(guard)
+    return guard
+
 
 class Channel(abc.ABC):
 
     STATE = ChannelState
+    SOCKET_KIND = socket.SOCK_STREAM
     logger = logger
 
     def __init__(
@@ -40,6 +126,8 @@ class Channel(abc.ABC):
 
         self.uri = None
         self.transports = {}
+        # transports indexed by tagged keys, e.g. user id
+        self.registry = Registry(self.transports)
         self.listeners = []
         self.middleware_manager = middleware_manager or MiddlewareManager()
         self.extra_transport_kwargs = kwargs
@@ -49,6 +137,9 @@ class Channel(abc.ABC):
         self.closed_event = Event()
         self._loop = get_running_loop()
         self._serving_forever_fut = None
+        # counters of the closed transports
+        self.closed_stats = None
+        channels.add(self)
 
     @property
     def is_full(self):
@@ -72,6 +163,7 @@ class Channel(abc.ABC):
             backlog=backlog,
             reuse_address=reuse_address,
             reuse_port=reuse_port,
+            socket_kind=self.SOCKET_KIND,
         )
         for sock in listeners:
             self.listeners.append(sock)
@@ -79,6 +171,40 @@ class Channel(abc.ABC):
     def read_from_listener(self, sock: socket.socket):
         raise NotImplementedError
 
+    def get_stats(
+        self, top: int = 0, order_by: str = 'bytes_in',
+    ) -> Dict[str, Any]:
+        '''Return the traffic stats of this channel.
+
+        `total` sums up the counters of both living and closed transports,
+        `transports` are the `top` living transports with the most
+        `order_by` counter.
+        '''
+        if order_by not in SocketTransport.STATS_FIELDS + ('buffered_bytes',):
+            raise ValueError(f'cannot order transports by {order_by!r}')
+        total = dict.fromkeys(SocketTransport.STATS_FIELDS, 0)
+        total['rtt'] = None
+        if self.closed_stats is not None:
+            merge_stats(total, self.closed_stats)
+        total['buffered_bytes'] = 0
+        transports = []
+        for conn in self.transports.values():
+            stats = conn.get_stats()
+            merge_stats(total, stats)
+            total['buffered_bytes'] += stats['buffered_bytes']
+            transports.append(stats)
+        return {
+            'name': self.name,
+            'transport_count': len(self.transports),
+            'total': total,
+            'transports': nlargest(top, transports, key=itemgetter(order_by)),
+        }
+
+    def _collect_stats(self, conn: SocketTransport):
+        if self.closed_stats is None:
+            self.closed_stats = dict.fromkeys(SocketTransport.STATS_FIELDS, 0)
+        merge_stats(self.closed_stats, conn.get_stats())
+
     async def wait_for_closed(self):
         await self.closed_event.wait()
 
@@ -113,16 +239,22 @@ class Channel(abc.ABC):
             raise RuntimeError(f'{self!r} is closing, cannot start again')
         self.logger.info(f'{self!r} start')
         self.state = self.STATE.STARTED
-        loop = self._loop
         for sock in self.listeners:
-            loop.add_reader(sock.fileno(), self.read_from_listener, sock)
+            self._listener_loop(sock).add_reader(
+                sock.fileno(), self.read_from_listener, sock
+            )
 
     def pause(self, reason: str = ''):
         self.logger.info(f'{self!r} pause with reason: {reason!r}')
         self.state = self.STATE.PAUSED
-        loop = self._loop
         for sock in self.listeners:
-            loop.remove_reader(sock.fileno())
+            self._listener_loop(sock).remove_reader(sock.fileno())
+
+    def _listener_loop(self, sock):
+        # listeners not backed by the kernel, e.g. memory listeners, drive
+        # the callbacks by themselves
+        wrap_loop = getattr(sock, 'wrap_loop', None)
+        return self._loop if wrap_loop is None else wrap_loop(self._loop)
 
     def shutdown(self, reason: str = 'shutdown'):
         if self.state >= self.STATE.SHUTTING_DOWN:
@@ -197,10 +329,44 @@ class StreamChannel(Channel):
             middleware_manager=middleware_manager,
             **kwargs,
         )
+        # connections shed by admission control
+        self.shed_count = 0
+        # connected to the pre-fork master instead of listening
+        self.handoff = None
+        self._load_report_handle = None
+        self.lag_guard = None
+
+    async def listen(self, address: str, **kwargs):
+        '''Listen on `address`, or get its connections from the master.
+
+        When running under ``pymaid worker run --master`` and `address` is
+        one of the master addresses, the connections are accepted by the
+        master and handed off to this channel.
+        '''
+        uri = parse_uri(address)
+        key = handoff_key(uri)
+        path = settings.pymaid.PREFORK_HANDOFF_PATH
+        if not path or key not in settings.pymaid.PREFORK_ADDRESSES:
+            return await super().listen(address, **kwargs)
+        self.uri = uri
+        self.handoff = await connect_master(path, key)
+        self.listeners.append(self.handoff)
 
     def read_from_listener(self, sock: socket.socket):
+        '''Accept up to a budget of connections per wakeup.
+
+        `MAX_ACCEPT` is shared by all the listeners, so one busy listener
+        cannot starve the others and the established connections.
+        Connections are shed, i.e. accepted and closed at once, when
+        :meth:`is_overloaded`.
+        '''
+        if sock is self.handoff:
+            self.read_from_handoff(sock)
+            return
         connection_made = self.connection_made
-        while 1:
+        budget = max(settings.pymaid.MAX_ACCEPT // len(self.listeners), 1)
+        overloaded = self.is_overloaded()
+        for _ in range(budget):
             if self.is_full:
                 self.pause('stop accept since is full')
                 break
@@ -208,14 +374,85 @@ class StreamChannel(Channel):
                 conn, addr = sock.accept()
             except (BlockingIOError, InterruptedError, ConnectionAbortedError):
                 return
+            if overloaded:
+                self.shed_connection(conn)
+                continue
             conn.setblocking(False)
             connection_made(conn)
 
+    def read_from_handoff(self, sock: socket.socket):
+        socks = recv_handoff(sock)
+        if socks is None:
+            self.logger.warning(f'{self!r} lost the pre-fork master')
+            self._loop.remove_reader(sock.fileno())
+            self.listeners.remove(sock)
+            self.handoff = None
+            sock.close()
+            return
+        for conn in socks:
+            self.adopt(conn)
+
+    def adopt(self, sock: socket.socket) -> Optional[Stream]:
+        '''Serve the already accepted `sock`, e.g. handed off by others.
+
+        The connection is shed when the channel is full or overloaded.
+        '''
+        if self.is_full or self.is_overloaded():
+            self.shed_connection(sock)
+            return None
+        sock.setblocking(False)
+        return self.connection_made(sock)
+
+    def is_overloaded(self) -> bool:
+        '''Whether new connections should be shed.
+
+        True when the event loop lags more than `ADMISSION_MAX_LOOP_LAG`
+        seconds, or the handlers have more than `ADMISSION_MAX_PENDING_TASKS`
+        pending tasks in total.
+        '''
+        max_lag = settings.pymaid.ADMISSION_MAX_LOOP_LAG
+        if max_lag and get_loop_lag_probe().lag > max_lag:
+            return True
+        max_pending = settings.pymaid.ADMISSION_MAX_PENDING_TASKS
+        if max_pending and Handler.total_pending_tasks > max_pending:
+            return True
+        return False
+
+    def shed_connection(self, sock: socket.socket):
+        '''Close the accepted connection at once, with RST.
+
+        It is cheaper than serving a connection we cannot afford, and does
+        not leave the socket in TIME_WAIT.
+        '''
+        self.shed_count += 1
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RST)
+        except OSError:
+            pass
+        sock.close()
+
+    def start(self):
+        super().start()
+        if settings.pymaid.ADMISSION_MAX_LOOP_LAG:
+            get_loop_lag_probe().start()
+        if settings.pymaid.LOOP_LAG_PAUSE_THRESHOLD and self.lag_guard is None:
+            self.lag_guard = get_loop_lag_guard()
+        if self.handoff is not None:
+            self._schedule_load_report()
+
+    def pause(self, reason: str = ''):
+        super().pause(reason)
+        # the master skips this worker until started again
+        if self.handoff is not None:
+            self._schedule_load_report()
+
     def connection_made(self, sock: socket.socket) -> Stream:
         conn = self._make_connection(
             sock, False, on_close=[self.connection_lost],
         )
         self.transports[conn.id] = conn
+        if self.handoff is not None:
+            self._schedule_load_report()
         self.logger.info(
             f'{self!r} connection_made: '
             f'<{self.transport_class.__name__} {conn.id}>'
@@ -225,8 +462,16 @@ class StreamChannel(Channel):
     def connection_lost(self, conn: Stream, exc=None):
         assert conn.id in self.transports, conn.id
         del self.transports[conn.id]
+        self.registry.remove(conn)
+        self._collect_stats(conn)
+        if self.handoff is not None:
+            self._schedule_load_report()
         if self.state == self.STATE.PAUSED and not self.is_full:
-            self.start()
+            if self.lag_guard is not None and self.lag_guard.lagging:
+                # resumed by the guard once the loop recovers
+                self.lag_guard.paused.add(self)
+            else:
+                self.start()
         self.logger.info(
             f'{self!r} connection_lost: '
             f'<{self.transport_class.__name__} {conn.id}> exc={exc}'
@@ -234,6 +479,66 @@ class StreamChannel(Channel):
         if not self.transports and self.state >= self.STATE.CLOSING:
             self._finnal_close(exc)
 
+    def iter_transports(
+        self,
+        transports: Optional[Iterable[Stream]] = None,
+        predicate: Optional[Callable[[Stream], bool]] = None,
+    ) -> Iterator[Stream]:
+        '''Yield the open `transports`, all by default, matching `predicate`.
+
+        `transports` can be the query of :attr:`registry`, e.g.
+        `registry.select('room', room_id)`.
+        Transports closed during the iteration are fine.
+        '''
+        if transports is None:
+            transports = list(self.transports.values())
+        for transport in transports:
+            if transport.state >= transport.STATE.CLOSING:
+                continue
+            if predicate is not None and not predicate(transport):
+                continue
+            yield transport
+
+    def broadcast(
+        self,
+        data: Union[DataType, Sequence[DataType]],
+        transports: Optional[Iterable[Stream]] = None,
+        predicate: Optional[Callable[[Stream], bool]] = None,
+    ) -> int:
+        '''Write the same `data` to the transports of :meth:`iter_transports`.
+
+        `data` is a buffer or a sequence of buffers, the buffers are shared
+        by all the write buffers instead of being copied for each transport.
+        It does not wait for draining, the slow transports are paused on
+        writing as usual.
+
+        :returns: the number of transports written to.
+        '''
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = (data,)
+        # snapshot once, the buffers are queued by reference
+        parts = tuple(
+            part if isinstance(part, bytes) else bytes(part) for part in data
+        )
+        count = 0
+        for transport in self.iter_transports(transports, predicate):
+            transport.writelines_sync(parts)
+            count += 1
+        return count
+
+    def _schedule_load_report(self):
+        # one report per loop iteration at most
+        if self._load_report_handle is None:
+            self._load_report_handle = self._loop.call_soon(self._report_load)
+
+    def _report_load(self):
+        self._load_report_handle = None
+        if self.handoff is not None and self.state < self.STATE.CLOSING:
+            if self.state >= self.STATE.PAUSED:
+                report_load(self.handoff, PAUSED)
+            else:
+                report_load(self.handoff, len(self.transports))
+
     def shutdown(self, reason: str = 'shutdown'):
         super().shutdown(reason)
         for conn in self.transports.values():
@@ -252,4 +557,89 @@ class StreamChannel(Channel):
         )
 
 
+class DatagramChannel(Channel):
+    '''Channel manages bound datagram sockets.
+
+    There is no connection for datagram, every bound socket is wrapped as a
+    :class:`Datagram` transport once started, which receives datagrams from
+    all the peers.
+    '''
+
+    SOCKET_KIND = socket.SOCK_DGRAM
+
+    def __init__(
+        self,
+        *,
+        name: str = 'DatagramChannel',
+        transport_class: DatagramType = Datagram,
+        middleware_manager: Optional[MiddlewareManager] = None,
+        **kwargs,
+    ):
+        super().__init__(
+            name=name,
+            transport_class=transport_class,
+            ssl_context=None,
+            middleware_manager=middleware_manager,
+            **kwargs,
+        )
+
+    def start(self):
+        if self.state >= self.STATE.CLOSING:
+            raise RuntimeError(f'{self!r} is closing, cannot start again')
+        self.logger.info(f'{self!r} start')
+        self.state = self.STATE.STARTED
+        bound = {conn._sock for conn in self.transports.values()}
+        for sock in self.listeners:
+            if sock not in bound:
+                self.connection_made(sock)
+        for conn in self.transports.values():
+            conn.resume_reading()
+
+    def pause(self, reason: str = ''):
+        self.logger.info(f'{self!r} pause with reason: {reason!r}')
+        self.state = self.STATE.PAUSED
+        for conn in self.transports.values():
+            conn.pause_reading()
+
+    def close(
+        self, reason: Union[None, str, Exception] = 'called close',
+    ):
+        if self.state >= self.STATE.CLOSING:
+            return
+        # bound sockets are owned by transports, closed along with them
+        bound = {conn._sock for conn in self.transports.values()}
+        self.listeners = [
+            sock for sock in self.listeners if sock not in bound
+        ]
+        super().close(reason)
+        for conn in list(self.transports.values()):
+            conn.close()
+
+    def connection_made(self, sock: socket.socket) -> Datagram:
+        conn = self.transport_class(
+            sock,
+            initiative=False,
+            on_close=[self.connection_lost],
+            **self.extra_transport_kwargs,
+        )
+        self.transports[conn.id] = conn
+        self.logger.info(
+            f'{self!r} connection_made: '
+            f'<{self.transport_class.__name__} {conn.id}>'
+        )
+        return conn
+
+    def connection_lost(self, conn: Datagram, exc=None):
+        assert conn.id in self.transports, conn.id
+        del self.transports[conn.id]
+        self.registry.remove(conn)
+        self._collect_stats(conn)
+        self.logger.info(
+            f'{self!r} connection_lost: '
+            f'<{self.transport_class.__name__} {conn.id}> exc={exc}'
+        )
+        if not self.transports and self.state >= self.STATE.CLOSING:
+            self._finnal_close(exc)
+
+
 ChannelType = TypeVar('ChannelType', bound=Channel)
@@ -0,0 +1,208 @@
+import abc
+import socket
+
+from time import perf_counter
+from typing import Any, Callable, List, Optional, TypeVar
+
+from pymaid.types import DataType
+
+from .transport import SocketTransport
+from .utils.uri import URI
+
+
+class Datagram(SocketTransport):
+    '''Datagram transport, for udp and unix datagram sockets.
+
+    A connected datagram (by :func:`pymaid.net.dial_datagram`) talks to the
+    peer only, and `peername` is the peer address; a bound one (served by
+    :class:`pymaid.net.channel.DatagramChannel`) has no peer, `peername` is
+    None, and the peer address should be passed to :meth:`sendto`.
+    '''
+
+    __slots__ = ('initiative', 'uri', '_flush_handle')
+
+    MAX_SIZE = 64 * 1024  # recv size passed to sock.recvfrom
+    # max datagrams handled per read wakeup, yield to other callbacks after
+    MAX_READS = 64
+
+    WRAP_METHODS = {
+        '_datagram_received': 'datagram_received',
+
+        'sendto': '_sendto',
+    }
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        *,
+        on_open: Optional[List[Callable]] = None,
+        on_close: Optional[List[Callable]] = None,
+        initiative: bool = False,
+        uri: Optional[URI] = None,
+    ):
+        super().__init__(sock, on_open=on_open, on_close=on_close)
+        self.initiative = initiative
+        self.uri = uri
+        self._flush_handle = None
+
+    def wrap_sock(self, sock: socket.socket):
+        self._sock = sock
+        self._sock_fd = sock.fileno()
+
+        try:
+            self.peername = sock.getpeername()
+        except OSError:
+            # not connected, e.g. bound by server side
+            self.peername = None
+        self.sockname = sock.getsockname()
+        self._loop.add_reader(self._sock_fd, self._reader)
+
+    async def wait_for_ready(self):
+        pass
+
+    def _sendto(self, data: DataType, addr: Any = None):
+        '''Send data as one datagram to addr, or the peer if connected.
+
+        Datagrams sent during one event loop iteration are buffered and sent
+        together at the end of that iteration.
+        Datagrams are dropped silently once the transport is closing.
+        '''
+        if self.state >= self.STATE.CLOSING:
+            self.logger.debug(f'{self!r} sendto after closing, dropped')
+            return
+        if self.peername is not None:
+            if addr not in (None, self.peername):
+                raise ValueError(
+                    f'invalid address: must be None or {self.peername}'
+                )
+            addr = None
+        elif addr is None:
+            raise ValueError(f'{self!r} is not connected, address required')
+        if not isinstance(data, bytes):
+            # caller may reuse mutable buffer, keep a snapshot
+            data = bytes(data)
+        if not self.write_buffer:
+            if self._flush_handle is None:
+                self._flush_handle = self._loop.call_soon(self._flush)
+            if self.write_buffer is None:
+                self.write_buffer = self.BUFFER_FACTORY()
+        self.write_buffer.append((data, addr))
+        self.write_buffer_size += len(data)
+
+    @abc.abstractmethod
+    def datagram_received(self, data: bytes, addr: Any):
+        '''Called when a datagram is received.'''
+        raise NotImplementedError('datagram_received')
+
+    def error_received(self, exc: OSError):
+        '''Called when a previous send or receive operation failed.
+
+        e.g. ICMP port unreachable reported as `ConnectionRefusedError`.
+        The transport is still usable.
+        '''
+        self.logger.debug(f'{self!r} error received: {exc!r}')
+
+    def shutdown(self, reason=None):
+        # no half close for datagram sockets
+        self.close()
+
+    def _reader(self):
+        recvfrom = self._sock.recvfrom
+        size = self.MAX_SIZE
+        for _ in range(self.MAX_READS):
+            self.recv_calls += 1
+            try:
+                data, addr = recvfrom(size)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                self.error_received(exc)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as exc:
+                self._fatal_error(
+                    exc, 'Fatal read error on datagram transport'
+                )
+                return
+            else:
+                self.bytes_in += len(data)
+                self.messages_in += 1
+                start = perf_counter()
+                try:
+                    self._datagram_received(data, addr)
+                except (SystemExit, KeyboardInterrupt):
+                    raise
+                except BaseException as exc:
+                    self._fatal_error(
+                        exc, 'Fatal error: datagram_received() call failed.'
+                    )
+                    return
+                finally:
+                    self.data_received_time += perf_counter() - start
+            if self.state >= self.STATE.CLOSING or not self.is_reading:
+                return
+
+    def _send_write_buffer(self) -> bool:
+        '''Send buffered datagrams until the socket is not writable.
+
+        :returns: bool, False if fatal error occurred.
+        '''
+        buffer = self.write_buffer
+        sock = self._sock
+        while buffer:
+            data, addr = buffer[0]
+            self.send_calls += 1
+            try:
+                if addr is None:
+                    sock.send(data)
+                else:
+                    sock.sendto(data, addr)
+            except (BlockingIOError, InterruptedError):
+                return True
+            except OSError as exc:
+                # drop this datagram
+                self.error_received(exc)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as exc:
+                self._fatal_error(
+                    exc, 'Fatal write error on datagram transport'
+                )
+                return False
+            else:
+                self.bytes_out += len(data)
+                self.messages_out += 1
+            buffer.popleft()
+            self.write_buffer_size -= len(data)
+        return True
+
+    def _flush(self):
+        self._flush_handle = None
+        if self.state == self.STATE.CLOSED:
+            return
+        if not self._send_write_buffer():
+            return
+        if self.write_buffer:
+            self._loop.add_writer(self._sock_fd, self._writer)
+            return
+        self.write_buffer = None
+        if self.state == self.STATE.CLOSING:
+            self._finnal_close(None)
+
+    def _writer(self):
+        if not self._send_write_buffer():
+            return
+        if not self.write_buffer:
+            self._loop.remove_writer(self._sock_fd)
+            self.write_buffer = None
+            if self.state == self.STATE.CLOSING:
+                self._finnal_close(None)
+
+    def _finnal_close(self, exc=None):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        super()._finnal_close(exc)
+
+
+DatagramType = TypeVar('DatagramType', bound=Datagram)
@@ -0,0 +1,352 @@
+'''In-process stream sockets, for services in the same process.
+
+Memory sockets are socket-like objects passing the buffers through the
+event loop, without syscalls and kernel buffer copies. Transports wrap them
+as usual, their io callbacks are driven by the sockets through a
+:class:`MemoryLoop`, so `Stream` subclasses work unchanged.
+
+Channels listen on `memory://name`, and `dial_stream('memory://name')`
+connects to it, see :func:`listen` and :func:`connect`.
+'''
+import socket
+
+from collections import deque
+from errno import EADDRINUSE, EBADF, ECONNREFUSED
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from pymaid.core import get_running_loop
+from pymaid.types import DataType
+
+__all__ = (
+    'MemoryListener', 'MemoryLoop', 'MemorySocket', 'connect', 'listen',
+    'socketpair',
+)
+
+# listening memory addresses
+listeners: Dict[str, 'MemoryListener'] = {}
+
+
+class MemoryFile:
+    '''Level-triggered readiness of memory sockets and listeners.
+
+    The reader/writer is called in the next loop iteration whenever it is
+    set and the file is readable/writable, like `loop.add_reader`.
+    '''
+
+    __slots__ = ('loop', 'reader', 'writer', 'handle')
+
+    def __init__(self):
+        self.loop = get_running_loop()
+        self.reader = None
+        self.writer = None
+        self.handle = None
+
+    def fileno(self) -> int:
+        # not backed by the kernel
+        return -1
+
+    def setblocking(self, flag: bool):
+        pass
+
+    def wrap_loop(self, loop) -> 'MemoryLoop':
+        '''Called by transports and channels, to drive their io callbacks.'''
+        return MemoryLoop(loop, self)
+
+    def readable(self) -> bool:
+        return False
+
+    def writable(self) -> bool:
+        return False
+
+    def set_reader(self, callback: Optional[Callable] = None, *args) -> bool:
+        '''Set or remove the reader, returns whether there was one.'''
+        existed = self.reader is not None
+        self.reader = (callback, args) if callback is not None else None
+        self.wakeup()
+        return existed
+
+    def set_writer(self, callback: Optional[Callable] = None, *args) -> bool:
+        '''Set or remove the writer, returns whether there was one.'''
+        existed = self.writer is not None
+        self.writer = (callback, args) if callback is not None else None
+        self.wakeup()
+        return existed
+
+    def wakeup(self):
+        if self.handle is not None:
+            return
+        if ((self.reader is not None and self.readable())
+                or (self.writer is not None and self.writable())):
+            self.handle = self.loop.call_soon(self._run)
+
+    def _run(self):
+        self.handle = None
+        if self.reader is not None and self.readable():
+            callback, args = self.reader
+            callback(*args)
+        if self.writer is not None and self.writable():
+            callback, args = self.writer
+            callback(*args)
+        self.wakeup()
+
+    def _stop(self):
+        self.reader = self.writer = None
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+
+class MemorySocket(MemoryFile):
+    '''One end of an in-process stream, socket-like for transports.
+
+    Data sent is queued in the inbox of the peer by reference, up to
+    `BUFFER_SIZE` bytes, like the kernel buffer of a socket.
+    '''
+
+    __slots__ = (
+        'sockname', 'peername', 'peer', 'inbox', 'inbox_size', 'eof',
+        'write_shutdown', 'closed',
+    )
+
+    family = socket.AF_UNSPEC
+    type = socket.SOCK_STREAM
+    proto = 0
+    # non-blocking
+    timeout = 0.0
+
+    BUFFER_SIZE = 256 * 1024
+
+    def __init__(self, sockname: str, peername: str):
+        super().__init__()
+        self.sockname = sockname
+        self.peername = peername
+        self.peer = None
+        self.inbox = deque()
+        self.inbox_size = 0
+        # the peer finished writing
+        self.eof = False
+        self.write_shutdown = False
+        self.closed = False
+
+    def getsockname(self) -> str:
+        return self.sockname
+
+    def getpeername(self) -> str:
+        return self.peername
+
+    def setsockopt(self, *args):
+        pass
+
+    def getsockopt(self, *args) -> int:
+        return 0
+
+    def readable(self) -> bool:
+        return bool(self.inbox) or self.eof
+
+    def writable(self) -> bool:
+        peer = self.peer
+        return (
+            peer is None or peer.closed
+            or peer.inbox_size < self.BUFFER_SIZE
+        )
+
+    def recv(self, size: int) -> bytes:
+        chunks = self._pop(size)
+        if len(chunks) == 1 and isinstance(chunks[0], bytes):
+            # passed through without copying
+            return chunks[0]
+        return b''.join(chunks)
+
+    def recv_into(self, buffer: memoryview, nbytes: int = 0) -> int:
+        offset = 0
+        for chunk in self._pop(nbytes or len(buffer)):
+            buffer[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        return offset
+
+    def _pop(self, size: int) -> list:
+        if self.closed:
+            raise OSError(EBADF, 'Bad file descriptor')
+        inbox = self.inbox
+        if not inbox:
+            if self.eof:
+                return [b'']
+            raise BlockingIOError
+        chunks = []
+        nbytes = 0
+        while inbox and nbytes < size:
+            chunk = inbox[0]
+            wanted = size - nbytes
+            if len(chunk) > wanted:
+                view = memoryview(chunk)
+                inbox[0] = view[wanted:]
+                chunk = view[:wanted]
+            else:
+                inbox.popleft()
+            chunks.append(chunk)
+            nbytes += len(chunk)
+        self.inbox_size -= nbytes
+        if self.peer is not None:
+            # room for the writer of peer
+            self.peer.wakeup()
+        return chunks
+
+    def send(self, data: DataType) -> int:
+        if self.closed:
+            raise OSError(EBADF, 'Bad file descriptor')
+        peer = self.peer
+        if peer is None or peer.closed or self.write_shutdown:
+            raise BrokenPipeError(f'{self.peername} is closed')
+        size = len(data)
+        if not size:
+            return 0
+        room = self.BUFFER_SIZE - peer.inbox_size
+        if room <= 0:
+            raise BlockingIOError
+        if size > room:
+            data = memoryview(data)[:room]
+            size = room
+        peer.inbox.append(data)
+        peer.inbox_size += size
+        peer.wakeup()
+        return size
+
+    def sendmsg(self, buffers: Iterable[DataType]) -> int:
+        total = 0
+        for data in buffers:
+            try:
+                size = self.send(data)
+            except BlockingIOError:
+                if total:
+                    break
+                raise
+            total += size
+            if size < len(data):
+                break
+        return total
+
+    def shutdown(self, how: int):
+        if how in (socket.SHUT_WR, socket.SHUT_RDWR):
+            self.write_shutdown = True
+            if self.peer is not None:
+                self.peer.eof = True
+                self.peer.wakeup()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._stop()
+        self.inbox.clear()
+        self.inbox_size = 0
+        peer, self.peer = self.peer, None
+        if peer is not None:
+            peer.eof = True
+            peer.wakeup()
+
+    def __repr__(self):
+        return (
+            f'<MemorySocket sockname={self.sockname} '
+            f'peername={self.peername} closed={self.closed}>'
+        )
+
+
+class MemoryListener(MemoryFile):
+    '''Listener of `memory://name`, readable when connections are pending.'''
+
+    __slots__ = ('name', 'backlog', 'count', 'closed')
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.backlog = deque()
+        self.count = 0
+        self.closed = False
+
+    def getsockname(self) -> str:
+        return self.name
+
+    def readable(self) -> bool:
+        return bool(self.backlog)
+
+    def accept(self) -> Tuple[MemorySocket, str]:
+        if not self.backlog:
+            raise BlockingIOError
+        sock = self.backlog.popleft()
+        return sock, sock.peername
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._stop()
+        if listeners.get(self.name) is self:
+            del listeners[self.name]
+        while self.backlog:
+            self.backlog.popleft().close()
+
+    def __repr__(self):
+        return f'<MemoryListener name={self.name} closed={self.closed}>'
+
+
+class MemoryLoop:
+    '''Proxy of the event loop for the transports of memory sockets.
+
+    Readers and writers are set on the memory socket instead of the loop,
+    the others are delegated to the loop.
+    '''
+
+    __slots__ = ('loop', 'sock')
+
+    def __init__(self, loop, sock: MemoryFile):
+        self.loop = loop
+        self.sock = sock
+
+    def add_reader(self, fd: int, callback: Callable, *args):
+        self.sock.set_reader(callback, *args)
+
+    def remove_reader(self, fd: int) -> bool:
+        return self.sock.set_reader(None)
+
+    def add_writer(self, fd: int, callback: Callable, *args):
+        self.sock.set_writer(callback, *args)
+
+    def remove_writer(self, fd: int) -> bool:
+        return self.sock.set_writer(None)
+
+    def __getattr__(self, name):
+        return getattr(self.loop, name)
+
+
+def socketpair(
+    name: str = 'memory',
+) -> Tuple[MemorySocket, MemorySocket]:
+    '''Return a pair of connected memory sockets.'''
+    left = MemorySocket(f'{name}:0', f'{name}:1')
+    right = MemorySocket(f'{name}:1', f'{name}:0')
+    left.peer, right.peer = right, left
+    return left, right
+
+
+def listen(name: str) -> MemoryListener:
+    '''Listen on `memory://name`.'''
+    if name in listeners:
+        raise OSError(EADDRINUSE, f'memory://{name} is already listened')
+    listener = listeners[name] = MemoryListener(name)
+    return listener
+
+
+def connect(name: str) -> MemorySocket:
+    '''Connect to `memory://name`, the connection is accepted at once.'''
+    listener = listeners.get(name)
+    if listener is None:
+        raise ConnectionRefusedError(
+            ECONNREFUSED, f'memory://{name} is not listened'
+        )
+    listener.count += 1
+    client = MemorySocket(f'{name}#{listener.count}', name)
+    server = MemorySocket(name, f'{name}#{listener.count}')
+    client.peer, server.peer = server, client
+    listener.backlog.append(server)
+    listener.wakeup()
+    return client
@@ -0,0 +1,288 @@
+'''Pre-fork master, hands accepted connections to the least loaded worker.
+
+The master owns the listeners and a unix stream socket at the handoff path.
+Every worker channel serving one of the master addresses connects to the
+handoff path instead of listening, and says which address it serves with
+one line. The master accepts the connections and passes the fds over
+`SCM_RIGHTS` to the worker with the fewest live connections, the workers
+report their live connections count back over the same socket, or `PAUSED`
+when they stop accepting, the paused workers are skipped.
+
+See ``pymaid worker run --master``.
+'''
+import array
+import os
+import socket
+import struct
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from pymaid.conf import settings
+from pymaid.core import get_running_loop
+
+from .base import logger
+from .raw import sock_connect, sock_listen
+from .utils.uri import URI, parse_uri
+
+__all__ = (
+    'PreforkMaster', 'handoff_key', 'connect_master', 'recv_handoff',
+    'report_load',
+)
+
+# live connections count reported by the workers
+LOAD = struct.Struct('!I')
+# reported instead of the load when the worker is paused
+PAUSED = 0xffffffff
+# max fds received per recvmsg
+MAX_FDS = 64
+
+
+def handoff_key(uri: URI) -> str:
+    '''Return the key matching the master and worker addresses.'''
+    return f'{uri.scheme}://{uri.address}'
+
+
+async def connect_master(path: str, key: str) -> socket.socket:
+    '''Connect to the master at `path`, and serve the address `key`.'''
+    sock = await sock_connect('unix', path)
+    sock.send(f'{key}\n'.encode())
+    return sock
+
+
+def send_fds(sock: socket.socket, data: bytes, fds: Sequence[int]) -> int:
+    '''Send `data` along with `fds` over the unix socket `sock`.
+
+    The same as `socket.send_fds` of python 3.9+.
+    '''
+    return sock.sendmsg([data], [(
+        socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds),
+    )])
+
+
+def recv_fds(
+    sock: socket.socket, bufsize: int, maxfds: int,
+) -> Tuple[bytes, List[int]]:
+    '''Receive up to `bufsize` bytes and `maxfds` fds from `sock`.
+
+    The same as `socket.recv_fds` of python 3.9+, without flags and address.
+    '''
+    fds = array.array('i')
+    data, ancdata, _, _ = sock.recvmsg(
+        bufsize, socket.CMSG_LEN(maxfds * fds.itemsize),
+    )
+    for level, kind, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(
+                cmsg_data[:len(cmsg_data) - len(cmsg_data) % fds.itemsize]
+            )
+    return data, list(fds)
+
+
+def recv_handoff(sock: socket.socket) -> Optional[List[socket.socket]]:
+    '''Receive the handed off connections, None if the master is gone.'''
+    socks = []
+    while True:
+        try:
+            data, fds = recv_fds(sock, MAX_FDS, MAX_FDS)
+        except (BlockingIOError, InterruptedError):
+            return socks
+        except OSError:
+            data, fds = b'', []
+        socks.extend(socket.socket(fileno=fd) for fd in fds)
+        if not data:
+            for conn in socks:
+                conn.close()
+            return None
+
+
+def report_load(sock: socket.socket, load: int):
+    '''Report `load`, the live connections count or `PAUSED`.'''
+    try:
+        sock.send(LOAD.pack(load))
+    except (BlockingIOError, InterruptedError):
+        # the master is busy, the next report will catch up
+        pass
+    except OSError as exc:
+        logger.warning(f'report load to master failed: {exc!r}')
+
+
+class WorkerLink:
+
+    __slots__ = ('sock', 'key', 'load', 'paused', 'buffer')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.key = None
+        self.load = 0
+        self.paused = False
+        self.buffer = b''
+
+    def __repr__(self):
+        return (
+            f'<WorkerLink fd={self.sock.fileno()} key={self.key} '
+            f'load={self.load} paused={self.paused}>'
+        )
+
+
+class PreforkMaster:
+    '''Accept connections of `addresses`, and hand them off to the workers.
+
+    Listeners of an address are only read when some worker serves it and
+    is not paused, the connections wait in the backlog otherwise.
+    '''
+
+    def __init__(self, addresses: Sequence[str], path: str):
+        self.keys = [handoff_key(parse_uri(address)) for address in addresses]
+        self.path = path
+        self.listeners: Dict[str, List[socket.socket]] = {}
+        self.workers: Dict[str, List[WorkerLink]] = {
+            key: [] for key in self.keys
+        }
+        self.handoff_count = 0
+        # keys whose listeners are read
+        self._listening: Set[str] = set()
+        self._server = None
+        self._loop = get_running_loop()
+
+    async def start(self):
+        for key in self.keys:
+            uri = parse_uri(key)
+            self.listeners[key] = await sock_listen(uri.scheme, uri.address)
+        self._server = (await sock_listen('unix', self.path))[0]
+        self._loop.add_reader(self._server.fileno(), self._accept_worker)
+        logger.info(f'{self!r} start')
+
+    def close(self):
+        loop = self._loop
+        for key, socks in self.listeners.items():
+            if key in self._listening:
+                for sock in socks:
+                    loop.remove_reader(sock.fileno())
+            for sock in socks:
+                sock.close()
+        self.listeners.clear()
+        self._listening.clear()
+        for links in self.workers.values():
+            for link in links:
+                loop.remove_reader(link.sock.fileno())
+                link.sock.close()
+            del links[:]
+        if self._server is not None:
+            loop.remove_reader(self._server.fileno())
+            self._server.close()
+            self._server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        logger.info(f'{self!r} closed')
+
+    def handoff(self, key: str, conn: socket.socket) -> bool:
+        '''Pass `conn` to the least loaded worker serving `key`.
+
+        The paused workers are skipped.
+        '''
+        links = [link for link in self.workers[key] if not link.paused]
+        for link in sorted(links, key=lambda link: link.load):
+            try:
+                send_fds(link.sock, b'\0', [conn.fileno()])
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError as exc:
+                logger.warning(f'{link!r} handoff failed: {exc!r}')
+                self._remove_worker(link)
+                continue
+            # until the worker reports
+            link.load += 1
+            self.handoff_count += 1
+            return True
+        return False
+
+    def _accept_worker(self):
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+                return
+            sock.setblocking(False)
+            link = WorkerLink(sock)
+            self._loop.add_reader(sock.fileno(), self._read_from_worker, link)
+
+    def _read_from_worker(self, link: WorkerLink):
+        try:
+            data = link.sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._remove_worker(link)
+            return
+        buffer = link.buffer + data
+        if link.key is None:
+            if b'\n' not in buffer:
+                link.buffer = buffer
+                return
+            key, _, buffer = buffer.partition(b'\n')
+            key = key.decode()
+            if key not in self.workers:
+                logger.warning(f'worker serves unknown address {key!r}')
+                self._remove_worker(link)
+                return
+            link.key = key
+            self.workers[key].append(link)
+            logger.info(f'{self!r} worker joined: {link!r}')
+        # only the latest report matters
+        count = len(buffer) // LOAD.size
+        if count:
+            load, = LOAD.unpack_from(buffer, (count - 1) * LOAD.size)
+            link.paused = load == PAUSED
+            if not link.paused:
+                link.load = load
+        link.buffer = buffer[count * LOAD.size:]
+        self._update_listening(link.key)
+
+    def _update_listening(self, key: str):
+        '''Read the listeners of `key` only if some worker can take more.'''
+        listening = any(not link.paused for link in self.workers[key])
+        if listening == (key in self._listening):
+            return
+        if listening:
+            self._listening.add(key)
+            for sock in self.listeners[key]:
+                self._loop.add_reader(
+                    sock.fileno(), self._read_from_listener, key, sock,
+                )
+        else:
+            self._listening.discard(key)
+            for sock in self.listeners[key]:
+                self._loop.remove_reader(sock.fileno())
+
+    def _read_from_listener(self, key: str, sock: socket.socket):
+        for _ in range(settings.pymaid.MAX_ACCEPT):
+            try:
+                conn, _ = sock.accept()
+            except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+                return
+            if not self.handoff(key, conn):
+                logger.warning(f'{self!r} no worker accepts {key}')
+            # the worker owns a duplicate now
+            conn.close()
+            if key not in self._listening:
+                return
+
+    def _remove_worker(self, link: WorkerLink):
+        self._loop.remove_reader(link.sock.fileno())
+        link.sock.close()
+        links = self.workers.get(link.key)
+        if not links or link not in links:
+            return
+        links.remove(link)
+        logger.info(f'{self!r} worker left: {link!r}')
+        if link.key in self.listeners:
+            self._update_listening(link.key)
+
+    def __repr__(self):
+        workers = sum(len(links) for links in self.workers.values())
+        return (
+            f'<PreforkMaster path={self.path} keys={self.keys} '
+            f'workers={workers} handoff_count={self.handoff_count}>'
+        )
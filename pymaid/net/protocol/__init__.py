@@ -1,6 +1,6 @@
 import abc
 
-from typing import Any, TypeVar
+from typing import Any, Sequence, TypeVar
 
 from pymaid.types import DataType
 
@@ -32,6 +32,15 @@ class Protocol(abc.ABC):
     def encode(cls, obj: Any) -> DataType:
         raise NotImplementedError
 
+    @classmethod
+    def encode_parts(cls, *args, **kwargs) -> Sequence[DataType]:
+        '''Same as :meth:`encode`, but return the unjoined buffers.
+
+        Transports can write the buffers with scatter-gather io,
+        override it if the protocol can avoid the joining copy.
+        '''
+        return (cls.encode(*args, **kwargs),)
+
     @abc.abstractclassmethod
     def decode(cls, data: DataType) -> Any:
         raise NotImplementedError
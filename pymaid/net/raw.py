@@ -7,11 +7,16 @@ import os
 import re
 import socket
 
+from collections import OrderedDict
 from errno import ENOTCONN, ECONNABORTED
-from typing import List
+from itertools import zip_longest
+from typing import List, Optional, Tuple
 
 from pymaid.conf import settings
-from pymaid.core import get_running_loop, run_in_threadpool, sleep
+from pymaid.core import get_running_loop, run_in_threadpool, shield, sleep
+from pymaid.core import gather, wait, FIRST_COMPLETED
+
+from . import memory
 
 HAS_IPv6_FAMILY = hasattr(socket, 'AF_INET6')
 HAS_IPv6_PROTOCOL = hasattr(socket, 'IPPROTO_IPV6')
@@ -39,9 +44,23 @@ NET_OPTS = {
     'unix': (socket.AF_UNIX, 0),
 }
 
+SOCKET_OPTS = {
+    socket.SOCK_STREAM: STREAM_OPTS,
+    socket.SOCK_DGRAM: DATAGRAM_OPTS,
+}
+
 ADDRESS_REGEX = re.compile(r'([\w\.]+):?(\w*)|\[([\w:]+)\]:?(\w*)')
 
 
+def split_address(address: str) -> Tuple[str, str]:
+    '''Split `host:port` or `[ipv6 host]:port` into host and port.'''
+    match = ADDRESS_REGEX.match(address)
+    if not match:
+        raise ValueError(f'invalid address: {address}')
+    host, port = (g for g in match.groups() if g)
+    return host, port
+
+
 async def getaddrinfo(
     address: str,
     family: socket.AddressFamily,
@@ -62,19 +81,95 @@ async def getaddrinfo(
         else:
             infos = [(socket.AF_UNIX, socket_kind, 0, '', address)]
     else:
-        match = ADDRESS_REGEX.match(address)
-        if not match:
-            raise ValueError(f'invalid address: {address}')
-        host, port = (g for g in match.groups() if g)
-        infos = await run_in_threadpool(
-            socket.getaddrinfo,
-            args=(host, port, family, socket_kind),
-            kwargs={'flags': flags},
+        host, port = split_address(address)
+        infos = await dns_cache.getaddrinfo(
+            host, port, family, socket_kind, flags
         )
-        infos = list(set(infos))
     return infos
 
 
+class DNSCache:
+    '''Cache of `socket.getaddrinfo` results.
+
+    Concurrent lookups of the same key share one resolution in the thread
+    pool. Results are cached for `DNS_CACHE_TTL` seconds, and resolution
+    failures (`socket.gaierror`) for `DNS_CACHE_NEGATIVE_TTL` seconds,
+    0 disables the caching.
+    '''
+
+    def __init__(self):
+        # {key: (expires_at, infos or gaierror)}
+        self.entries = OrderedDict()
+        # {key: task}
+        self.resolving = {}
+
+    async def getaddrinfo(
+        self,
+        host: str,
+        port: str,
+        family: socket.AddressFamily,
+        socket_kind: socket.SocketKind,
+        flags: int = 0,
+    ) -> list:
+        key = (host, port, family, socket_kind, flags)
+        loop = get_running_loop()
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > loop.time():
+                if isinstance(result, socket.gaierror):
+                    raise socket.gaierror(*result.args)
+                return list(result)
+            del self.entries[key]
+
+        task = self.resolving.get(key)
+        if task is None:
+            task = self.resolving[key] = loop.create_task(self._resolve(key))
+        # cancellation of one waiter should not affect the others
+        return list(await shield(task))
+
+    def flush(self, host: Optional[str] = None):
+        '''Drop the cached results of `host`, or all if host is None.'''
+        if host is None:
+            self.entries.clear()
+            return
+        for key in [key for key in self.entries if key[0] == host]:
+            del self.entries[key]
+
+    async def _resolve(self, key) -> list:
+        host, port, family, socket_kind, flags = key
+        try:
+            infos = await run_in_threadpool(
+                socket.getaddrinfo,
+                args=(host, port, family, socket_kind),
+                kwargs={'flags': flags},
+            )
+        except socket.gaierror as exc:
+            self._set(key, exc, settings.pymaid.DNS_CACHE_NEGATIVE_TTL)
+            raise
+        finally:
+            del self.resolving[key]
+        # remove duplicates and keep the order
+        infos = list(dict.fromkeys(infos))
+        self._set(key, infos, settings.pymaid.DNS_CACHE_TTL)
+        return infos
+
+    def _set(self, key, result, ttl: float):
+        if ttl <= 0:
+            return
+        entries = self.entries
+        entries[key] = (get_running_loop().time() + ttl, result)
+        entries.move_to_end(key)
+        while len(entries) > settings.pymaid.DNS_CACHE_MAXSIZE:
+            entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+dns_cache = DNSCache()
+
+
 def set_sock_options(sock: socket.socket):
     setsockopt = sock.setsockopt
 
@@ -84,62 +179,192 @@ def set_sock_options(sock: socket.socket):
         setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
 
+def get_net_opts(net: str, socket_kind: socket.SocketKind):
+    opts = SOCKET_OPTS.get(socket_kind)
+    if opts is None:
+        raise ValueError(
+            f'only support {SOCKET_OPTS.keys()} now, got {socket_kind}'
+        )
+    if net not in opts:
+        raise ValueError(f'only support {opts.keys()} now, got {net}')
+    return opts[net]
+
+
+def check_memory_kind(socket_kind: socket.SocketKind):
+    if socket_kind != socket.SOCK_STREAM:
+        raise ValueError(
+            f'memory net only supports streams, got {socket_kind}'
+        )
+
+
 async def sock_connect(
     net: str,
     address: str,
     flags: int = 0,
+    *,
+    socket_kind: socket.SocketKind = socket.SOCK_STREAM,
 ) -> socket.socket:
-    loop = get_running_loop()
-    err = None
-    if net not in STREAM_OPTS:
-        raise ValueError(f'only support {STREAM_OPTS.keys()} now, got {net}')
-    family, socket_kind = STREAM_OPTS[net]
+    '''Connect to `address`, return the connected socket.
+
+    When `address` resolves to several addresses, they are tried in the
+    Happy Eyeballs (RFC 8305) way: the address families are interleaved,
+    starting with the family that succeeded last time for the host, and the
+    next attempt starts `HAPPY_EYEBALLS_DELAY` seconds after the previous
+    one (or at once if it failed) without cancelling it. The first socket
+    connected wins, the others are closed.
+
+    `memory` net connects to the in-process listener named `address`.
+    '''
+    if net == 'memory':
+        check_memory_kind(socket_kind)
+        return memory.connect(address)
+    family, socket_kind = get_net_opts(net, socket_kind)
     addr_infos = await getaddrinfo(address, family, socket_kind, flags)
+    if not addr_infos:
+        raise socket.error('getaddrinfo returns an empty list')
+    host = address if address.startswith('/') else split_address(address)[0]
+    addr_infos = interleave_addr_infos(
+        addr_infos, preferred_families.get(host)
+    )
+    delay = settings.pymaid.HAPPY_EYEBALLS_DELAY
+    if len(addr_infos) == 1 or not delay:
+        sock = await connect_sequentially(addr_infos)
+    else:
+        sock = await connect_racing(addr_infos, delay)
+    if sock.family != socket.AF_UNIX:
+        preferred_families[host] = sock.family
+        preferred_families.move_to_end(host)
+        if len(preferred_families) > settings.pymaid.DNS_CACHE_MAXSIZE:
+            preferred_families.popitem(last=False)
+    return sock
+
+
+# {host: address family connected last time}
+preferred_families = OrderedDict()
+
+
+def interleave_addr_infos(
+    addr_infos: list, preferred_family: Optional[socket.AddressFamily] = None,
+) -> list:
+    '''Reorder `addr_infos` to alternate between the address families.
+
+    Starts with `preferred_family` if given, or the family of the first one.
+    '''
+    families = OrderedDict()
+    for addr_info in addr_infos:
+        families.setdefault(addr_info[0], []).append(addr_info)
+    if len(families) == 1:
+        return addr_infos
+    if preferred_family in families:
+        families.move_to_end(preferred_family, last=False)
+    return [
+        addr_info
+        for group in zip_longest(*families.values())
+        for addr_info in group if addr_info is not None
+    ]
+
+
+async def connect_sequentially(addr_infos: list) -> socket.socket:
+    err = None
     for addr_info in addr_infos:
-        retry = 3
-        af, kind, proto, canonname, sa = addr_info
-        sock = None
-        while 1:
-            try:
-                sock = socket.socket(af, kind, proto)
-                sock.setblocking(False)
-                await loop.sock_connect(sock, sa)
-                set_sock_options(sock)
-                # NOTE:
-                # When doing a lots connect to remote side under heavy pressure
-                # it would sometimes getting ENOTCONN when call getpeername.
-                # Check it here, if occured, raise it to retry.
-                # *WHY* sock_connect above does not handle this case?
-                # NOTE 2:
-                # This case appears to inconsistently occur with
-                # bound to a unix domain socket.
-                sock.getpeername()
-                # Break explicitly a reference cycle
-                err = None
-                return sock
-            except socket.error as _:
-                if _.errno == 107:
-                    # OSError: [Errno 107] Transport endpoint is not connected
-                    # special case when dealing with 107, it seems retry later
-                    # is ok.
-                    await sleep(0.001)
-                    continue
-                if _.errno in {ECONNABORTED, ENOTCONN} and retry:
-                    retry -= 1
-                    continue
-                err = _
-                if sock is not None:
-                    sock.close()
-                break
-
-    if err is not None:
         try:
-            raise err
-        finally:
-            # Break explicitly a reference cycle
-            err = None
-    else:
-        raise socket.error('getaddrinfo returns an empty list')
+            return await connect_addr_info(addr_info)
+        except socket.error as exc:
+            err = exc
+    try:
+        raise err
+    finally:
+        # Break explicitly a reference cycle
+        err = None
+
+
+async def connect_racing(addr_infos: list, delay: float) -> socket.socket:
+    loop = get_running_loop()
+    addr_infos = iter(addr_infos)
+    attempts = set()
+    err = None
+
+    def start_next_attempt() -> bool:
+        addr_info = next(addr_infos, None)
+        if addr_info is None:
+            return False
+        attempts.add(loop.create_task(connect_addr_info(addr_info)))
+        return True
+
+    has_next = start_next_attempt()
+    try:
+        while attempts:
+            done, _ = await wait(
+                attempts,
+                timeout=delay if has_next else None,
+                return_when=FIRST_COMPLETED,
+            )
+            failed = False
+            for attempt in done:
+                attempts.discard(attempt)
+                exc = attempt.exception()
+                if exc is None:
+                    return attempt.result()
+                if not isinstance(exc, socket.error):
+                    raise exc
+                err = exc
+                failed = True
+            # start the next one when timeout or the previous one failed
+            if has_next and (failed or not done):
+                has_next = start_next_attempt()
+        raise err
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+        for result in await gather(*attempts, return_exceptions=True):
+            if isinstance(result, socket.socket):
+                # connected but lost the race
+                result.close()
+        attempts.clear()
+        # Break explicitly a reference cycle
+        err = None
+
+
+async def connect_addr_info(addr_info) -> socket.socket:
+    loop = get_running_loop()
+    retry = 3
+    af, kind, proto, canonname, sa = addr_info
+    while 1:
+        sock = socket.socket(af, kind, proto)
+        try:
+            sock.setblocking(False)
+            if af == socket.AF_UNIX and kind == socket.SOCK_DGRAM:
+                # unix datagram client needs a local address to receive
+                # replies, autobind to an abstract address (linux only)
+                sock.bind('')
+            await loop.sock_connect(sock, sa)
+            set_sock_options(sock)
+            # NOTE:
+            # When doing a lots connect to remote side under heavy pressure
+            # it would sometimes getting ENOTCONN when call getpeername.
+            # Check it here, if occured, raise it to retry.
+            # *WHY* sock_connect above does not handle this case?
+            # NOTE 2:
+            # This case appears to inconsistently occur with
+            # bound to a unix domain socket.
+            sock.getpeername()
+            return sock
+        except socket.error as err:
+            sock.close()
+            if err.errno == 107:
+                # OSError: [Errno 107] Transport endpoint is not connected
+                # special case when dealing with 107, it seems retry later
+                # is ok.
+                await sleep(0.001)
+                continue
+            if err.errno in {ECONNABORTED, ENOTCONN} and retry:
+                retry -= 1
+                continue
+            raise
+        except BaseException:
+            # e.g. cancelled since another attempt won the race
+            sock.close()
+            raise
 
 
 async def sock_listen(
@@ -149,6 +374,8 @@ async def sock_listen(
     backlog: int = 4096,
     reuse_address: bool = True,
     reuse_port: bool = False,
+    *,
+    socket_kind: socket.SocketKind = socket.SOCK_STREAM,
 ) -> List[socket.socket]:
     '''Create sockets listening on `address`.
 
@@ -163,13 +390,18 @@ async def sock_listen(
 
     This is a coroutine.
 
+    Datagram sockets are only bound to `address`, there is no `listen`.
+
+    `memory` net listens in-process on the name `address`.
+
     :returns: `socket.socket` objects that listening on `address`.
     '''
-    if net not in STREAM_OPTS:
-        raise ValueError(f'only support {STREAM_OPTS.keys()} now, got {net}')
+    if net == 'memory':
+        check_memory_kind(socket_kind)
+        return [memory.listen(address)]
+    family, socket_kind = get_net_opts(net, socket_kind)
 
     sockets = []
-    family, socket_kind = STREAM_OPTS[net]
     addr_infos = await getaddrinfo(address, family, socket_kind, flags)
     try:
         for addr_info in addr_infos:
@@ -210,8 +442,9 @@ async def sock_listen(
                     f'error occured while binding on address {addr_info}: '
                     f'{err.strerror}, addr_infos={addr_infos}'
                 ) from None
-            # see https://github.com/golang/go/issues/5030
-            sock.listen(min(backlog, 65535))
+            if kind == socket.SOCK_STREAM:
+                # see https://github.com/golang/go/issues/5030
+                sock.listen(min(backlog, 65535))
             sockets.append(sock)
     except Exception:
         for sock in sockets:
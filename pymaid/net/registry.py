@@ -0,0 +1,145 @@
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+from .transport import TransportType
+
+__all__ = ('Registry',)
+
+
+class Registry:
+    '''Index the transports of a channel by tagged keys.
+
+    An index is either unique, one transport per key, e.g. the user id, see
+    :meth:`bind`; or multi-value, any transports per key, e.g. the groups,
+    see :meth:`add`. Lookups are O(1), and the transports are removed from
+    all the indexes once lost, see :meth:`remove`.
+
+    The queries can be the `transports` of broadcasting, e.g.::
+
+        channel.broadcast(data, channel.registry.select('room', room_id))
+    '''
+
+    def __init__(self, transports: Dict[int, TransportType]):
+        # the living transports of the channel
+        self.transports = transports
+        # {index: {key: transport}} or {index: {key: {id: transport}}}
+        self.indexes: Dict[str, Dict[Hashable, Any]] = {}
+        self.unique_indexes: Set[str] = set()
+        # {transport id: {index: {key}}}
+        self.tags: Dict[int, Dict[str, Set[Hashable]]] = {}
+
+    def bind(
+        self, conn: TransportType, index: str, key: Hashable,
+    ) -> Optional[TransportType]:
+        '''Bind `conn` to `key` of unique `index`.
+
+        The former key of `conn` in `index` is unbound.
+
+        :returns: the transport replaced, which has been unbound, or None.
+        '''
+        keys = self._tags(conn, index, unique=True)
+        if key in keys:
+            return
+        mapping = self.indexes[index]
+        for old_key in keys:
+            del mapping[old_key]
+        keys.clear()
+        replaced = mapping.get(key)
+        if replaced is not None:
+            self._untag(replaced, index, key)
+        mapping[key] = conn
+        keys.add(key)
+        return replaced
+
+    def add(self, conn: TransportType, index: str, key: Hashable):
+        '''Add `conn` to `key` of multi-value `index`.'''
+        keys = self._tags(conn, index, unique=False)
+        self.indexes[index].setdefault(key, {})[conn.id] = conn
+        keys.add(key)
+
+    def discard(
+        self,
+        conn: TransportType,
+        index: str,
+        key: Optional[Hashable] = None,
+    ):
+        '''Remove `conn` from `key` of `index`, or all the keys if None.'''
+        tags = self.tags.get(conn.id)
+        if not tags or index not in tags:
+            return
+        keys = tags[index] if key is None else {key} & tags[index]
+        for key in list(keys):
+            self._unindex(conn, index, key)
+            self._untag(conn, index, key)
+
+    def remove(self, conn: TransportType):
+        '''Remove `conn` from all the indexes, called when it is lost.'''
+        tags = self.tags.pop(conn.id, None)
+        if not tags:
+            return
+        for index, keys in tags.items():
+            for key in keys:
+                self._unindex(conn, index, key)
+
+    def get(self, index: str, key: Hashable) -> Optional[TransportType]:
+        '''Return the transport bound to `key` of unique `index`.'''
+        if index not in self.unique_indexes:
+            return None
+        return self.indexes[index].get(key)
+
+    def select(self, index: str, key: Hashable) -> List[TransportType]:
+        '''Return the transports of `key` of `index`.'''
+        value = self.indexes.get(index, {}).get(key)
+        if value is None:
+            return []
+        if index in self.unique_indexes:
+            return [value]
+        return list(value.values())
+
+    def keys(self, conn: TransportType, index: str) -> Set[Hashable]:
+        '''Return the keys of `conn` in `index`.'''
+        return set(self.tags.get(conn.id, {}).get(index, ()))
+
+    def count(self, index: str, key: Hashable) -> int:
+        value = self.indexes.get(index, {}).get(key)
+        if value is None:
+            return 0
+        return 1 if index in self.unique_indexes else len(value)
+
+    def _tags(
+        self, conn: TransportType, index: str, unique: bool,
+    ) -> Set[Hashable]:
+        if self.transports.get(conn.id) is not conn:
+            raise ValueError(f'{conn!r} is not a living transport')
+        if index not in self.indexes:
+            self.indexes[index] = {}
+            if unique:
+                self.unique_indexes.add(index)
+        elif (index in self.unique_indexes) != unique:
+            raise ValueError(
+                f'{index!r} is a {"multi-value" if unique else "unique"} index'
+            )
+        return self.tags.setdefault(conn.id, {}).setdefault(index, set())
+
+    def _untag(self, conn: TransportType, index: str, key: Hashable):
+        tags = self.tags[conn.id]
+        tags[index].discard(key)
+        if not tags[index]:
+            del tags[index]
+            if not tags:
+                del self.tags[conn.id]
+
+    def _unindex(self, conn: TransportType, index: str, key: Hashable):
+        mapping = self.indexes[index]
+        if index in self.unique_indexes:
+            del mapping[key]
+            return
+        group = mapping[key]
+        del group[conn.id]
+        if not group:
+            del mapping[key]
+
+    def __repr__(self):
+        return (
+            f'<Registry indexes={sorted(self.indexes)} '
+            f'transports={len(self.tags)}>'
+        )
@@ -1,25 +1,99 @@
 import abc
+import errno
+import io
+import os
 import socket
+import threading
 import ssl as _ssl
 
-from typing import Callable, List, Optional, TypeVar
+from itertools import islice
+from time import perf_counter
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
 
+from pymaid.core import run_in_threadpool
 from pymaid.types import DataType
 
+from .tls import TLSLayer, get_default_context, session_cache
 from .transport import SocketTransport
 from .utils.uri import URI
 
+HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+HAS_SENDFILE = hasattr(os, 'sendfile')
+try:
+    # max buffers passed to a single sendmsg call
+    SC_IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, OSError, ValueError):
+    SC_IOV_MAX = 16
+
+_local = threading.local()
+
+
+def get_recv_buffer(size: int) -> memoryview:
+    '''Return the recv buffer shared by the streams of current thread.
+
+    Data received into it is only valid during the data_received call,
+    so there is no need to keep a buffer for every stream.
+    '''
+    buffer = getattr(_local, 'recv_buffer', None)
+    if buffer is None or len(buffer) < size:
+        # the old buffer may be still in use by data_received
+        buffer = _local.recv_buffer = memoryview(bytearray(size))
+    return buffer
+
 
 class Stream(SocketTransport):
 
+    __slots__ = (
+        'initiative', 'ssl_context', 'ssl_handshake_timeout', 'uri',
+        '_write_empty_waiters', '_drain_waiters', '_writing_paused',
+        '_write_high_water', '_write_low_water', '_cork_handle',
+        '_recv_size', '_recv_shrink_count',
+        '_tls', '_sendfile_deferred', '_sendfile_waiter',
+    )
+
     MAX_SIZE = 256 * 1024  # recv size passed to sock.recv
     KEEP_OPEN_ON_EOF = False
 
+    # When enabled, data is read with `recv_into` into a buffer shared by
+    # all streams, and data_received gets a memoryview of the filled region.
+    # The memoryview is *only* valid during the data_received call,
+    # consumers that keep the data should copy it.
+    RECV_INTO = False
+    MIN_RECV_SIZE = 4 * 1024
+    INIT_RECV_SIZE = 16 * 1024
+    RECV_SHRINK_COUNT = 4
+
+    # Read budget of one reader wakeup, keep reading until the socket is
+    # drained or the budget is exhausted, then all data read is passed to
+    # data_received at once.
+    MAX_READS = 16
+    MAX_READ_BYTES = 1024 * 1024
+
+    # When enabled, writes issued during one event loop iteration are
+    # coalesced and sent by one flush scheduled with `call_soon`,
+    # unless buffered data reaches CORK_THRESHOLD which flushes at once.
+    AUTO_CORK = False
+    CORK_THRESHOLD = 64 * 1024
+
+    # Writers awaiting `write` are blocked when buffered data goes over
+    # WRITE_HIGH_WATER, until it drains to WRITE_LOW_WATER.
+    WRITE_HIGH_WATER = 64 * 1024
+    WRITE_LOW_WATER = 16 * 1024
+
+    # max bytes per `os.sendfile` call, and chunk size of the fallback path
+    SENDFILE_BLOCK_SIZE = 1024 * 1024
+    SENDFILE_CHUNK_SIZE = 256 * 1024
+
+    # used when ssl_handshake_timeout is not specified
+    SSL_HANDSHAKE_TIMEOUT = 60.0
+
     WRAP_METHODS = {
         '_data_received': 'data_received',
 
         'write': '_write',
         'write_sync': '_write_sync',
+        'writelines': '_writelines',
+        'writelines_sync': '_writelines_sync',
     }
 
     def __init__(
@@ -39,21 +113,46 @@ class Stream(SocketTransport):
         self.ssl_handshake_timeout = ssl_handshake_timeout
         self.uri = uri
 
-        self._write_empty_waiter = None
-
-        self.wrap_methods()
+        self._write_empty_waiters = None
+        self._drain_waiters = None
+        self._writing_paused = False
+        self.set_write_buffer_limits()
+        self._cork_handle = None
+        self._recv_size = self.INIT_RECV_SIZE
+        self._recv_shrink_count = 0
+        self._tls = None
+        self._sendfile_deferred = None
+        self._sendfile_waiter = None
 
-    def wrap_methods(self):
-        # for internal usage, can be overrided if needed
-        for target, source in self.WRAP_METHODS.items():
-            if not hasattr(self, target):
-                setattr(self, target, getattr(self, source))
+        if ssl_context:
+            self._start_tls(ssl_context)
 
     async def wait_for_ready(self):
-        '''Wait for connection made event if needed.'''
+        '''Wait for TLS handshake and connection made event if needed.'''
+        tls = self._tls
+        if tls is not None and not tls.handshake_done:
+            if tls.error is not None:
+                raise tls.error
+            if tls.waiter is None:
+                tls.waiter = self._loop.create_future()
+            await tls.waiter
         if hasattr(self, 'conn_made_event'):
             await self.conn_made_event.wait()
 
+    @property
+    def ssl_object(self) -> Optional[_ssl.SSLObject]:
+        return self._tls.sslobj if self._tls is not None else None
+
+    def close(self, exc=None):
+        tls = self._tls
+        if (tls is not None
+                and tls.handshake_done
+                and self.state < self.STATE.CLOSING):
+            self._save_tls_session()
+            # send close_notify
+            self._write_raw((tls.unwrap(),))
+        super().close(exc)
+
     def _write_sync(self, data: DataType) -> bool:
         '''Write data to low level socket, in a synchronized way.
 
@@ -62,31 +161,83 @@ class Stream(SocketTransport):
 
         There is another :meth:`write`, it will take care of write_buffer.
 
-        :returns: bool, indicate whether sent out all data this time or not.
+        :returns: bool, indicate whether sent out all data this time or not,
+            False when corked, see :meth:`writelines_sync`.
         '''
-        if not self.write_buffer:
-            # Optimization: try to send now.
-            try:
-                n = self._sock.send(data)
-            except (BlockingIOError, InterruptedError):
-                pass
-            except (SystemExit, KeyboardInterrupt):
-                raise
-            except BaseException as exc:
-                self._fatal_error(exc, 'Fatal write error on socket transport')
-                return
-            else:
-                data = data[n:]
-                if not data:
-                    if self.state == self.STATE.CLOSING:
-                        self._loop.call_soon(self._finnal_close, None)
-                    return True
-            # Not all was written; register write handler.
-            self._loop.add_writer(self._sock_fd, self._writer)
-
-        # Add it to the buffer.
-        self.write_buffer.extend(data)
-        return False
+        return self._writelines_sync((data,))
+
+    def _writelines_sync(self, parts: Sequence[DataType]) -> bool:
+        '''Write a sequence of buffers to low level socket, synchronized.
+
+        The buffers are queued by reference and flushed with a single
+        `sendmsg` call (scatter-gather), so callers can hand over header and
+        payload separately without joining them first.
+
+        When :attr:`AUTO_CORK` is enabled, data is only buffered here and
+        False is returned, the buffer is flushed at the end of loop iteration,
+        or at once when reaching :attr:`CORK_THRESHOLD` bytes.
+
+        :returns: bool, True only if all data is sent out this time, False if
+            some is still buffered, i.e. corked or waiting for the socket to
+            be writable, the buffered data is sent later as well.
+        '''
+        if self._sendfile_deferred is not None:
+            # keep the order, will be sent after sendfile finished
+            self._sendfile_deferred.extend(
+                data if isinstance(data, bytes) else bytes(data)
+                for data in parts
+            )
+            return False
+        return self._write_parts(parts)
+
+    def _write_parts(self, parts: Sequence[DataType]) -> bool:
+        tls = self._tls
+        if tls is not None:
+            if not tls.handshake_done:
+                pending_writes = tls.pending_writes
+                for data in parts:
+                    if not isinstance(data, bytes):
+                        data = bytes(data)
+                    pending_writes.append(data)
+                    # counted as buffered, so writers wait for the handshake
+                    # in drain() once over the high water mark
+                    self.write_buffer_size += len(data)
+                self._check_write_high_water()
+                return False
+            parts = (tls.encrypt(parts),)
+        return self._write_raw(parts)
+
+    def _write_raw(self, parts: Sequence[DataType]) -> bool:
+        pending = bool(self.write_buffer)
+        append = self._append_write_buffer
+        for data in parts:
+            append(data)
+        if (self._cork_handle is not None
+                and self.write_buffer_size >= self.CORK_THRESHOLD):
+            self._cork_handle.cancel()
+            self._cork_handle = None
+            pending = False
+
+        if self._cork_handle is not None:
+            # corked, data will be sent at the end of this loop iteration
+            sent = False
+        elif pending:
+            # writer is already registered, data will be sent in `_writer`
+            sent = False
+        elif self.AUTO_CORK and self.write_buffer_size < self.CORK_THRESHOLD:
+            self._cork_handle = self._loop.call_soon(self._uncork)
+            sent = False
+        else:
+            sent = self._flush_write_buffer()
+        self._check_write_high_water()
+        return sent
+
+    def _check_write_high_water(self):
+        if (not self._writing_paused
+                and self.write_buffer_size > self._write_high_water):
+            self._writing_paused = True
+            self.logger.debug(f'{self!r} pause writing')
+            self.pause_writing()
 
     async def _write(self, data: DataType):
         '''Write data to low level socket, in an asynchronized way.
@@ -95,13 +246,75 @@ class Stream(SocketTransport):
         Otherwise will add data to write_buffer, do it in write io Callable.
 
         In order to deal with the issue of `handle backpressure correctly`_
-        Will try to call await on the :meth:`wait_for_write_all` to wait for all
-        buffered data to send.
+        Will try to call await on the :meth:`drain` to wait for buffered data
+        dropping to the low water mark, when it is over the high water mark.
 
         .. _handle backpressure correctly: https://vorpus.org/blog/some-thoughts-on-asynchronous-api-design-in-a-post-asyncawait-world/#bug-1-backpressure  # noqa
         '''
-        if not self._write_sync(data):
-            await self.wait_for_write_all()
+        self._writelines_sync((data,))
+        if self._writing_paused:
+            await self.drain()
+
+    async def _writelines(self, parts: Sequence[DataType]):
+        '''Write a sequence of buffers to low level socket, asynchronized.
+
+        Same as :meth:`write` but without joining the buffers.
+        '''
+        self._writelines_sync(parts)
+        if self._writing_paused:
+            await self.drain()
+
+    def set_write_buffer_limits(
+        self, high: Optional[int] = None, low: Optional[int] = None,
+    ):
+        '''Set the high and low water marks for write flow control.
+
+        Default to :attr:`WRITE_HIGH_WATER` and :attr:`WRITE_LOW_WATER`.
+        '''
+        if high is None:
+            high = self.WRITE_HIGH_WATER if low is None else 4 * low
+        if low is None:
+            low = high // 4
+        if not high >= low >= 0:
+            raise ValueError(
+                f'high ({high!r}) must be >= low ({low!r}) must be >= 0'
+            )
+        self._write_high_water = high
+        self._write_low_water = low
+
+    def get_write_buffer_limits(self) -> Tuple[int, int]:
+        return self._write_low_water, self._write_high_water
+
+    def pause_writing(self):
+        '''Called when the write buffer goes over the high water mark.
+
+        Writers awaiting :meth:`drain` are blocked until :meth:`resume_writing`
+        Override it if needed.
+        '''
+
+    def resume_writing(self):
+        '''Called when the write buffer drains to the low water mark.
+
+        Override it if needed.
+        '''
+
+    async def drain(self):
+        '''Wait until the write buffer drains to the low water mark.
+
+        Return immediately if writing is not paused.
+        Any number of writers can wait at the same time.
+        '''
+        if not self._writing_paused:
+            return
+        waiter = self._loop.create_future()
+        if self._drain_waiters is None:
+            self._drain_waiters = []
+        self._drain_waiters.append(waiter)
+        try:
+            await waiter
+        finally:
+            if not waiter.done():
+                self._drain_waiters.remove(waiter)
 
     async def wait_for_write_all(self, timeout=None):
         '''Wait for all buffered data to send.
@@ -114,21 +327,148 @@ class Stream(SocketTransport):
         '''
         if not self.write_buffer:
             return
-        if self._write_empty_waiter is not None:
-            raise RuntimeError(
-                'cannot call multiple wait_for_write_all at the same time'
-            )
-        self._write_empty_waiter = self._loop.create_future()
+        waiter = self._loop.create_future()
+        if self._write_empty_waiters is None:
+            self._write_empty_waiters = []
+        self._write_empty_waiters.append(waiter)
         if timeout is not None:
-            timer = self._loop.call_later(
-                timeout, self._write_empty_waiter.cancel
-            )
+            timer = self._loop.call_later(timeout, waiter.cancel)
         try:
-            await self._write_empty_waiter
+            await waiter
         finally:
             if timeout is not None:
                 timer.cancel()
-            self._write_empty_waiter = None
+            if waiter in self._write_empty_waiters:
+                self._write_empty_waiters.remove(waiter)
+
+    async def sendfile(
+        self,
+        file: io.IOBase,
+        offset: int = 0,
+        count: Optional[int] = None,
+    ) -> int:
+        '''Send a file to the peer, using `os.sendfile` when possible.
+
+        Buffered data is sent before the file content, data written while
+        sending the file is buffered and sent after it.
+
+        Fall back to read the file chunk by chunk and write it, if
+        `os.sendfile` is not available, e.g. TLS is active or the file is not
+        a regular file.
+
+        :params file: file object opened in binary mode.
+        :params offset: where to start reading the file.
+        :params count: the total number of bytes to send, send until EOF if
+            it is None.
+        :returns: the total number of bytes sent.
+        '''
+        if count is not None and count <= 0:
+            if count < 0:
+                raise ValueError(f'count must be a positive integer: {count}')
+            return 0
+        if offset < 0:
+            raise ValueError(f'offset must be non-negative: {offset}')
+        if self._sendfile_deferred is not None:
+            raise RuntimeError(f'{self!r} sendfile is in progress')
+        self._check_writable()
+        await self.wait_for_write_all()
+        self._check_writable()
+
+        self._sendfile_deferred = []
+        try:
+            total = None
+            if HAS_SENDFILE and self._tls is None and self._sock_fd >= 0:
+                total = await self._sendfile_native(file, offset, count)
+            if total is None:
+                total = await self._sendfile_fallback(file, offset, count)
+            return total
+        finally:
+            deferred, self._sendfile_deferred = self._sendfile_deferred, None
+            if deferred and self.state < self.STATE.CLOSED:
+                self._write_parts(deferred)
+
+    def _check_writable(self):
+        if self.state >= self.STATE.CLOSING:
+            raise ConnectionResetError(f'{self!r} is closing')
+
+    async def _sendfile_native(
+        self, file: io.IOBase, offset: int, count: Optional[int],
+    ) -> Optional[int]:
+        '''Send file with `os.sendfile`.
+
+        :returns: the total number of bytes sent, or None if `os.sendfile`
+            is not supported for the file.
+        '''
+        try:
+            fd = file.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            return None
+        total = 0
+        block_size = self.SENDFILE_BLOCK_SIZE
+        try:
+            while count is None or total < count:
+                if count is not None:
+                    block_size = min(count - total, self.SENDFILE_BLOCK_SIZE)
+                self.send_calls += 1
+                try:
+                    sent = os.sendfile(self._sock_fd, fd, offset, block_size)
+                except (BlockingIOError, InterruptedError):
+                    await self._wait_for_writable()
+                    continue
+                except OSError as exc:
+                    if total == 0 and exc.errno in (
+                        errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK,
+                        errno.EOPNOTSUPP,
+                    ):
+                        # e.g. fd is not a regular file
+                        return None
+                    self._fatal_error(exc, 'Fatal error: sendfile failed.')
+                    raise
+                if not sent:
+                    # EOF
+                    break
+                offset += sent
+                total += sent
+                self.bytes_out += sent
+        finally:
+            if total:
+                file.seek(offset)
+        return total
+
+    async def _wait_for_writable(self):
+        self._check_writable()
+        waiter = self._sendfile_waiter = self._loop.create_future()
+        self._loop.add_writer(self._sock_fd, waiter.set_result, None)
+        try:
+            await waiter
+        finally:
+            self._sendfile_waiter = None
+            if self._loop is not None:
+                self._loop.remove_writer(self._sock_fd)
+        self._check_writable()
+
+    async def _sendfile_fallback(
+        self, file: io.IOBase, offset: int, count: Optional[int],
+    ) -> int:
+        chunk_size = self.SENDFILE_CHUNK_SIZE
+        if count is not None:
+            chunk_size = min(chunk_size, count)
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        total = 0
+        file.seek(offset)
+        while count is None or total < count:
+            if count is not None and count - total < chunk_size:
+                view = view[:count - total]
+            size = await run_in_threadpool(file.readinto, args=(view,))
+            if not size:
+                break
+            self._check_writable()
+            self._write_parts((view[:size],))
+            total += size
+            if self._writing_paused:
+                await self.drain()
+        return total
 
     # Public api for upper usage.
     @abc.abstractmethod
@@ -165,58 +505,349 @@ class Stream(SocketTransport):
             cb(self)
 
     def _reader(self):
-        try:
-            data = self._sock.recv(self.MAX_SIZE)
-        except (BlockingIOError, InterruptedError):
-            return
-        except (SystemExit, KeyboardInterrupt):
-            raise
-        except BaseException as exc:
-            self._fatal_error(exc, 'Fatal read error on socket transport')
+        if self.RECV_INTO:
+            self._read_into()
             return
 
-        if not data:
+        recv = self._sock.recv
+        chunks = []
+        nbytes = 0
+        calls = 0
+        eof = False
+        exc = None
+        for _ in range(self.MAX_READS):
+            size = min(self.MAX_SIZE, self.MAX_READ_BYTES - nbytes)
+            if size <= 0:
+                break
+            calls += 1
             try:
-                if self.eof_received() and not self.state < self.STATE.CLOSING:
-                    # We're keeping the connection open so can write more,
-                    # but we still can't receive more, so remove the reader.
-                    self._loop.remove_reader(self._sock_fd)
-                else:
-                    self.close()
+                data = recv(size)
+            except (BlockingIOError, InterruptedError):
+                break
             except (SystemExit, KeyboardInterrupt):
                 raise
-            except BaseException as exc:
-                self._fatal_error(exc, 'Fatal error: eof_received() failed.')
-            return
+            except BaseException as e:
+                exc = e
+                break
+            if not data:
+                eof = True
+                break
+            chunks.append(data)
+            nbytes += len(data)
+            if len(data) < size:
+                # short read, socket is drained, save a syscall of EAGAIN
+                break
+
+        self.recv_calls += calls
+        if chunks:
+            self.bytes_in += nbytes
+            self._handle_data(
+                chunks[0] if len(chunks) == 1 else b''.join(chunks)
+            )
+        self._handle_read_end(eof, exc)
+
+    def _read_into(self):
+        budget = self.MAX_READ_BYTES
+        buffer = get_recv_buffer(budget)
+        recv_into = self._sock.recv_into
+        offset = 0
+        calls = 0
+        eof = False
+        exc = None
+        for _ in range(self.MAX_READS):
+            size = min(self._recv_size, budget - offset)
+            if size <= 0:
+                break
+            calls += 1
+            try:
+                n = recv_into(buffer[offset:], size)
+            except (BlockingIOError, InterruptedError):
+                break
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as e:
+                exc = e
+                break
+            if not n:
+                eof = True
+                break
+            self._adjust_recv_size(n)
+            offset += n
+            if n < size:
+                # short read, socket is drained, save a syscall of EAGAIN
+                break
+
+        self.recv_calls += calls
+        if offset:
+            self.bytes_in += offset
+            self._handle_data(buffer[:offset])
+        self._handle_read_end(eof, exc)
+
+    def _handle_read_end(self, eof: bool, exc: Optional[BaseException]):
+        # data received before the error or eof is handled already,
+        # which may have closed the transport
+        if exc is not None:
+            if self.state < self.STATE.CLOSED:
+                self._fatal_error(
+                    exc, 'Fatal read error on socket transport'
+                )
+        elif eof and self.state < self.STATE.CLOSING:
+            self._handle_eof()
+
+    def _adjust_recv_size(self, n: int):
+        '''Grow or shrink the recv size according to recent reads.
+
+        The size is doubled at once when a read fills it up, and halved
+        after consecutive reads that use less than a quarter of it.
+        '''
+        size = self._recv_size
+        if n == size:
+            self._recv_shrink_count = 0
+            if size < self.MAX_SIZE:
+                self._recv_size = min(size * 2, self.MAX_SIZE)
+        elif n <= size >> 2 and size > self.MIN_RECV_SIZE:
+            self._recv_shrink_count += 1
+            if self._recv_shrink_count >= self.RECV_SHRINK_COUNT:
+                self._recv_shrink_count = 0
+                self._recv_size = max(size >> 1, self.MIN_RECV_SIZE)
+        else:
+            self._recv_shrink_count = 0
+
+    def _handle_eof(self):
+        try:
+            if self.eof_received() and not self.state < self.STATE.CLOSING:
+                # We're keeping the connection open so can write more,
+                # but we still can't receive more, so remove the reader.
+                self._reading_paused = None
+                self._loop.remove_reader(self._sock_fd)
+            else:
+                self.close()
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except BaseException as exc:
+            self._fatal_error(exc, 'Fatal error: eof_received() failed.')
 
+    def _handle_data(self, data: DataType):
+        start = perf_counter()
         try:
-            self._data_received(data)
+            if self._tls is not None:
+                self._tls_data_received(data)
+            else:
+                self._data_received(data)
         except (SystemExit, KeyboardInterrupt):
             raise
         except BaseException as exc:
             self._fatal_error(exc, 'Fatal error: data_received() call failed.')
+        self.data_received_time += perf_counter() - start
+
+    def _start_tls(self, ssl_context: _ssl.SSLContext):
+        if ssl_context is True:
+            ssl_context = self.ssl_context = get_default_context()
+        server_hostname = session = None
+        if self.initiative and self.uri is not None:
+            if self.uri.scheme != 'unix':
+                server_hostname = self.uri.host.strip('[]')
+            session = session_cache.get((ssl_context, self.uri.address))
+        tls = self._tls = TLSLayer(
+            ssl_context,
+            server_side=not self.initiative,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        tls.timer = self._loop.call_later(
+            self.ssl_handshake_timeout or self.SSL_HANDSHAKE_TIMEOUT,
+            self._tls_handshake_timeout,
+        )
+        try:
+            done = tls.do_handshake()
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except BaseException as exc:
+            self._fatal_error(exc, 'Fatal error: TLS handshake failed.')
+            return
+        self._write_raw((tls.read_outgoing(),))
+        if done:
+            self._tls_handshake_done()
+
+    def _tls_data_received(self, data: DataType):
+        tls = self._tls
+        handshake_done = tls.handshake_done
+        chunks, eof = tls.feed(data)
+        outgoing = tls.read_outgoing()
+        if outgoing:
+            self._write_raw((outgoing,))
+        if not handshake_done and tls.handshake_done:
+            self._tls_handshake_done()
+        if chunks:
+            self._data_received(
+                chunks[0] if len(chunks) == 1 else b''.join(chunks)
+            )
+        if eof and self.state < self.STATE.CLOSING:
+            self._handle_eof()
+
+    def _tls_handshake_done(self):
+        tls = self._tls
+        tls.timer.cancel()
+        tls.timer = None
+        self._save_tls_session()
+        self.logger.debug(
+            f'{self!r} TLS handshake done, '
+            f'version={tls.sslobj.version()} reused={tls.session_reused}'
+        )
+        pending_writes, tls.pending_writes = tls.pending_writes, []
+        if pending_writes:
+            # buffered again once encrypted, drained as they are sent
+            self.write_buffer_size -= sum(map(len, pending_writes))
+            self._write_raw((tls.encrypt(pending_writes),))
+        if tls.waiter is not None and not tls.waiter.done():
+            tls.waiter.set_result(None)
+
+    def _tls_handshake_timeout(self):
+        self._tls.timer = None
+        if self._tls.handshake_done:
+            return
+        timeout = self.ssl_handshake_timeout or self.SSL_HANDSHAKE_TIMEOUT
+        self._fatal_error(
+            ConnectionAbortedError(
+                f'TLS handshake is taking longer than {timeout} seconds: '
+                'aborting the connection'
+            ),
+            'Fatal error: TLS handshake timeout.',
+        )
 
-    def _writer(self):
-        assert self.write_buffer, 'data should not be empty'
+    def _save_tls_session(self):
+        tls = self._tls
+        if self.initiative and self.uri is not None and tls.handshake_done:
+            session_cache.set(
+                (self.ssl_context, self.uri.address), tls.session,
+            )
 
+    def _append_write_buffer(self, data: DataType):
+        if not isinstance(data, bytes):
+            if not isinstance(data, memoryview) or not data.readonly:
+                # caller may reuse mutable buffer, keep a snapshot
+                data = bytes(data)
+        if data:
+            if self.write_buffer is None:
+                self.write_buffer = self.BUFFER_FACTORY()
+            self.write_buffer.append(data)
+            self.write_buffer_size += len(data)
+
+    def _consume_write_buffer(self, size: int):
+        self.bytes_out += size
+        self.write_buffer_size -= size
+        buffer = self.write_buffer
+        while size:
+            data = buffer[0]
+            if size < len(data):
+                buffer[0] = memoryview(data)[size:]
+                break
+            buffer.popleft()
+            size -= len(data)
+        if (self._writing_paused
+                and self.write_buffer_size <= self._write_low_water):
+            self._writing_paused = False
+            self.logger.debug(f'{self!r} resume writing')
+            self._wakeup_waiters(self._drain_waiters)
+            self.resume_writing()
+
+    def _wakeup_waiters(self, waiters: Optional[List]):
+        if not waiters:
+            return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        waiters.clear()
+
+    def _send_write_buffer(self):
+        '''Send as much buffered data as possible with one syscall.
+
+        :returns: bool, False if fatal error occurred.
+        '''
+        buffer = self.write_buffer
+        self.send_calls += 1
         try:
-            n = self._sock.send(self.write_buffer)
+            if len(buffer) == 1 or not HAS_SENDMSG:
+                n = self._sock.send(buffer[0])
+            else:
+                n = self._sock.sendmsg(islice(buffer, SC_IOV_MAX))
         except (BlockingIOError, InterruptedError):
-            pass
+            return True
         except (SystemExit, KeyboardInterrupt):
             raise
         except BaseException as exc:
             self._fatal_error(exc, 'Fatal write error on socket transport')
-        else:
-            if n:
-                del self.write_buffer[:n]
-            if not self.write_buffer:
-                self._loop.remove_writer(self._sock_fd)
-                if self._write_empty_waiter:
-                    self._write_empty_waiter.set_result(None)
-                    self._write_empty_waiter = None
-                if self.state == self.STATE.CLOSING:
-                    self._finnal_close(None)
+            return False
+        if n:
+            self._consume_write_buffer(n)
+        return True
+
+    def _flush_write_buffer(self) -> bool:
+        '''Try to send buffered data now, register writer if not finished.
+
+        :returns: bool, indicate whether sent out all data this time or not.
+        '''
+        if not self.write_buffer:
+            return True
+        if not self._send_write_buffer():
+            return False
+        if not self.write_buffer:
+            self._write_buffer_drained()
+            if self.state == self.STATE.CLOSING:
+                self._loop.call_soon(self._finnal_close, None)
+            return True
+        # Not all was written; register write handler.
+        self._loop.add_writer(self._sock_fd, self._writer)
+        return False
+
+    def _uncork(self):
+        self._cork_handle = None
+        if self.state == self.STATE.CLOSED:
+            return
+        self._flush_write_buffer()
+
+    def _writer(self):
+        assert self.write_buffer, 'data should not be empty'
+
+        if not self._send_write_buffer():
+            return
+        if not self.write_buffer:
+            self._loop.remove_writer(self._sock_fd)
+            self._write_buffer_drained()
+            if self.state == self.STATE.CLOSING:
+                self._finnal_close(None)
+
+    def _write_buffer_drained(self):
+        # release the empty buffer, idle streams do not hold one
+        self.write_buffer = None
+        self._wakeup_waiters(self._write_empty_waiters)
+        if self._shutdown_pending:
+            self._shutdown_pending = False
+            self.shutdown()
+
+    def _finnal_close(self, exc=None):
+        waiter = self._sendfile_waiter
+        if waiter is not None and not waiter.done():
+            self._loop.remove_writer(self._sock_fd)
+            waiter.set_exception(
+                exc or ConnectionResetError('connection closed')
+            )
+        tls = self._tls
+        if tls is not None:
+            if tls.timer is not None:
+                tls.timer.cancel()
+                tls.timer = None
+            if not tls.handshake_done:
+                tls.error = exc or ConnectionResetError(
+                    'connection lost during TLS handshake'
+                )
+                if tls.waiter is not None and not tls.waiter.done():
+                    tls.waiter.set_exception(tls.error)
+        super()._finnal_close(exc)
+        # buffered data will never be sent, do not block writers
+        self._writing_paused = False
+        self._wakeup_waiters(self._drain_waiters)
+        self._wakeup_waiters(self._write_empty_waiters)
 
 
 StreamType = TypeVar('StreamType', bound=Stream)
@@ -0,0 +1,165 @@
+'''TLS layer for stream transports.
+
+Based on `ssl.MemoryBIO`, the transport keeps doing non-blocking io on the
+raw socket, and feeds/drains the encrypted bytes through the memory bios.
+
+Inspired by standard lib `asyncio.sslproto`.
+'''
+import ssl as _ssl
+
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from pymaid.types import DataType
+
+__all__ = ('SessionCache', 'TLSLayer', 'get_default_context', 'session_cache')
+
+# sessions are bound to the contexts creating them
+SessionKey = Tuple[_ssl.SSLContext, str]
+
+
+class SessionCache:
+    '''Client side TLS session cache, keyed by `(SSLContext, URI.address)`.
+
+    Reconnecting to the same address with the same context will try to
+    resume the cached session instead of doing a full handshake, sessions
+    cannot be used by the other contexts.
+    '''
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.sessions = OrderedDict()
+
+    def get(self, key: SessionKey) -> Optional[_ssl.SSLSession]:
+        session = self.sessions.get(key)
+        if session is not None:
+            self.sessions.move_to_end(key)
+        return session
+
+    def set(self, key: SessionKey, session: Optional[_ssl.SSLSession]):
+        if session is None:
+            return
+        sessions = self.sessions
+        sessions[key] = session
+        sessions.move_to_end(key)
+        while len(sessions) > self.maxsize:
+            sessions.popitem(last=False)
+
+    def remove(self, key: SessionKey):
+        self.sessions.pop(key, None)
+
+    def clear(self):
+        self.sessions.clear()
+
+    def __len__(self):
+        return len(self.sessions)
+
+
+session_cache = SessionCache()
+default_context = None
+
+
+def get_default_context() -> _ssl.SSLContext:
+    '''Return the shared client context of `ssl_context=True`.
+
+    Shared, so the connections can resume the sessions of each other.
+    '''
+    global default_context
+    if default_context is None:
+        default_context = _ssl.create_default_context()
+    return default_context
+
+
+class TLSLayer:
+    '''Wraps `ssl.SSLObject` with a pair of memory bios.
+
+    Application data written before the handshake completed is kept in
+    `pending_writes`, and will be encrypted after handshake done.
+    '''
+
+    READ_SIZE = 256 * 1024
+
+    def __init__(
+        self,
+        context: _ssl.SSLContext,
+        *,
+        server_side: bool,
+        server_hostname: Optional[str] = None,
+        session: Optional[_ssl.SSLSession] = None,
+    ):
+        self.incoming = _ssl.MemoryBIO()
+        self.outgoing = _ssl.MemoryBIO()
+        self.sslobj = context.wrap_bio(
+            self.incoming,
+            self.outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        self.handshake_done = False
+        self.pending_writes = []
+        self.waiter = None
+        self.timer = None
+        self.error = None
+
+    def do_handshake(self) -> bool:
+        '''Step the handshake, return whether it is done.
+
+        :raises: `ssl.SSLError` if handshake failed.
+        '''
+        try:
+            self.sslobj.do_handshake()
+        except _ssl.SSLWantReadError:
+            return False
+        self.handshake_done = True
+        return True
+
+    def feed(self, data: DataType) -> Tuple[List[bytes], bool]:
+        '''Feed encrypted data, return decrypted chunks and eof flag.
+
+        eof flag is True when received `close_notify` from the peer.
+        '''
+        self.incoming.write(data)
+        chunks = []
+        if not self.handshake_done and not self.do_handshake():
+            return chunks, False
+        read = self.sslobj.read
+        size = self.READ_SIZE
+        try:
+            while 1:
+                chunk = read(size)
+                if not chunk:
+                    return chunks, True
+                chunks.append(chunk)
+        except _ssl.SSLWantReadError:
+            pass
+        except _ssl.SSLZeroReturnError:
+            return chunks, True
+        return chunks, False
+
+    def encrypt(self, parts: Sequence[DataType]) -> bytes:
+        '''Encrypt application data, return the encrypted bytes to send.'''
+        write = self.sslobj.write
+        for data in parts:
+            if data:
+                write(data)
+        return self.outgoing.read()
+
+    def read_outgoing(self) -> bytes:
+        return self.outgoing.read()
+
+    def unwrap(self) -> bytes:
+        '''Start the closing handshake, return `close_notify` to send.'''
+        try:
+            self.sslobj.unwrap()
+        except (_ssl.SSLError, ValueError):
+            pass
+        return self.outgoing.read()
+
+    @property
+    def session(self) -> Optional[_ssl.SSLSession]:
+        return self.sslobj.session
+
+    @property
+    def session_reused(self) -> bool:
+        return self.sslobj.session_reused
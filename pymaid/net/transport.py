@@ -2,7 +2,8 @@ import abc
 import socket
 import warnings
 
-from typing import Callable, List, Optional, TypeVar
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, TypeVar
 
 from pymaid.core import get_running_loop, Event
 
@@ -19,8 +20,15 @@ class PipeTransport(abc.ABCMeta):
                 f'{other.__name__} already pipeline with transport '
                 f'{other.__bases__}'
             )
+        # mixins declare empty `__slots__` and list their attributes in
+        # `SLOTS`, since only one base can have a non-empty slot layout
         return type(
-            other.__name__, (other, self), {'__module__': other.__module__}
+            other.__name__,
+            (other, self),
+            {
+                '__module__': other.__module__,
+                '__slots__': getattr(other, 'SLOTS', ()),
+            },
         )
 
     def __ror__(self, other):
@@ -32,6 +40,8 @@ class PipeTransport(abc.ABCMeta):
 
 class Transport(metaclass=PipeTransport):
 
+    __slots__ = ()
+
     logger = logger
     ID = 0
 
@@ -53,13 +63,57 @@ class SocketTransport(Transport):
 
     Wraps low level socket.
     Wrapped some attrs and methods, added some apis like `asyncio` `protocols`.
+
+    Uses `__slots__` and creates callbacks lists, events and buffers lazily,
+    keep the footprint of idle transports small. Extra attributes can still
+    be set, e.g. tagging the connections, the instance dict is only created
+    on the first assignment.
     '''
 
+    __slots__ = (
+        '_loop', '_sock', '_sock_fd', 'id', 'peername', 'sockname', 'state',
+        '_on_open', '_on_close', '_closed_event',
+        'write_buffer', 'write_buffer_size',
+        '_reading_paused', '_shutdown_pending',
+        'bytes_in', 'bytes_out', 'messages_in', 'messages_out',
+        'recv_calls', 'send_calls', 'data_received_time',
+        # set by :class:`pymaid.ext.monitor.middleware.HeartbeatMiddleware`,
+        # unset unless it is used
+        'heartbeat_count', 'heartbeat_timer', 'clear_heartbeat_counter',
+        # allow extra attrs, e.g. set by users and other middlewares
+        '__dict__', '__weakref__',
+    )
+
     WRAPPED_ATTRS = ('family', 'proto', 'timeout', 'type')
     WRAPPED_METHODS = ('getsockopt', 'setsockopt')
+    # {target: source}, target is aliased to source at class level,
+    # unless target is implemented explicitly
+    WRAP_METHODS = {}
     STATE = TransportState
-
-    BUFFER_FACTORY = bytearray
+    # counters reported by :meth:`get_stats`
+    STATS_FIELDS = (
+        'bytes_in', 'bytes_out', 'messages_in', 'messages_out',
+        'recv_calls', 'send_calls', 'data_received_time',
+    )
+
+    BUFFER_FACTORY = deque
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.wrap_methods()
+
+    @classmethod
+    def wrap_methods(cls):
+        # for internal usage, can be overrided if needed
+        for target, source in cls.WRAP_METHODS.items():
+            for klass in cls.__mro__:
+                if target in klass.__dict__:
+                    break
+            else:
+                klass = None
+            if (klass is None
+                    or klass.__dict__[target] is getattr(klass, source)):
+                setattr(cls, target, getattr(cls, source))
 
     def __init__(
         self,
@@ -68,16 +122,31 @@ class SocketTransport(Transport):
         on_open: Optional[List[Callable]] = None,
         on_close: Optional[List[Callable]] = None,
     ):
-        self._loop = get_running_loop()
+        loop = get_running_loop()
+        # sockets not backed by the kernel, e.g. memory sockets, drive the io
+        # callbacks by themselves, through a proxy of the loop
+        wrap_loop = getattr(sock, 'wrap_loop', None)
+        self._loop = loop if wrap_loop is None else wrap_loop(loop)
         self.wrap_sock(sock)
         self.__class__.ID += 1
         self.id = self.__class__.ID
 
-        self.on_open = on_open or []
-        self.on_close = on_close or []
-        self.closed_event = Event()
+        self._on_open = on_open or None
+        self._on_close = on_close or None
+        self._closed_event = None
         self.state = self.STATE.OPENED
-        self.write_buffer = self.BUFFER_FACTORY()
+        # created on demand, released once drained
+        self.write_buffer = None
+        self.write_buffer_size = 0
+        # None means reading is finished, e.g. eof received
+        self._reading_paused = False
+        self._shutdown_pending = False
+        # traffic counters, `*_calls` count the socket syscalls, and
+        # `data_received_time` is the seconds spent in the data callbacks
+        self.bytes_in = self.bytes_out = 0
+        self.messages_in = self.messages_out = 0
+        self.recv_calls = self.send_calls = 0
+        self.data_received_time = 0.0
         self.init()
 
     def init(self):
@@ -86,14 +155,79 @@ class SocketTransport(Transport):
     def wrap_sock(self, sock: socket.socket):
         self._sock = sock
         self._sock_fd = sock.fileno()
-        self._wrap_sock(self.WRAPPED_ATTRS)
-        self._wrap_sock(self.WRAPPED_METHODS)
 
         self.peername = sock.getpeername()
         self.sockname = sock.getsockname()
         self._loop.add_reader(self._sock_fd, self._reader)
 
+    def __getattr__(self, name):
+        # wrapped socket attrs and methods, only reached when normal lookup
+        # failed, so there is no per instance copy
+        if name in self.WRAPPED_ATTRS or name in self.WRAPPED_METHODS:
+            sock = self._sock
+            if sock is not None:
+                return getattr(sock, name)
+        raise AttributeError(
+            f'{self.__class__.__name__!r} object has no attribute {name!r}'
+        )
+
+    @property
+    def on_open(self) -> List[Callable]:
+        if self._on_open is None:
+            self._on_open = []
+        return self._on_open
+
+    @property
+    def on_close(self) -> List[Callable]:
+        if self._on_close is None:
+            self._on_close = []
+        return self._on_close
+
+    @property
+    def closed_event(self) -> Event:
+        if self._closed_event is None:
+            self._closed_event = Event()
+            if self.state == self.STATE.CLOSED:
+                self._closed_event.set()
+        return self._closed_event
+
+    def get_stats(self) -> Dict[str, Any]:
+        '''Return a snapshot of the traffic counters.'''
+        stats = {'id': self.id, 'peername': self.peername}
+        for name in self.STATS_FIELDS:
+            stats[name] = getattr(self, name)
+        stats['buffered_bytes'] = self.write_buffer_size
+        return stats
+
+    def pause_reading(self):
+        '''Stop reading from low level socket until :meth:`resume_reading`.'''
+        if self._reading_paused is not False:
+            return
+        if self.state >= self.STATE.CLOSING:
+            return
+        self._reading_paused = True
+        self._loop.remove_reader(self._sock_fd)
+        self.logger.debug(f'{self!r} pause reading')
+
+    def resume_reading(self):
+        '''Resume reading from low level socket.'''
+        if self._reading_paused is not True:
+            return
+        if self.state >= self.STATE.CLOSING:
+            return
+        self._reading_paused = False
+        self._loop.add_reader(self._sock_fd, self._reader)
+        self.logger.debug(f'{self!r} resume reading')
+
+    @property
+    def is_reading(self) -> bool:
+        return self._reading_paused is False
+
     def shutdown(self, reason=None):
+        if self.write_buffer:
+            # shutdown after buffered data sent
+            self._shutdown_pending = True
+            return
         self._loop.remove_writer(self._sock_fd)
         self._sock.shutdown(socket.SHUT_WR)
 
@@ -111,12 +245,10 @@ class SocketTransport(Transport):
             self._finnal_close(exc)
 
     async def wait_for_closed(self):
+        if self.state == self.STATE.CLOSED:
+            return
         await self.closed_event.wait()
 
-    def _wrap_sock(self, keys: List[str]):
-        for key in keys:
-            setattr(self, key, getattr(self._sock, key))
-
     def _reader(self):
         raise NotImplementedError('_reader')
 
@@ -125,7 +257,8 @@ class SocketTransport(Transport):
             return
         self.logger.debug(f'{self!r} force close exc={exc}')
         if self.write_buffer:
-            self.write_buffer.clear()
+            self.write_buffer = None
+            self.write_buffer_size = 0
             self._loop.remove_writer(self._sock_fd)
         self._loop.remove_reader(self._sock_fd)
         # self._loop.call_soon(self._finnal_close, exc)
@@ -134,14 +267,15 @@ class SocketTransport(Transport):
     def _finnal_close(self, exc=None):
         self.logger.info(f'{self!r} final close exc={exc}')
         self.state = self.STATE.CLOSED
-        for cb in self.on_close:
-            cb(self, exc)
+        if self._on_close is not None:
+            for cb in self._on_close:
+                cb(self, exc)
         self._sock.close()
         self._sock = None
         self._loop = None
-        del self.on_open
-        del self.on_close
-        self.closed_event.set()
+        self._on_open = self._on_close = None
+        if self._closed_event is not None:
+            self._closed_event.set()
 
     def __del__(self, _warn=warnings.warn):
         if getattr(self, '_sock', None):
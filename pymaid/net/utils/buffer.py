@@ -0,0 +1,91 @@
+from pymaid.types import DataType
+
+__all__ = ('ReadBuffer',)
+
+
+class ReadBuffer:
+    '''Received data not consumed yet, for the protocol parsers.
+
+    Data lives in `data[offset:end]`, the bytearray is reused across the
+    reads: once all data is consumed, both are reset and the next read is
+    copied to the start, so the common case allocates nothing per read.
+    Otherwise the dead prefix is dropped lazily, once it exceeds
+    `COMPACT_THRESHOLD` bytes and the live data, so each byte is moved a
+    constant number of times however many reads a packet spans.
+
+    Views from :meth:`view`, e.g. the decoded payloads, stay valid as long
+    as they are referenced: when the bytes cannot be overwritten since they
+    are exported, the live data is copied into a new buffer instead.
+    '''
+
+    __slots__ = ('data', 'offset', 'end')
+
+    COMPACT_THRESHOLD = 64 * 1024
+    # capacity kept for reuse once all consumed, larger ones are dropped
+    KEEP_CAPACITY = 256 * 1024
+
+    def __init__(self, data: DataType = b''):
+        self.data = bytearray(data)
+        self.offset = 0
+        self.end = len(self.data)
+
+    def extend(self, data: DataType):
+        size = len(data)
+        end = self.end + size
+        if end > len(self.data):
+            self._reserve(size)
+            end = self.end + size
+        self.data[self.end:end] = data
+        self.end = end
+
+    def view(self) -> memoryview:
+        '''Return a view of the live data, release it after parsing.'''
+        return memoryview(self.data)[self.offset:self.end]
+
+    def consume(self, size: int):
+        self.offset += size
+        offset = self.offset
+        if offset == self.end:
+            # all consumed, reuse from the start
+            if len(self.data) > self.KEEP_CAPACITY or self._exported():
+                self.data = bytearray()
+            self.offset = self.end = 0
+        elif offset >= self.COMPACT_THRESHOLD and offset >= self.end >> 1:
+            self._compact(len(self.data))
+
+    def _reserve(self, size: int):
+        '''Make room for `size` more bytes after the live data.'''
+        live = self.end - self.offset
+        capacity = len(self.data)
+        if live + size > capacity or not self.offset:
+            capacity = max(capacity * 2, live + size)
+        self._compact(capacity)
+
+    def _compact(self, capacity: int):
+        '''Move the live data to the start of a buffer of `capacity` bytes.'''
+        data, offset, end = self.data, self.offset, self.end
+        live = end - offset
+        if capacity == len(data) and not self._exported():
+            view = memoryview(data)
+            view[:live] = view[offset:end]
+            view.release()
+        else:
+            self.data = bytearray(capacity)
+            self.data[:live] = memoryview(data)[offset:end]
+        self.offset, self.end = 0, live
+
+    def _exported(self) -> bool:
+        # resizing fails if exported, no reallocation after the first time
+        data = self.data
+        try:
+            data.append(0)
+        except BufferError:
+            return True
+        del data[-1]
+        return False
+
+    def __len__(self):
+        return self.end - self.offset
+
+    def __repr__(self):
+        return f'<ReadBuffer size={len(self)} offset={self.offset}>'
@@ -12,6 +12,7 @@ DELIMS = ":/?#[]@!$&'()*+,;="
 SCHEMES = {
     'unix', 'tcp', 'tcp4', 'tcp6', 'udp', 'udp4', 'udp6',
     'http', 'https', 'ws', 'wss',
+    'memory',  # in-process streams, see `pymaid.net.memory`
     '',  # for url from content like `GET /whatever HTTP/1.1`
 }
 
@@ -22,7 +23,7 @@ class URI:
 
     :param str scheme: scheme
     :param str host: lower-case host
-    :param int port: None for `unix` scheme,
+    :param int port: None for `unix` and `memory` scheme,
         otherwise always set even if it's the default
     :param str path: path, `/` for default
     :param str query: optional query
@@ -88,6 +89,15 @@ def parse_uri(uri: str) -> URI:
         # used absolute path as host for unix scheme
         host = path
         path = '/'
+    elif 'memory' == scheme:
+        port = None
+        # listened and dialled by name
+        if not parsed.netloc:
+            raise ValueError(
+                '`memory` scheme should be with name, e.g. memory://name; '
+                f'got uri={uri!r} parsed={parsed!r}'
+            )
+        host = parsed.netloc
     else:
         port = parsed.port or (443 if secure else 80)
 
@@ -1,10 +1,11 @@
 from base64 import b64encode
-from io import BytesIO
 from os import urandom
+from typing import Sequence
 
 from pymaid.core import Event
 from pymaid.net.http.h11 import RequestParser, ResponseParser
 from pymaid.net.stream import Stream
+from pymaid.net.utils.buffer import ReadBuffer
 from pymaid.net.utils.uri import URI
 from pymaid.types import DataType
 from pymaid.utils.logger import logger_wrapper
@@ -24,6 +25,8 @@ class WebSocket(Stream):
     PROTOCOL = WSProtocol
     KEEP_OPEN_ON_EOF = True
     REQUIRE_MASK_CLIENT_FRAMES = True
+    # frames are always copied into the read buffer before parsing
+    RECV_INTO = True
 
     def __init__(
         self,
@@ -54,7 +57,7 @@ class WebSocket(Stream):
             if uri.query:
                 self.resource = f'{uri.path}?{uri.query}'.encode('utf-8')
         self.ws_kwargs = kwargs
-        self.__read_buffer = BytesIO()
+        self.__read_buffer = ReadBuffer()
         if self.initiative:
             self._start_handshake()
             self._data_received = self._parse_upgrade_response
@@ -83,6 +86,13 @@ class WebSocket(Stream):
             )
         )
 
+    async def writelines(self, parts: Sequence[DataType]):
+        '''Send a frame with all parts joined as its payload.'''
+        await self.write(b''.join(parts))
+
+    def writelines_sync(self, parts: Sequence[DataType]):
+        self.write_sync(b''.join(parts))
+
     def mark_ready(self):
         # we are finished upgrade handshake
         self.state = self.STATE.CONNECTED
@@ -130,20 +140,14 @@ class WebSocket(Stream):
 
         NOTE: correct frames will be lost if some frames are incorrect.
         '''
-        buf = self.__read_buffer
-        buf.seek(0, 2)
-        buf.write(data)
-        buf.seek(0, 0)
-
-        mbuf = buf.getbuffer()
+        buffer = self.__read_buffer
+        buffer.extend(data)
+        view = buffer.view()
         try:
-            used_size, frames = self.PROTOCOL.feed_data(mbuf)
+            used_size, frames = self.PROTOCOL.feed_data(view)
         finally:
-            mbuf.release()
+            view.release()
         if frames:
-            buf.seek(used_size, 0)
-            self.__read_buffer = BytesIO()
-            self.__read_buffer.write(buf.read())
             try:
                 self._handle_frames(frames)
             except ProtocolError as ex:
@@ -155,6 +159,11 @@ class WebSocket(Stream):
                     )
                 )
                 self.close(ex.reason)
+            finally:
+                # unmasked payloads of unfinished messages are still views of
+                # the buffer, which keeps them valid
+                del frames
+                buffer.consume(used_size)
 
     def _handle_frames(self, frames) -> bytes:
         opcode = self.current_opcode
@@ -240,9 +249,7 @@ class WebSocket(Stream):
         self._write_sync(resp)
 
         self.mark_ready()
-        self.__read_buffer = BytesIO()
-        if consumed < len(data):
-            self.__read_buffer.write(data[consumed:])
+        self.__read_buffer = ReadBuffer(data[consumed:])
         return True
 
     def _parse_upgrade_response(self, data: DataType) -> bool:
@@ -257,9 +264,7 @@ class WebSocket(Stream):
         self.PROTOCOL.validate_upgrade(ins.headers, self.secret_key)
 
         self.mark_ready()
-        self.__read_buffer = BytesIO()
-        if consumed < len(data):
-            self.__read_buffer.write(data[consumed:])
+        self.__read_buffer = ReadBuffer(data[consumed:])
         return True
 
     def _start_handshake(self):
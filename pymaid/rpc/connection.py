@@ -1,6 +1,9 @@
-from typing import TypeVar
+from typing import Any, Dict, TypeVar
 
 from pymaid.net.transport import Transport
+from pymaid.net.utils.buffer import ReadBuffer
+from pymaid.types import DataType
+from pymaid.utils.histogram import Histogram
 
 
 class Connection:
@@ -9,7 +12,19 @@ class Connection:
     It holds the low level transport.
     '''
 
+    # Connection is a mixin, attributes are declared in SLOTS and applied to
+    # the piped class, e.g. `Stream | Connection`
+    __slots__ = ()
+    SLOTS = (
+        'protocol', 'handler', 'router', 'context_manager', 'rtt',
+        '_Connection__read_buffer', '_Connection__read_throttles',
+        '_Connection__throttled_contexts', '_Connection__recv_waiters',
+        '_Connection__reading_throttled',
+    )
+
     KEEP_OPEN_ON_EOF = True
+    # data is always copied into the read buffer before parsing
+    RECV_INTO = True
 
     def __new__(cls, *args, **kwargs):
         if not issubclass(cls, Transport):
@@ -35,24 +50,148 @@ class Connection:
         self.handler = handler
         self.router = router
         self.context_manager = context_manager
-        self.__read_buffer = bytearray()
+        # round trip time of outbound calls, created on first observation
+        self.rtt = None
+        # created on demand, reused until closed
+        self.__read_buffer = None
+        self.__read_throttles = None
+        self.__throttled_contexts = None
+        # contexts waiting for the messages of this connection
+        self.__recv_waiters = 0
+        self.__reading_throttled = False
+        handler.on_pause.append(self.throttle_reading)
+        handler.on_resume.append(self.unthrottle_reading)
 
-    def data_received(self, data: bytes):
+    def data_received(self, data: DataType):
         '''Received data from low level transport'''
-        self.__read_buffer.extend(data)
-        used_size, messages = self.protocol.feed_data(self.__read_buffer)
+        buffer = self.__read_buffer
+        if buffer is None:
+            buffer = self.__read_buffer = ReadBuffer(data)
+        else:
+            buffer.extend(data)
+        view = buffer.view()
+        try:
+            used_size, messages = self.protocol.feed_data(view)
+        finally:
+            view.release()
         if used_size:
-            self.__read_buffer = self.__read_buffer[used_size:]
-            for task in self.router.feed_messages(self, messages):
+            self.messages_in += len(messages)
+            try:
+                tasks = self.feed_messages(messages)
+            finally:
+                # payloads are deserialized when fed to the contexts, drop
+                # the views before consuming, so the buffer can be reused
+                del messages
+                buffer.consume(used_size)
+            for task in tasks:
                 self.handler.submit(task)
 
+    def feed_messages(self, messages: list) -> list:
+        '''Route the decoded messages, returns the tasks to run.'''
+        return self.router.feed_messages(self, messages)
+
+    def throttle_reading(self, source):
+        '''Pause reading since `source` has too much queued work.
+
+        Reading is resumed after all sources called :meth:`unthrottle_reading`
+
+        The handler does not pause reading while some contexts are waiting for
+        the messages of this connection, since the handler may be blocked by
+        them, e.g. the serial handler running a streaming method.
+        '''
+        if self.__read_throttles is None:
+            self.__read_throttles = set()
+        self.__read_throttles.add(source)
+        self.update_reading()
+
+    def unthrottle_reading(self, source):
+        throttles = self.__read_throttles
+        if throttles is None:
+            return
+        throttles.discard(source)
+        if not throttles:
+            self.__read_throttles = None
+        self.update_reading()
+
+    def add_recv_waiter(self):
+        '''A context starts waiting for the messages of this connection.'''
+        self.__recv_waiters += 1
+        if self.__read_throttles:
+            self.update_reading()
+
+    def remove_recv_waiter(self):
+        self.__recv_waiters -= 1
+        if self.__read_throttles:
+            self.update_reading()
+
+    def update_reading(self):
+        '''Pause or resume reading as throttled, see above.'''
+        throttles = self.__read_throttles
+        throttled = bool(throttles) and (
+            not self.__recv_waiters
+            or any(source is not self.handler for source in throttles)
+        )
+        if throttled == self.__reading_throttled:
+            return
+        self.__reading_throttled = throttled
+        if throttled:
+            self.pause_reading()
+        else:
+            self.resume_reading()
+
+    def throttle_context(self, context):
+        '''`context` has too many queued requests.
+
+        Reading is paused only if all the living contexts are backed up,
+        since the others may be waiting for the requests or the responses
+        not read yet, e.g. the handler is waiting for another context.
+        '''
+        if self.__throttled_contexts is None:
+            self.__throttled_contexts = set()
+        self.__throttled_contexts.add(context)
+        self.update_context_throttle()
+
+    def unthrottle_context(self, context):
+        throttled = self.__throttled_contexts
+        if throttled is None:
+            return
+        throttled.discard(context)
+        if not throttled:
+            self.__throttled_contexts = None
+        self.update_context_throttle()
+
+    def update_context_throttle(self):
+        '''Pause or resume reading as the contexts throttled, see above.'''
+        throttled = self.__throttled_contexts
+        if (throttled is not None
+                and len(throttled) >= len(self.context_manager.contexts)):
+            self.throttle_reading(self.context_manager)
+        else:
+            self.unthrottle_reading(self.context_manager)
+
     def eof_received(self):
         self.handler.shutdown('eof_received')
         return super().eof_received()
 
-    async def send_message(self, *args, **kwargs):
-        '''Helper to send protocol message'''
-        await self.write(self.protocol.encode(*args, **kwargs))
+    async def send_message(self, *args, compression=None, **kwargs):
+        '''Helper to send protocol message
+
+        `compression` is the codec to compress the payload with, it is
+        ignored by the connections not supporting compression.
+        '''
+        await self.writelines(self.protocol.encode_parts(*args, **kwargs))
+        self.messages_out += 1
+
+    def observe_rtt(self, seconds: float):
+        '''Record the round trip time of an outbound call.'''
+        if self.rtt is None:
+            self.rtt = Histogram()
+        self.rtt.observe(seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['rtt'] = self.rtt
+        return stats
 
     def close(self, exc=None):
         if self.state == self.STATE.CLOSED:
@@ -64,7 +203,10 @@ class Connection:
         super()._finnal_close(exc)
         self.handler.close(exc)
         del self.handler
-        del self.__read_buffer[:]
+        self.__read_buffer = None
+        self.__read_throttles = None
+        self.__throttled_contexts = None
+        self.__reading_throttled = False
 
 
 ConnectionType = TypeVar('Connection', bound=Connection)
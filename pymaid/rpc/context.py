@@ -1,11 +1,13 @@
 from collections import deque
-from functools import partial
+from time import perf_counter
 from typing import Optional, TypeVar, Union
 
-from pymaid.core import get_running_loop
+from pymaid.conf import settings
+from pymaid.core import create_task
 from pymaid.core import Future, TimeoutError
 from pymaid.error import BaseEx
 from pymaid.utils.logger import logger_wrapper
+from pymaid.utils.wheel import get_timer
 
 from .error import RPCError
 from .method import Method, MethodStub
@@ -85,13 +87,17 @@ class Context:
     async def __aenter__(self):
         if self.is_closed:
             raise RuntimeError('cannot reuse closed context')
-        if self.timeout_interval is not None:
-            self.timer = get_running_loop().call_later(
-                self.timeout_interval,
-                partial(self.cancel, TimeoutError('context action timeout')),
+        # 0 is no timeout, e.g. the timeout of the non-blocking socket
+        if self.timeout_interval:
+            self.timer = get_timer().call_later(
+                self.timeout_interval, self._on_timeout,
             )
         return self
 
+    def _on_timeout(self):
+        self.timer = None
+        create_task(self.cancel(TimeoutError('context action timeout')))
+
     async def __aexit__(self, exc_type, exc_value, exc_tb):
         await self.close(exc_value)
 
@@ -118,6 +124,19 @@ class InboundContext(Context):
         self.request_received_count = 0
         self.request_fed_count = 0
         self.response_sent_count = 0
+        self.throttling = False
+
+    def put_request(self, request):
+        '''Queue request for logic layer.
+
+        Throttle reading of the connection if too many requests are queued,
+        see :meth:`pymaid.rpc.connection.Connection.throttle_context`.
+        '''
+        self.request_queue.append(request)
+        if len(self.request_queue) >= settings.pymaid.REQUEST_QUEUE_HIGH_WATER:
+            # checked again, the other contexts may be backed up since
+            self.throttling = True
+            self.conn.throttle_context(self)
 
     async def close(self, reason: Optional[Exception] = None):
         if self.is_closed:
@@ -126,6 +145,9 @@ class InboundContext(Context):
             await self.handle_error(reason)
         if self.method.server_streaming and not self.sent_end_message:
             await self.shutdown()
+        if self.throttling:
+            self.throttling = False
+            self.conn.unthrottle_context(self)
         await super().close(reason)
 
     async def recv_message(self):
@@ -145,12 +167,23 @@ class InboundContext(Context):
             assert self.waiter is None, \
                 'should not called parallelly at the same time'
             self.waiter = Future()
+            # the handler may be blocked by this, keep reading
+            conn = self.conn
+            if conn is not None:
+                conn.add_recv_waiter()
             try:
                 await self.waiter
             finally:
                 self.waiter = None
+                if conn is not None:
+                    conn.remove_recv_waiter()
         self.request_received_count += 1
         req = self.request_queue.popleft()
+        if (self.throttling
+                and len(self.request_queue)
+                <= settings.pymaid.REQUEST_QUEUE_LOW_WATER):
+            self.throttling = False
+            self.conn.unthrottle_context(self)
         if isinstance(req, Exception):
             raise req
         return req
@@ -163,6 +196,15 @@ class OutboundContext(Context):
         self.response_queue = deque()
         self.response_received_count = 0
         self.response_fed_count = 0
+        self.start_time = perf_counter()
+
+    def observe_rtt(self):
+        '''Record the time elapsed since created as round trip time.
+
+        Should be called when the end of responses received.
+        '''
+        if self.conn is not None:
+            self.conn.observe_rtt(perf_counter() - self.start_time)
 
     async def close(self, reason: Optional[Exception] = None):
         if self.is_closed:
@@ -193,10 +235,16 @@ class OutboundContext(Context):
             assert self.waiter is None, \
                 'should not called parallelly at the same time'
             self.waiter = Future()
+            # the handler may be blocked by this, keep reading
+            conn = self.conn
+            if conn is not None:
+                conn.add_recv_waiter()
             try:
                 await self.waiter
             finally:
                 self.waiter = None
+                if conn is not None:
+                    conn.remove_recv_waiter()
         self.response_received_count += 1
         resp = self.response_queue.popleft()
         if isinstance(resp, Exception):
@@ -206,6 +254,8 @@ class OutboundContext(Context):
 
 class ContextManager:
 
+    __slots__ = ('initiative', 'outbound_transmission_id', 'contexts')
+
     MAX_TRANSMISSION_ID = 2 ** 32 - 1
     INBOUND_CONTEXT_CLASS = InboundContext
     OUTBOUND_CONTEXT_CLASS = OutboundContext
@@ -297,6 +347,8 @@ class ContextManager:
         )
         context._manager = self
         self.contexts[transmission_id] = context
+        # the response should be read, see `Connection.throttle_context`
+        conn.update_context_throttle()
         return context
 
     def get_context(self, transmission_id: int) -> 'C':
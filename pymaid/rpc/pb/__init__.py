@@ -1,19 +1,30 @@
 import ssl as _ssl
-from typing import Callable, List, Optional, Type, Union
+from typing import Callable, Iterable, List, Optional, Type, Union
 
+from pymaid.conf import settings
 from pymaid.ext.handler import SerialHandler
 from pymaid.ext.middleware import MiddlewareManager
 from pymaid.net import dial_stream as raw_dial_stream
 from pymaid.net.protocol import ProtocolType
 from pymaid.net.stream import Stream
-from pymaid.rpc.connection import Connection, ConnectionType
+from pymaid.rpc.channel import ChannelType
+from pymaid.rpc.connection import ConnectionType
+from pymaid.rpc.method import MethodStub
+from pymaid.rpc.types import Request
 from pymaid.types import HandlerType
 
+from . import compression
+from . import connection
 from . import context
+from . import passthrough
 from . import protocol
 from . import router
+from .connection import Connection
+from .pymaid_pb2 import Context as Meta
 
-__all__ = ('connection', 'context', 'protocol')
+__all__ = (
+    'compression', 'connection', 'context', 'passthrough', 'protocol',
+)
 
 
 async def dial_stream(
@@ -67,6 +78,69 @@ async def serve_stream(
     )
 
 
+def broadcast(
+    channel: ChannelType,
+    method: MethodStub,
+    request: Optional[Request] = None,
+    *,
+    transports: Optional[Iterable[ConnectionType]] = None,
+    predicate: Optional[Callable[[ConnectionType], bool]] = None,
+    **kwargs,
+) -> int:
+    '''Push `request` of `method` to the connections of `channel`.
+
+    The request is serialized once, only the transmission id is rewritten
+    for each connection. `method` should be a unary request method stub
+    with `Void` response, the peers do not respond.
+    See :meth:`pymaid.net.channel.StreamChannel.iter_transports` for
+    `transports` and `predicate`.
+
+    Requests larger than `MAX_PACKET_LENGTH` of the protocol can only be
+    pushed to the peers supporting framing v2, ValueError is raised before
+    pushing to any if some of the connections do not.
+
+    :returns: the number of connections pushed to.
+    '''
+    if method.client_streaming or not method.options.get('void_response'):
+        raise ValueError(
+            f'cannot broadcast {method.full_name}, '
+            'only unary request with Void response supported'
+        )
+    pymaid_settings = settings.pymaid
+    flags = method.options.get('flags', 0) | Meta.PacketFlag.END
+    if pymaid_settings.PB_FRAMING_V2:
+        flags |= Meta.PacketFlag.FRAMING_V2
+    if pymaid_settings.PB_COMPRESSION:
+        flags |= Meta.PacketFlag.COMPRESSION
+    request = request or method.request_class(**kwargs)
+    conns = list(channel.iter_transports(transports, predicate))
+    size = request.ByteSize()
+    max_size = channel.protocol_class.MAX_PACKET_LENGTH
+    if size > max_size:
+        for conn in conns:
+            if not getattr(conn, 'framing_v2', False):
+                raise ValueError(
+                    f'cannot broadcast {size} bytes of {method.full_name} '
+                    f'to {conn!r} without framing v2, max {max_size}'
+                )
+    encode = channel.protocol_class.encode_shared(
+        Meta(
+            service_method=method.full_name,
+            packet_type=Meta.REQUEST,
+            packet_flags=flags,
+        ),
+        request,
+    )
+    chunk_size = pymaid_settings.PB_CHUNK_SIZE
+    for conn in conns:
+        conn.writelines_sync(encode(
+            conn.context_manager.next_transmission_id(),
+            chunk_size if getattr(conn, 'framing_v2', False) else 0,
+        ))
+        conn.messages_out += 1
+    return len(conns)
+
+
 def implall(service):
     service_name = service.DESCRIPTOR.name
     missing = []
@@ -0,0 +1,117 @@
+'''Payload compression of pb rpc.
+
+Compressed payloads are flagged with `COMPRESSED`, and prefixed with the
+id of the codec. The codecs are registered by :func:`register_codec` on both
+sides, `zlib` is always registered.
+
+Compression is enabled per method, the `compression` option of the method,
+see `PB_COMPRESSION_METHODS`, and only for the peers advertising
+`COMPRESSION`, see :class:`pymaid.rpc.pb.connection.Connection`.
+'''
+import zlib
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from pymaid.conf import settings
+from pymaid.core import run_in_threadpool
+
+from .error import PBError
+
+__all__ = ('Codec', 'compress', 'decompress', 'get_codec', 'register_codec')
+
+
+@dataclass(frozen=True)
+class Codec:
+    '''Codec of the compressed payloads.
+
+    :param int id: 1 to 255, the first byte of the compressed payloads
+    :param str name: the name used in the method options
+    :param compress: `compress(data) -> bytes`
+    :param decompress: `decompress(data, max_size) -> bytes`, should not
+        return more than `max_size` bytes, e.g. of decompression bombs
+    '''
+
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes, int], bytes]
+
+
+# {codec id: codec}
+codecs: Dict[int, Codec] = {}
+# {codec name: codec}
+codec_names: Dict[str, Codec] = {}
+
+
+def register_codec(
+    name: str,
+    codec_id: int,
+    compress: Callable[[bytes], bytes],
+    decompress: Callable[[bytes, int], bytes],
+) -> Codec:
+    if not 0 < codec_id < 256:
+        raise ValueError(f'codec id should be in [1, 255], got {codec_id}')
+    if codec_id in codecs or name in codec_names:
+        raise ValueError(f'duplicated codec: {name}, id={codec_id}')
+    codec = Codec(codec_id, name, compress, decompress)
+    codecs[codec_id] = codec_names[name] = codec
+    return codec
+
+
+def get_codec(name: str) -> Codec:
+    try:
+        return codec_names[name]
+    except KeyError:
+        raise ValueError(f'unknown codec: {name}') from None
+
+
+def get_method_compression(full_name: str) -> Optional[str]:
+    '''Return the codec name of method `full_name`, as the method option.'''
+    name = settings.pymaid.PB_COMPRESSION_METHODS.get(full_name)
+    if name is not None:
+        get_codec(name)
+    return name
+
+
+async def compress(name: str, payload: bytes) -> bytes:
+    '''Compress `payload` with codec `name`, prefixed with the codec id.
+
+    Payloads of `PB_COMPRESSION_OFFLOAD_SIZE` bytes or larger are compressed
+    in the thread pool, not blocking the event loop.
+    '''
+    codec = get_codec(name)
+    if len(payload) >= settings.pymaid.PB_COMPRESSION_OFFLOAD_SIZE:
+        data = await run_in_threadpool(codec.compress, args=(payload,))
+    else:
+        data = codec.compress(payload)
+    return bytes((codec.id,)) + data
+
+
+def decompress(payload: bytes, max_size: int) -> bytes:
+    if not payload:
+        raise PBError.InvalidPayload(data={'reason': 'empty'})
+    codec = codecs.get(payload[0])
+    if codec is None:
+        raise PBError.InvalidPayload(
+            data={'reason': f'unknown codec id {payload[0]}'}
+        )
+    try:
+        data = codec.decompress(payload[1:], max_size)
+    except Exception as exc:
+        raise PBError.InvalidPayload(data={'reason': repr(exc)}) from exc
+    if len(data) > max_size:
+        raise PBError.PacketTooLarge(data={'max': max_size, 'size': len(data)})
+    return data
+
+
+def zlib_decompress(data: bytes, max_size: int) -> bytes:
+    decompressor = zlib.decompressobj()
+    # one more byte to tell exceeding
+    data = decompressor.decompress(data, max_size + 1)
+    if not decompressor.eof and len(data) <= max_size:
+        raise zlib.error('incomplete or truncated stream')
+    return data
+
+
+register_codec('zlib', 1, zlib.compress, zlib_decompress)
@@ -0,0 +1,187 @@
+from typing import Optional
+
+from pymaid.conf import settings
+from pymaid.core import shield, sleep
+from pymaid.rpc.connection import Connection
+
+from .compression import compress, decompress
+from .error import PBError
+from .pymaid_pb2 import Context as Meta
+
+__all__ = ('Connection',)
+
+FRAMING_V2 = Meta.PacketFlag.FRAMING_V2
+CHUNK = Meta.PacketFlag.CHUNK
+COMPRESSION = Meta.PacketFlag.COMPRESSION
+COMPRESSED = Meta.PacketFlag.COMPRESSED
+
+
+class Connection(Connection):
+    '''Connection of pb rpc, negotiating framing v2 with the peer.
+
+    With `PB_FRAMING_V2` enabled, the packets sent are flagged with
+    `FRAMING_V2`, and once a packet of the peer is flagged too, the packets
+    are sent in framing v2, see :class:`pymaid.rpc.pb.protocol.Protocol`.
+    Messages larger than `PB_CHUNK_SIZE` are sent in chunks then, and the
+    chunks received are joined before routing. The chunks of a transmission
+    are not interleaved with its other messages, which wait until the last
+    chunk is written.
+
+    With `PB_COMPRESSION` enabled, the packets sent are flagged with
+    `COMPRESSION`, and the peer flagging it too is sent compressed payloads
+    of the methods with the `compression` option, see
+    :mod:`pymaid.rpc.pb.compression`.
+    '''
+
+    __slots__ = ()
+    SLOTS = Connection.SLOTS + (
+        'framing_v2', 'compression', '_Connection__chunks',
+        '_Connection__chunks_size', '_Connection__sending',
+    )
+
+    def __init__(self, sock, **kwargs):
+        if settings.pymaid.PB_FRAMING_V2:
+            # the chunks larger are refused by the peers
+            chunk_size = settings.pymaid.PB_CHUNK_SIZE
+            max_length = kwargs['protocol'].MAX_CHUNK_LENGTH
+            if not 0 < chunk_size <= max_length:
+                raise ValueError(
+                    f'PB_CHUNK_SIZE should be in [1, {max_length}], '
+                    f'got {chunk_size}'
+                )
+        super().__init__(sock, **kwargs)
+        # the peer supports framing v2
+        self.framing_v2 = False
+        # the peer accepts compressed payloads
+        self.compression = False
+        # {transmission_id: [chunk]}, created on demand
+        self.__chunks = None
+        self.__chunks_size = 0
+        # {transmission_id: future}, of the chunked sending, created on demand
+        self.__sending = None
+
+    async def send_message(
+        self, meta: Meta, message, *, compression: Optional[str] = None,
+    ):
+        '''Helper to send protocol message
+
+        The payload is compressed with codec `compression` if the peer
+        accepts, and it is `PB_COMPRESSION_THRESHOLD` bytes or larger.
+
+        :raises: :class:`PacketTooLarge
+            <pymaid.rpc.pb.error.PBError.PacketTooLarge>` if the payload is
+            larger than `MAX_PACKET_LENGTH` of the protocol, and framing v2
+            is not negotiated yet, e.g. the first request of the connection.
+        '''
+        pymaid_settings = settings.pymaid
+        if pymaid_settings.PB_FRAMING_V2:
+            meta.packet_flags |= FRAMING_V2
+        if pymaid_settings.PB_COMPRESSION:
+            meta.packet_flags |= COMPRESSION
+        payload = message.SerializeToString()
+        if (compression and self.compression
+                and len(payload) >= pymaid_settings.PB_COMPRESSION_THRESHOLD):
+            compressed = await compress(compression, payload)
+            # sent as is if incompressible
+            if len(compressed) < len(payload):
+                payload = compressed
+                meta.packet_flags |= COMPRESSED
+        if not self.framing_v2:
+            # refused by the peer, or not even packed into the v1 header
+            max_length = self.protocol.MAX_PACKET_LENGTH
+            if len(payload) > max_length:
+                raise PBError.PacketTooLarge(
+                    data={'max': max_length, 'size': len(payload)}
+                )
+            await self.writelines(self.protocol.encode_payload(meta, payload))
+            self.messages_out += 1
+            return
+        transmission_id = meta.transmission_id
+        # wait for the chunked sending of the same transmission
+        while self.__sending and transmission_id in self.__sending:
+            await shield(self.__sending[transmission_id])
+        chunk_size = pymaid_settings.PB_CHUNK_SIZE
+        packets = self.protocol.encode_chunks(meta, payload, chunk_size)
+        if len(payload) <= chunk_size:
+            await self.writelines(next(packets))
+            self.messages_out += 1
+            return
+        if self.__sending is None:
+            self.__sending = {}
+        sending = self.__sending[transmission_id] = self._loop.create_future()
+        try:
+            await self.writelines(next(packets))
+            for parts in packets:
+                # let the other contexts send between the chunks
+                await sleep(0)
+                await self.writelines(parts)
+        finally:
+            del self.__sending[transmission_id]
+            sending.set_result(None)
+        self.messages_out += 1
+
+    def feed_messages(self, messages: list) -> list:
+        return super().feed_messages(self.join_chunks(messages))
+
+    def join_chunks(self, messages: list) -> list:
+        '''Detect the features of the peer, and join the chunked payloads.
+
+        The compressed payloads are decompressed once joined.
+        '''
+        chunks = self.__chunks
+        pymaid_settings = settings.pymaid
+        if (chunks is None
+                and (self.framing_v2 or not pymaid_settings.PB_FRAMING_V2)
+                and (self.compression or not pymaid_settings.PB_COMPRESSION)):
+            # fast path, nothing to detect, join or decompress
+            for meta, _ in messages:
+                if meta.packet_flags & (CHUNK | COMPRESSED):
+                    break
+            else:
+                return messages
+        joined = []
+        for meta, payload in messages:
+            flags = meta.packet_flags
+            if (flags & FRAMING_V2 and not self.framing_v2
+                    and pymaid_settings.PB_FRAMING_V2):
+                self.framing_v2 = True
+            if (flags & COMPRESSION and not self.compression
+                    and pymaid_settings.PB_COMPRESSION):
+                self.compression = True
+            transmission_id = meta.transmission_id
+            if flags & CHUNK:
+                size = self.__chunks_size + len(payload)
+                limit = pymaid_settings.PB_MAX_REASSEMBLY_SIZE
+                if size > limit:
+                    raise PBError.PacketTooLarge(
+                        data={'max': limit, 'size': size}
+                    )
+                self.__chunks_size = size
+                if chunks is None:
+                    chunks = self.__chunks = {}
+                # copied, the payload is a view of the read buffer
+                chunks.setdefault(transmission_id, []).append(bytes(payload))
+                continue
+            if chunks and transmission_id in chunks:
+                parts = chunks.pop(transmission_id)
+                self.__chunks_size -= sum(map(len, parts))
+                parts.append(payload)
+                payload = b''.join(parts)
+                if not chunks:
+                    chunks = self.__chunks = None
+            if flags & COMPRESSED:
+                payload = self.decompress(payload)
+            joined.append((meta, payload))
+        return joined
+
+    def decompress(self, payload) -> bytes:
+        if not settings.pymaid.PB_COMPRESSION:
+            raise PBError.InvalidPayload(
+                data={'reason': 'compression is disabled'}
+            )
+        return decompress(payload, settings.pymaid.PB_MAX_REASSEMBLY_SIZE)
+
+    def _finnal_close(self, exc=None):
+        super()._finnal_close(exc)
+        self.__chunks = None
+        self.__chunks_size = 0
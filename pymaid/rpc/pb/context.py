@@ -1,8 +1,9 @@
-from orjson import loads, dumps
+from orjson import dumps
 from pymaid.error import ErrorManager
 from pymaid.rpc.error import RPCError
 from pymaid.rpc.context import InboundContext, OutboundContext, ContextManager
 
+from .passthrough import RawError
 from .pymaid_pb2 import Context as Meta, ErrorMessage, Void
 
 
@@ -10,7 +11,7 @@ class PBContext:
 
     async def handle_error(self, error: Exception):
         await self.conn.send_message(
-            Meta(
+            self.conn.protocol.META_CLASS(
                 transmission_id=self.transmission_id,
                 packet_flags=(
                     self.method.options.get('flags', 0) | Meta.PacketFlag.END
@@ -27,7 +28,7 @@ class PBContext:
 
     async def shutdown(self):
         await self.conn.send_message(
-            Meta(
+            self.conn.protocol.META_CLASS(
                 transmission_id=self.transmission_id,
                 packet_flags=(
                     self.method.options.get('flags', 0) | Meta.PacketFlag.END
@@ -51,11 +52,9 @@ class PBInboundContext(PBContext, InboundContext):
                 }
             )
         if payload:
-            self.request_queue.append(
-                self.method.request_class.FromString(payload)
-            )
+            self.put_request(self.method.request_class.FromString(payload))
         if meta.packet_flags & Meta.PacketFlag.END:
-            self.request_queue.append(None)
+            self.put_request(None)
         self.request_fed_count += 1
         if self.waiter and not self.waiter.done():
             self.waiter.set_result(True)
@@ -79,12 +78,13 @@ class PBInboundContext(PBContext, InboundContext):
             flags |= Meta.PacketFlag.END
             self.sent_end_message = True
         await self.conn.send_message(
-            Meta(
+            self.conn.protocol.META_CLASS(
                 transmission_id=self.transmission_id,
                 packet_type=Meta.RESPONSE,
                 packet_flags=flags
             ),
             response or self.method.response_class(**kwargs),
+            compression=self.method.options.get('compression'),
         )
 
 
@@ -102,12 +102,15 @@ class PBOutboundContext(PBContext, OutboundContext):
                 }
             )
 
-        if meta.is_failed or meta.is_cancelled:
+        if (meta.is_failed or meta.is_cancelled) \
+                and self.method.options.get('passthrough'):
+            # relayed as is, see `pymaid.rpc.pb.passthrough`
+            self.response_queue.append(RawError(meta, payload))
+        elif meta.is_failed or meta.is_cancelled:
             assert payload, 'should return error message'
             err = ErrorMessage.FromString(payload)
-            ex = ErrorManager.assemble(
-                err.code, err.message, err.data and loads(err.data) or {}
-            )
+            # data is decoded by assemble
+            ex = ErrorManager.assemble(err.code, err.message, err.data)
             self.response_queue.append(ex)
         elif payload:
             self.response_queue.append(
@@ -115,6 +118,7 @@ class PBOutboundContext(PBContext, OutboundContext):
             )
         if meta.packet_flags & Meta.PacketFlag.END:
             self.response_queue.append(None)
+            self.observe_rtt()
         if self.waiter and not self.waiter.done():
             self.waiter.set_result(True)
 
@@ -133,17 +137,20 @@ class PBOutboundContext(PBContext, OutboundContext):
             flags |= Meta.PacketFlag.END
             self.sent_end_message = True
         await self.conn.send_message(
-            Meta(
+            self.conn.protocol.META_CLASS(
                 transmission_id=self.transmission_id,
                 service_method=self.method.full_name,
                 packet_type=Meta.REQUEST,
                 packet_flags=flags,
             ),
             request or self.method.request_class(**kwargs),
+            compression=self.method.options.get('compression'),
         )
 
 
 class ContextManager(ContextManager):
 
+    __slots__ = ()
+
     INBOUND_CONTEXT_CLASS = PBInboundContext
     OUTBOUND_CONTEXT_CLASS = PBOutboundContext
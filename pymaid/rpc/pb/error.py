@@ -5,3 +5,13 @@ PBError = RPCError.create_manager('PBError')
 PBError.add_error('RPCNotFound', 'rpc not found')
 PBError.add_error('InvalidTransmissionID', 'transmission_id value is invalid')
 PBError.add_error('InvalidPacketType', 'cannot handle unknown packet')
+PBError.add_error(
+    'PacketTooLarge', 'packet [size|{data[size]}] exceeds [max|{data[max]}]'
+)
+PBError.add_error(
+    'PassthroughFailed',
+    'cannot pass [name|{data[name]}] through [reason|{data[reason]}]',
+)
+PBError.add_error(
+    'InvalidPayload', 'cannot decompress payload [reason|{data[reason]}]'
+)
@@ -0,0 +1,214 @@
+'''Fast codec of `pymaid.Context`, the meta of every rpc packet.
+
+:class:`FastMeta` is wire-compatible with the protobuf `Context`, with
+the fields as plain slots. The serialized fields other than
+`transmission_id` and `packet_flags` are cached as templates per method,
+so encoding is a join of the id, the template and the flags. Decoding
+only parses the few known fields.
+'''
+from typing import Dict, Tuple
+
+from google.protobuf.message import DecodeError
+
+from .pymaid_pb2 import Context as Meta
+
+__all__ = ('FastMeta',)
+
+# keys of the fields, the field number << 3 | the wire type
+TRANSMISSION_ID_KEY = 0x08
+PACKET_TYPE_KEY = 0x10
+PACKET_FLAGS_KEY = 0x18
+PRIORITY_KEY = 0x20
+SERVICE_METHOD_KEY = 0x2a
+IS_CANCELLED_KEY = 0x30
+IS_FAILED_KEY = 0x38
+
+UINT32_MASK = 0xffffffff
+
+VARINT_FIELDS = {
+    TRANSMISSION_ID_KEY: 'transmission_id',
+    PACKET_TYPE_KEY: 'packet_type',
+    PACKET_FLAGS_KEY: 'packet_flags',
+    PRIORITY_KEY: 'priority',
+    IS_CANCELLED_KEY: 'is_cancelled',
+    IS_FAILED_KEY: 'is_failed',
+}
+
+# serialized transmission ids and flags, the common ones are precomputed
+TRANSMISSION_IDS = [b''] + [
+    bytes((TRANSMISSION_ID_KEY, i)) for i in range(1, 128)
+]
+PACKET_FLAGS = [b''] + [bytes((PACKET_FLAGS_KEY, i)) for i in range(1, 128)]
+
+# {(packet_type, priority, service_method, is_cancelled, is_failed):
+#  (serialized packet_type, serialized priority and the others)}
+templates: Dict[tuple, Tuple[bytes, bytes]] = {}
+# bounded, since the service methods can come from the peer
+MAX_TEMPLATES = 4096
+
+
+def encode_varint(value: int) -> bytes:
+    data = bytearray()
+    while value > 0x7f:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while 1:
+        try:
+            byte = data[pos]
+        except IndexError:
+            raise DecodeError('Truncated message.') from None
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift >= 64:
+            raise DecodeError('Too many bytes when decoding varint.')
+
+
+def skip_field(meta: 'FastMeta', data: bytes, pos: int, key: int) -> int:
+    '''Parse `service_method`, or skip the others not of varint type.'''
+    wire_type = key & 0x07
+    if wire_type == 2:
+        size, pos = decode_varint(data, pos)
+        end = pos + size
+        if key == SERVICE_METHOD_KEY:
+            try:
+                meta.service_method = data[pos:end].decode()
+            except UnicodeDecodeError as exc:
+                raise DecodeError(str(exc)) from None
+    elif wire_type == 1:
+        end = pos + 8
+    elif wire_type == 5:
+        end = pos + 4
+    else:
+        raise DecodeError(f'Unsupported wire type {wire_type}.')
+    if end > len(data):
+        raise DecodeError('Truncated message.')
+    return end
+
+
+def build_template(key: tuple) -> Tuple[bytes, bytes]:
+    packet_type, priority, service_method, is_cancelled, is_failed = key
+    head = b''
+    if packet_type:
+        head = bytes((PACKET_TYPE_KEY,)) + encode_varint(packet_type)
+    rest = bytearray()
+    if priority:
+        rest.append(PRIORITY_KEY)
+        rest += encode_varint(priority)
+    if service_method:
+        name = service_method.encode('utf-8')
+        rest.append(SERVICE_METHOD_KEY)
+        rest += encode_varint(len(name))
+        rest += name
+    if is_cancelled:
+        rest += bytes((IS_CANCELLED_KEY, 1))
+    if is_failed:
+        rest += bytes((IS_FAILED_KEY, 1))
+    template = head, bytes(rest)
+    if len(templates) < MAX_TEMPLATES:
+        templates[key] = template
+    return template
+
+
+class FastMeta:
+    '''Drop-in replacement of the protobuf `Context` for the rpc meta.'''
+
+    __slots__ = (
+        'transmission_id', 'packet_type', 'packet_flags', 'priority',
+        'service_method', 'is_cancelled', 'is_failed',
+    )
+
+    # enum values, the same as `Meta`
+    REQUEST = Meta.REQUEST
+    RESPONSE = Meta.RESPONSE
+    PacketType = Meta.PacketType
+    PacketFlag = Meta.PacketFlag
+    Priority = Meta.Priority
+
+    def __init__(
+        self,
+        transmission_id: int = 0,
+        packet_type: int = 0,
+        packet_flags: int = 0,
+        priority: int = 0,
+        service_method: str = '',
+        is_cancelled: bool = False,
+        is_failed: bool = False,
+    ):
+        self.transmission_id = transmission_id
+        self.packet_type = packet_type
+        self.packet_flags = packet_flags
+        self.priority = priority
+        self.service_method = service_method
+        self.is_cancelled = is_cancelled
+        self.is_failed = is_failed
+
+    def SerializeToString(self) -> bytes:
+        key = (
+            self.packet_type, self.priority, self.service_method,
+            self.is_cancelled, self.is_failed,
+        )
+        head, rest = templates.get(key) or build_template(key)
+        transmission_id = self.transmission_id
+        if transmission_id < 128:
+            transmission_id = TRANSMISSION_IDS[transmission_id]
+        else:
+            transmission_id = bytes((TRANSMISSION_ID_KEY,)) + encode_varint(
+                transmission_id
+            )
+        flags = self.packet_flags
+        if flags < 128:
+            flags = PACKET_FLAGS[flags]
+        else:
+            flags = bytes((PACKET_FLAGS_KEY,)) + encode_varint(flags)
+        return b''.join((transmission_id, head, flags, rest))
+
+    @classmethod
+    def FromString(cls, data) -> 'FastMeta':
+        data = bytes(data)
+        meta = cls()
+        pos, end = 0, len(data)
+        while pos < end:
+            key = data[pos]
+            if key & 0x80:
+                key, pos = decode_varint(data, pos)
+            else:
+                pos += 1
+            if key & 0x07:
+                pos = skip_field(meta, data, pos, key)
+                continue
+            value = data[pos] if pos < end else 0x80
+            if value & 0x80:
+                value, pos = decode_varint(data, pos)
+            else:
+                pos += 1
+            name = VARINT_FIELDS.get(key)
+            if name is not None:
+                setattr(meta, name, value)
+        meta.transmission_id &= UINT32_MASK
+        meta.is_cancelled = meta.is_cancelled != 0
+        meta.is_failed = meta.is_failed != 0
+        return meta
+
+    def __eq__(self, other):
+        if isinstance(other, (FastMeta, Meta)):
+            return all(
+                getattr(self, name) == getattr(other, name)
+                for name in self.__slots__
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        fields = ', '.join(
+            f'{name}={getattr(self, name)!r}' for name in self.__slots__
+            if getattr(self, name)
+        )
+        return f'FastMeta({fields})'
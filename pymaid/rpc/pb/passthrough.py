@@ -0,0 +1,218 @@
+'''Passthrough of pb rpc, forwarding the methods without deserializing.
+
+The methods matching a pattern are routed to a :class:`PassthroughMethod`,
+whose requests and responses are :class:`RawMessage`, the serialized
+payloads as received. They are relayed to and from the upstream connection
+as is, e.g. in the gateways::
+
+    router = PBRouter()
+    router.include_passthrough('backend.*', backend_conn)
+    await pb.serve_stream(address, router=router)
+
+The relay works for all kinds of methods, the end of the stream is relayed
+with the last message, as the peers sent. The errors of upstream are
+relayed as is too.
+'''
+import re
+
+from fnmatch import translate
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+from pymaid.core import create_task
+from pymaid.error import BaseEx
+from pymaid.rpc.connection import ConnectionType
+from pymaid.rpc.method import StreamStreamMethod, StreamStreamMethodStub
+from pymaid.types import DataType
+
+from .compression import get_method_compression
+from .error import PBError
+from .pymaid_pb2 import Context as Meta
+
+__all__ = ('Passthrough', 'PassthroughMethod', 'RawError', 'RawMessage')
+
+Upstream = Union[ConnectionType, Callable[[], Awaitable[ConnectionType]]]
+
+
+class RawMessage:
+    '''Serialized message, passed through without deserializing.
+
+    The payload can be a view of the read buffer of the connection.
+    '''
+
+    __slots__ = ('payload',)
+
+    def __init__(self, payload: DataType = b''):
+        self.payload = payload
+
+    @classmethod
+    def FromString(cls, payload: DataType) -> 'RawMessage':
+        return cls(payload)
+
+    def SerializeToString(self) -> DataType:
+        return self.payload
+
+    def ByteSize(self) -> int:
+        return len(self.payload)
+
+    def __repr__(self):
+        return f'<RawMessage size={len(self.payload)}>'
+
+
+class RawError(Exception):
+    '''Serialized error of upstream, relayed as is.
+
+    Not a :class:`pymaid.error.BaseEx`, the contexts do not send it back.
+    '''
+
+    def __init__(self, meta: Meta, payload: DataType):
+        super().__init__(meta.transmission_id)
+        self.is_cancelled = meta.is_cancelled
+        self.payload = payload
+
+
+class PassthroughMethod(StreamStreamMethod):
+    '''Method relaying the raw messages of `full_name` to upstream.'''
+
+    def __init__(self, full_name: str, passthrough: 'Passthrough'):
+        options = {
+            'flags': Meta.PacketFlag.NULL,
+            'void_request': False,
+            'void_response': passthrough.void_response,
+            'compression': get_method_compression(full_name.lstrip('.')),
+        }
+        super().__init__(
+            full_name.rpartition('.')[2],
+            full_name,
+            self.relay,
+            RawMessage,
+            RawMessage,
+            options=options,
+        )
+        self.passthrough = passthrough
+        self.stub = StreamStreamMethodStub(
+            self.name,
+            full_name,
+            RawMessage,
+            RawMessage,
+            options=dict(options, passthrough=True),
+        )
+        if passthrough.void_response:
+            # nothing to relay back
+            self.server_streaming = False
+
+    async def relay(self, context):
+        try:
+            upstream = await self.passthrough.get_upstream()
+            async with self.stub.open(
+                conn=upstream, timeout=self.passthrough.timeout,
+            ) as outbound:
+                requests = create_task(self.relay_requests(context, outbound))
+                try:
+                    if self.options['void_response']:
+                        await requests
+                    else:
+                        await self.relay_responses(outbound, context)
+                finally:
+                    requests.cancel()
+        except RawError as error:
+            await self.relay_error(context, error)
+        except BaseEx as error:
+            await context.close(error)
+        except Exception as exc:
+            await context.close(PBError.PassthroughFailed(
+                data={'name': self.full_name, 'reason': repr(exc)}
+            ))
+
+    async def relay_requests(self, context, outbound):
+        try:
+            while 1:
+                request = await context.recv_message()
+                if request is None:
+                    await outbound.send_message(end=True)
+                    return
+                queue = context.request_queue
+                # the end received already, sent with the last request
+                end = bool(queue) and queue[0] is None
+                await outbound.send_message(request, end=end)
+                if end:
+                    return
+        except Exception as exc:
+            # wake up the responses relay
+            await outbound.cancel(exc)
+
+    async def relay_responses(self, outbound, context):
+        while 1:
+            response = await outbound.recv_message()
+            if response is None:
+                if not context.sent_end_message:
+                    await context.send_message(end=True)
+                return
+            queue = outbound.response_queue
+            end = bool(queue) and queue[0] is None
+            await context.send_message(response, end=end)
+            if end:
+                return
+
+    async def relay_error(self, context, error: RawError):
+        conn = context.conn
+        await conn.send_message(
+            conn.protocol.META_CLASS(
+                transmission_id=context.transmission_id,
+                packet_flags=(
+                    self.options['flags'] | Meta.PacketFlag.END
+                ),
+                is_cancelled=error.is_cancelled,
+                is_failed=not error.is_cancelled,
+            ),
+            RawMessage(error.payload),
+        )
+        context.sent_end_message = True
+
+
+class Passthrough:
+    '''Rule of passthrough, the methods matching `pattern` to `upstream`.
+
+    :param str pattern: shell-style wildcards of the method full names,
+        e.g. `backend.*`, see :mod:`fnmatch`
+    :param upstream: the connection, or a coroutine function returning the
+        connection, e.g. dialing or picking one of the backends
+    :param float timeout: timeout of the upstream calls
+    :param bool void_response: the methods respond nothing, e.g. of `Void`
+        response, no responses are waited for
+    '''
+
+    # bounded, since the method names come from the peer
+    MAX_METHODS = 4096
+
+    def __init__(
+        self,
+        pattern: str,
+        upstream: Upstream,
+        *,
+        timeout: Optional[float] = None,
+        void_response: bool = False,
+    ):
+        self.pattern = pattern
+        self.match = re.compile(translate(pattern)).match
+        self.upstream = upstream
+        self.timeout = timeout
+        self.void_response = void_response
+        self.methods: Dict[str, PassthroughMethod] = {}
+
+    async def get_upstream(self) -> ConnectionType:
+        upstream = self.upstream
+        if callable(upstream):
+            return await upstream()
+        return upstream
+
+    def get_method(self, name: str) -> Optional[PassthroughMethod]:
+        '''Return the method of `name` if matched.'''
+        method = self.methods.get(name)
+        if method is None and self.match(name.lstrip('.')):
+            method = PassthroughMethod(name, self)
+            if len(self.methods) < self.MAX_METHODS:
+                self.methods[name] = method
+        return method
+
+    def __repr__(self):
+        return f'<Passthrough pattern={self.pattern!r}>'
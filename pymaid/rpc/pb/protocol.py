@@ -1,27 +1,50 @@
 import struct
-from typing import Optional, Sequence, Tuple, TypeVar
+from typing import (
+    Callable, Iterator, List, Optional, Sequence, Tuple, TypeVar,
+)
 
 from google.protobuf.message import Message
 
 from pymaid.net.protocol import DataType, Protocol
 
 from .error import PBError
+from .meta import FastMeta, encode_varint
 from .pymaid_pb2 import Context as Meta
 
 
 Message = TypeVar('Message', bound=Message)
 
+# key of Meta.transmission_id, field 1 with varint wire type
+TRANSMISSION_ID_KEY = b'\x08'
+
 
 class Protocol(Protocol):
+    '''Packets of pb rpc, a header of the sizes, the meta, then the payload.
+
+    Framing v1 header is `!HH`, the sizes of the meta and the payload.
+    Framing v2 header is `!HII`, `V2_MARK` in place of the meta size of v1,
+    then the 32-bit sizes. Both are decoded, v2 packets are only sent to the
+    peers supporting it, see :class:`pymaid.rpc.connection.Connection`.
+    '''
 
     HEADER_FORMAT = '!HH'
     HEADER_STRUCT = struct.Struct(HEADER_FORMAT)
+    HEADER_V2_FORMAT = '!HII'
+    HEADER_V2_STRUCT = struct.Struct(HEADER_V2_FORMAT)
+    V2_MARK = 0xffff
 
     MAX_PACKET_LENGTH = 8 * 1024
+    # max payload of a v2 packet, larger messages are sent in chunks
+    MAX_CHUNK_LENGTH = 1024 * 1024
+    # class of the packet meta, decoded and created by the contexts
+    META_CLASS = Meta
 
     header_size = HEADER_STRUCT.size
     pack_header = HEADER_STRUCT.pack
     unpack_header = HEADER_STRUCT.unpack
+    header_v2_size = HEADER_V2_STRUCT.size
+    pack_header_v2 = HEADER_V2_STRUCT.pack
+    unpack_header_v2 = HEADER_V2_STRUCT.unpack
 
     @classmethod
     def feed_data(cls, data: DataType) -> Tuple[int, Sequence[Message]]:
@@ -44,11 +67,108 @@ class Protocol(Protocol):
 
     @classmethod
     def encode(cls, meta: Meta, message: Message) -> bytes:
-        return (
-            cls.pack_header(meta.ByteSize(), message.ByteSize())
-            + meta.SerializeToString()
-            + message.SerializeToString()
-        )
+        return b''.join(cls.encode_parts(meta, message))
+
+    @classmethod
+    def encode_parts(
+        cls, meta: Meta, message: Message,
+    ) -> Tuple[bytes, bytes, bytes]:
+        return cls.encode_payload(meta, message.SerializeToString())
+
+    @classmethod
+    def encode_payload(
+        cls, meta: Meta, payload: bytes,
+    ) -> Tuple[bytes, bytes, bytes]:
+        '''Encode with `payload` serialized already, e.g. compressed.'''
+        meta = meta.SerializeToString()
+        return cls.pack_header(len(meta), len(payload)), meta, payload
+
+    @classmethod
+    def encode_chunks(
+        cls, meta: Meta, payload: bytes, chunk_size: int,
+    ) -> Iterator[Tuple[bytes, bytes, DataType]]:
+        '''Encode packets of framing v2, `chunk_size` bytes of payload each.
+
+        The packets but the last are flagged with `CHUNK` and carry only
+        the transmission id, the last one carries `meta`.
+        '''
+        size = len(payload)
+        pack_header_v2, mark = cls.pack_header_v2, cls.V2_MARK
+        if size > chunk_size:
+            chunk_meta = type(meta)(
+                transmission_id=meta.transmission_id,
+                packet_flags=Meta.PacketFlag.CHUNK,
+            ).SerializeToString()
+            view = memoryview(payload)
+            last = (size - 1) // chunk_size * chunk_size
+            for offset in range(0, last, chunk_size):
+                yield (
+                    pack_header_v2(mark, len(chunk_meta), chunk_size),
+                    chunk_meta,
+                    view[offset:offset + chunk_size],
+                )
+            payload = view[last:]
+        meta = meta.SerializeToString()
+        yield pack_header_v2(mark, len(meta), len(payload)), meta, payload
+
+    @classmethod
+    def encode_shared(
+        cls, meta: Meta, message: Message,
+    ) -> Callable[[int, int], List[DataType]]:
+        '''Encode once for many transmission ids, e.g. broadcasting.
+
+        Returns a function `encode(transmission_id, chunk_size=0)` that
+        returns the same parts as :meth:`encode_parts` for the given
+        transmission id, or as :meth:`encode_chunks` if `chunk_size` is
+        given, for the peers supporting framing v2.
+        `transmission_id` is field 1, serialized ahead of the other fields,
+        so only the headers and the id are packed per call, the rest of meta
+        and the payload are shared.
+        '''
+        shared_meta = Meta()
+        shared_meta.CopyFrom(meta)
+        shared_meta.ClearField('transmission_id')
+        meta = shared_meta.SerializeToString()
+        payload = message.SerializeToString()
+        view = memoryview(payload)
+        meta_size, payload_size = len(meta), len(payload)
+        pack_header, pack_header_v2 = cls.pack_header, cls.pack_header_v2
+        mark = cls.V2_MARK
+
+        def encode(
+            transmission_id: int, chunk_size: int = 0,
+        ) -> List[DataType]:
+            if transmission_id:
+                key = TRANSMISSION_ID_KEY + encode_varint(transmission_id)
+            else:
+                key = b''
+            if not chunk_size:
+                return [
+                    pack_header(len(key) + meta_size, payload_size) + key,
+                    meta,
+                    payload,
+                ]
+            parts = []
+            tail = payload
+            if payload_size > chunk_size:
+                chunk_meta = Meta(
+                    transmission_id=transmission_id,
+                    packet_flags=Meta.PacketFlag.CHUNK,
+                ).SerializeToString()
+                header = pack_header_v2(mark, len(chunk_meta), chunk_size)
+                last = (payload_size - 1) // chunk_size * chunk_size
+                for offset in range(0, last, chunk_size):
+                    parts.extend((
+                        header, chunk_meta, view[offset:offset + chunk_size],
+                    ))
+                tail = view[last:]
+            parts.extend((
+                pack_header_v2(mark, len(key) + meta_size, len(tail)) + key,
+                meta,
+                tail,
+            ))
+            return parts
+        return encode
 
     @classmethod
     def decode(
@@ -60,16 +180,41 @@ class Protocol(Protocol):
             return 0, None, None
 
         meta_size, payload_size = cls.unpack_header(data[:header_size])
+        max_length = cls.MAX_PACKET_LENGTH
+        if meta_size == cls.V2_MARK:
+            header_size = cls.header_v2_size
+            if data_size < header_size:
+                return 0, None, None
+            _, meta_size, payload_size = cls.unpack_header_v2(
+                data[:header_size]
+            )
+            max_length = cls.MAX_CHUNK_LENGTH
+            if meta_size > max_length:
+                raise PBError.PacketTooLarge(
+                    data={'max': max_length, 'size': meta_size}
+                )
+        # checked before buffering the whole packet
+        if payload_size > max_length:
+            raise PBError.PacketTooLarge(
+                data={'max': max_length, 'size': payload_size}
+            )
         used_size = header_size + meta_size + payload_size
         if used_size > data_size:
             return 0, None, None
-        if payload_size > cls.MAX_PACKET_LENGTH:
-            raise PBError.PacketTooLarge(
-                data={'max': cls.MAX_PACKET_LENGTH, 'size': payload_size}
-            )
 
         return (
             used_size,
-            Meta.FromString(data[header_size:header_size + meta_size]),
+            cls.META_CLASS.FromString(
+                data[header_size:header_size + meta_size]
+            ),
             data[header_size + meta_size: used_size],
         )
+
+
+class FastProtocol(Protocol):
+    '''Protocol with :class:`pymaid.rpc.pb.meta.FastMeta` as the meta.
+
+    It is wire-compatible with :class:`Protocol`, the peers can use either.
+    '''
+
+    META_CLASS = FastMeta
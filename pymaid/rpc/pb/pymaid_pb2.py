@@ -17,7 +17,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
     syntax='proto3',
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
-    serialized_pb=b'\n\x1apymaid/rpc/pb/pymaid.proto\x12\rpymaid.rpc.pb\"\x9b\x03\n\x07\x43ontext\x12\x17\n\x0ftransmission_id\x18\x01 \x01(\r\x12\x36\n\x0bpacket_type\x18\x02 \x01(\x0e\x32!.pymaid.rpc.pb.Context.PacketType\x12\x37\n\x0cpacket_flags\x18\x03 \x01(\x0e\x32!.pymaid.rpc.pb.Context.PacketFlag\x12\x31\n\x08priority\x18\x04 \x01(\x0e\x32\x1f.pymaid.rpc.pb.Context.Priority\x12\x16\n\x0eservice_method\x18\x05 \x01(\t\x12\x14\n\x0cis_cancelled\x18\x06 \x01(\x08\x12\x11\n\tis_failed\x18\x07 \x01(\x08\"4\n\nPacketType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x0b\n\x07REQUEST\x10\x01\x12\x0c\n\x08RESPONSE\x10\x02\"4\n\nPacketFlag\x12\x08\n\x04NULL\x10\x00\x12\x07\n\x03NEW\x10\x01\x12\n\n\x06\x43\x41NCEL\x10\x02\x12\x07\n\x03\x45ND\x10\x04\"&\n\x08Priority\x12\x07\n\x03LOW\x10\x00\x12\x07\n\x03MID\x10\x01\x12\x08\n\x04HIGH\x10\x02\"\x08\n\x06RpcAck\"\x06\n\x04Void\";\n\x0c\x45rrorMessage\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\tb\x06proto3'
+    serialized_pb=b'\n\x1apymaid/rpc/pb/pymaid.proto\x12\rpymaid.rpc.pb\"\xd7\x03\n\x07\x43ontext\x12\x17\n\x0ftransmission_id\x18\x01 \x01(\r\x12\x36\n\x0bpacket_type\x18\x02 \x01(\x0e\x32!.pymaid.rpc.pb.Context.PacketType\x12\x37\n\x0cpacket_flags\x18\x03 \x01(\x0e\x32!.pymaid.rpc.pb.Context.PacketFlag\x12\x31\n\x08priority\x18\x04 \x01(\x0e\x32\x1f.pymaid.rpc.pb.Context.Priority\x12\x16\n\x0eservice_method\x18\x05 \x01(\t\x12\x14\n\x0cis_cancelled\x18\x06 \x01(\x08\x12\x11\n\tis_failed\x18\x07 \x01(\x08\"4\n\nPacketType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x0b\n\x07REQUEST\x10\x01\x12\x0c\n\x08RESPONSE\x10\x02\"p\n\nPacketFlag\x12\x08\n\x04NULL\x10\x00\x12\x07\n\x03NEW\x10\x01\x12\n\n\x06\x43\x41NCEL\x10\x02\x12\x07\n\x03\x45ND\x10\x04\x12\x0e\n\nFRAMING_V2\x10\x08\x12\t\n\x05\x43HUNK\x10\x10\x12\x0f\n\x0b\x43OMPRESSION\x10 \x12\x0e\n\nCOMPRESSED\x10@\"&\n\x08Priority\x12\x07\n\x03LOW\x10\x00\x12\x07\n\x03MID\x10\x01\x12\x08\n\x04HIGH\x10\x02\"\x08\n\x06RpcAck\"\x06\n\x04Void\";\n\x0c\x45rrorMessage\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\tb\x06proto3'
 )
 
 
@@ -78,11 +78,31 @@ _CONTEXT_PACKETFLAG = _descriptor.EnumDescriptor(
             serialized_options=None,
             type=None,
             create_key=_descriptor._internal_create_key),
+        _descriptor.EnumValueDescriptor(
+            name='FRAMING_V2', index=4, number=8,
+            serialized_options=None,
+            type=None,
+            create_key=_descriptor._internal_create_key),
+        _descriptor.EnumValueDescriptor(
+            name='CHUNK', index=5, number=16,
+            serialized_options=None,
+            type=None,
+            create_key=_descriptor._internal_create_key),
+        _descriptor.EnumValueDescriptor(
+            name='COMPRESSION', index=6, number=32,
+            serialized_options=None,
+            type=None,
+            create_key=_descriptor._internal_create_key),
+        _descriptor.EnumValueDescriptor(
+            name='COMPRESSED', index=7, number=64,
+            serialized_options=None,
+            type=None,
+            create_key=_descriptor._internal_create_key),
     ],
     containing_type=None,
     serialized_options=None,
     serialized_start=365,
-    serialized_end=417,
+    serialized_end=477,
 )
 _sym_db.RegisterEnumDescriptor(_CONTEXT_PACKETFLAG)
 
@@ -111,8 +131,8 @@ _CONTEXT_PRIORITY = _descriptor.EnumDescriptor(
     ],
     containing_type=None,
     serialized_options=None,
-    serialized_start=419,
-    serialized_end=457,
+    serialized_start=479,
+    serialized_end=517,
 )
 _sym_db.RegisterEnumDescriptor(_CONTEXT_PRIORITY)
 
@@ -190,7 +210,7 @@ _CONTEXT = _descriptor.Descriptor(
     oneofs=[
     ],
     serialized_start=46,
-    serialized_end=457,
+    serialized_end=517,
 )
 
 
@@ -214,8 +234,8 @@ _RPCACK = _descriptor.Descriptor(
     extension_ranges=[],
     oneofs=[
     ],
-    serialized_start=459,
-    serialized_end=467,
+    serialized_start=519,
+    serialized_end=527,
 )
 
 
@@ -239,8 +259,8 @@ _VOID = _descriptor.Descriptor(
     extension_ranges=[],
     oneofs=[
     ],
-    serialized_start=469,
-    serialized_end=475,
+    serialized_start=529,
+    serialized_end=535,
 )
 
 
@@ -285,8 +305,8 @@ _ERRORMESSAGE = _descriptor.Descriptor(
     extension_ranges=[],
     oneofs=[
     ],
-    serialized_start=477,
-    serialized_end=536,
+    serialized_start=537,
+    serialized_end=596,
 )
 
 _CONTEXT.fields_by_name['packet_type'].enum_type = _CONTEXT_PACKETTYPE
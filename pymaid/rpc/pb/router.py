@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from orjson import dumps
 
 from google.protobuf.descriptor_pb2 import MethodDescriptorProto
@@ -9,12 +11,50 @@ from pymaid.rpc.method import UnaryUnaryMethodStub, UnaryStreamMethodStub
 from pymaid.rpc.method import StreamUnaryMethodStub, StreamStreamMethodStub
 from pymaid.rpc.router import Router, RouterStub
 
+from .compression import get_method_compression
 from .error import PBError
+from .passthrough import Passthrough, Upstream
 from .pymaid_pb2 import Context as Meta, Void, ErrorMessage
 
 
 class PBRouter(Router):
 
+    def __init__(self, **kwargs):
+        # matched in order, after the routes of the services
+        self.passthroughs: List[Passthrough] = []
+        super().__init__(**kwargs)
+
+    def include_router(self, router: Router):
+        super().include_router(router)
+        self.passthroughs.extend(getattr(router, 'passthroughs', ()))
+
+    def include_passthrough(
+        self,
+        pattern: str,
+        upstream: Upstream,
+        *,
+        timeout: Optional[float] = None,
+        void_response: bool = False,
+    ) -> Passthrough:
+        '''Relay the methods matching `pattern` to `upstream` as is.
+
+        See :class:`pymaid.rpc.pb.passthrough.Passthrough` for the params.
+        '''
+        passthrough = Passthrough(
+            pattern, upstream, timeout=timeout, void_response=void_response,
+        )
+        self.passthroughs.append(passthrough)
+        return passthrough
+
+    def get_route(self, name: str):
+        route = self.routes.get(name)
+        if route is None:
+            for passthrough in self.passthroughs:
+                route = passthrough.get_method(name)
+                if route is not None:
+                    break
+        return route
+
     def get_service_methods(self, service: GeneratedServiceType):
         for method in service.DESCRIPTOR.methods:
             method_impl = getattr(service, method.name)
@@ -46,6 +86,7 @@ class PBRouter(Router):
                     'flags': Meta.PacketFlag.NULL,
                     'void_request': issubclass(request_class, Void),
                     'void_response': issubclass(response_class, Void),
+                    'compression': get_method_compression(method.full_name),
                 },
             )
             yield method_ins
@@ -137,6 +178,7 @@ class PBRouterStub(RouterStub):
                     'flags': Meta.PacketFlag.NULL,
                     'void_request': issubclass(request_class, Void),
                     'void_response': issubclass(response_class, Void),
+                    'compression': get_method_compression(method.full_name),
                 },
             )
             yield method_stub
@@ -5,6 +5,7 @@ from pymaid.utils.logger import logger_wrapper
 from .types import RouterType, ServiceType
 
 
+@logger_wrapper(name='pymaid.Router')
 class Router:
 
     def __init__(
@@ -0,0 +1,85 @@
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence
+
+__all__ = ('Histogram',)
+
+
+class Histogram:
+    '''Fixed buckets histogram, cheap enough to observe on hot paths.
+
+    `counts[i]` counts the values `<= bounds[i]` (and greater than
+    `bounds[i - 1]`), the extra last bucket counts the values greater than
+    all bounds.
+    '''
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    # in seconds, from 100us to 10s
+    DEFAULT_BOUNDS = (
+        0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+        0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    )
+
+    def __init__(self, bounds: Optional[Sequence[float]] = None):
+        self.bounds = (
+            self.DEFAULT_BOUNDS if bounds is None else tuple(sorted(bounds))
+        )
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: 'Histogram'):
+        '''Add the observations of `other` with the same bounds.'''
+        if other.bounds != self.bounds:
+            raise ValueError('cannot merge histograms with different bounds')
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            counts[index] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    def copy(self) -> 'Histogram':
+        histogram = self.__class__(self.bounds)
+        histogram.merge(self)
+        return histogram
+
+    def percentile(self, q: float) -> float:
+        '''Return the upper bound of the bucket holding the `q` percentile.
+
+        `q` is in [0, 100], returns `inf` if it falls in the last bucket,
+        and 0 if there is no observation.
+        '''
+        if not self.count:
+            return 0.0
+        rank = self.count * q / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                break
+        if index < len(self.bounds):
+            return self.bounds[index]
+        return float('inf')
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'bounds': list(self.bounds),
+            'counts': list(self.counts),
+            'count': self.count,
+            'sum': self.sum,
+        }
+
+    def __repr__(self):
+        return (
+            f'<{self.__class__.__name__} count={self.count} '
+            f'mean={self.mean:.6f}>'
+        )
@@ -0,0 +1,98 @@
+from typing import Callable, List, Optional
+
+from pymaid.conf import settings
+from pymaid.core import get_running_loop
+
+from .histogram import Histogram
+
+__all__ = ('LoopLagProbe', 'get_loop_lag_probe')
+
+
+class LoopLagProbe:
+    '''Measure the event loop lag with a periodic timer.
+
+    The timer is scheduled every `interval` seconds, `lag` is how late the
+    latest one ran, in seconds. A busy loop runs timers late.
+
+    All the samples are passed to `callbacks`, and observed by a histogram
+    rotated every `window` seconds, so `histogram` covers the samples of
+    the last one to two windows instead of the whole process lifetime.
+    '''
+
+    def __init__(
+        self, interval: float, window: Optional[float] = None, loop=None,
+    ):
+        self.interval = interval
+        if window is None:
+            window = settings.pymaid.LOOP_LAG_WINDOW
+        self.window = window
+        self.loop = loop or get_running_loop()
+        self.lag = 0.0
+        self.current = Histogram()
+        self.previous = Histogram()
+        self.rotate_time = self.loop.time() + window
+        self.callbacks: List[Callable[[float], None]] = []
+        self.expected_time = None
+        self.handle = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.handle is not None
+
+    @property
+    def histogram(self) -> Histogram:
+        '''The samples of the current and the previous windows.'''
+        histogram = self.previous.copy()
+        histogram.merge(self.current)
+        return histogram
+
+    def start(self):
+        if self.handle is None:
+            self._schedule()
+
+    def stop(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def _schedule(self):
+        self.expected_time = self.loop.time() + self.interval
+        self.handle = self.loop.call_at(self.expected_time, self._tick)
+
+    def _tick(self):
+        now = self.loop.time()
+        lag = self.lag = max(now - self.expected_time, 0.0)
+        # keep sampling even if callbacks raise
+        self._schedule()
+        if now >= self.rotate_time:
+            # drop the whole previous window if idle for longer than one
+            if now >= self.rotate_time + self.window:
+                self.previous = Histogram(self.current.bounds)
+            else:
+                self.previous = self.current
+            self.current = Histogram(self.previous.bounds)
+            self.rotate_time = now + self.window
+        self.current.observe(lag)
+        for callback in self.callbacks:
+            callback(lag)
+
+    def percentile(self, q: float) -> float:
+        return self.histogram.percentile(q)
+
+
+_probe = None
+
+
+def get_loop_lag_probe(interval: Optional[float] = None) -> LoopLagProbe:
+    '''Return the probe of the running loop, create it if needed.
+
+    The probe is not started here, the users that need the samples start it
+    explicitly, e.g. the stream channels with admission control.
+    '''
+    global _probe
+    loop = get_running_loop()
+    if _probe is None or _probe.loop is not loop:
+        if interval is None:
+            interval = settings.pymaid.LOOP_LAG_PROBE_INTERVAL
+        _probe = LoopLagProbe(interval, loop=loop)
+    return _probe
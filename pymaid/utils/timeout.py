@@ -7,6 +7,8 @@ from typing import Optional, Type
 
 from pymaid.core import current_task, get_running_loop
 
+from .wheel import get_timer
+
 
 __all__ = ('timeout', 'timeout_at')
 
@@ -154,7 +156,7 @@ class Timeout:
             else:
                 # state is ENTER
                 raise asyncio.CancelledError
-        self.timeout_handler = self.loop.call_at(
+        self.timeout_handler = get_timer().call_at(
             deadline, self.on_timeout, self.task
         )
 
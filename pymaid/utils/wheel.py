@@ -0,0 +1,212 @@
+from math import ceil
+from typing import Any, Callable, Optional
+
+from pymaid.conf import settings
+from pymaid.core import get_running_loop
+
+__all__ = ('TimerHandle', 'TimingWheel', 'get_timing_wheel', 'get_timer')
+
+
+class TimerHandle:
+    '''Returned by :meth:`TimingWheel.call_at`, like `asyncio.TimerHandle`.'''
+
+    __slots__ = ('_when', 'expires', 'callback', 'args', 'wheel', 'bucket')
+
+    def __init__(
+        self,
+        when: float,
+        expires: int,
+        callback: Callable,
+        args: tuple,
+        wheel: 'TimingWheel',
+    ):
+        self._when = when
+        # in ticks of the wheel
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.wheel = wheel
+        self.bucket = None
+
+    def when(self) -> float:
+        return self._when
+
+    def cancelled(self) -> bool:
+        return self.callback is None
+
+    def cancel(self):
+        if self.bucket is not None:
+            del self.bucket[self]
+            self.bucket = None
+            self.wheel.count -= 1
+        self.callback = None
+        self.args = None
+
+    def __repr__(self):
+        state = ' cancelled' if self.callback is None else ''
+        return f'<TimerHandle when={self._when:.3f}{state}>'
+
+
+class TimingWheel:
+    '''Hierarchical hashed timing wheel, for lots of coarse-grained timers.
+
+    Scheduling and cancelling are O(1), all the timers are driven by one
+    loop timer which runs every `tick` seconds while the wheel is not empty.
+    Timers run up to one tick late, never early.
+
+    Level `n` has `slots` buckets of `slots ** n` ticks each, timers are
+    moved to the lower levels when their buckets are due. Timers beyond
+    the top level wait in its farthest bucket and are moved again.
+    '''
+
+    def __init__(
+        self, tick: float, slots: int = 64, levels: int = 4, loop=None,
+    ):
+        if slots & (slots - 1):
+            raise ValueError(f'slots should be power of 2, got {slots}')
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.loop = loop or get_running_loop()
+        self.bits = slots.bit_length() - 1
+        self.mask = slots - 1
+        self.wheels = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self.origin = self.loop.time()
+        # the latest tick processed
+        self.ticks = 0
+        self.count = 0
+        self.handle = None
+
+    def call_later(
+        self, delay: float, callback: Callable, *args: Any,
+    ) -> TimerHandle:
+        return self.call_at(self.loop.time() + delay, callback, *args)
+
+    def call_at(
+        self, when: float, callback: Callable, *args: Any,
+    ) -> TimerHandle:
+        if self.handle is None:
+            # idle, catch up with the clock, all buckets are empty
+            self.ticks = int((self.loop.time() - self.origin) / self.tick)
+        expires = max(ceil((when - self.origin) / self.tick), self.ticks + 1)
+        timer = TimerHandle(when, expires, callback, args, self)
+        self._add(timer)
+        if self.handle is None:
+            self._schedule()
+        return timer
+
+    def _add(self, timer: TimerHandle):
+        delta = timer.expires - self.ticks
+        bits = self.bits
+        for level in range(self.levels):
+            if delta < 1 << (bits * (level + 1)):
+                break
+        else:
+            # beyond the top level, wait in its farthest bucket
+            level = self.levels - 1
+            delta = (1 << (bits * self.levels)) - 1
+        index = ((self.ticks + delta) >> (bits * level)) & self.mask
+        bucket = self.wheels[level][index]
+        bucket[timer] = None
+        timer.bucket = bucket
+        self.count += 1
+
+    def _schedule(self):
+        self.handle = self.loop.call_at(
+            self.origin + (self.ticks + 1) * self.tick, self._tick,
+        )
+
+    def _tick(self):
+        # the loop may run the timer late, process all the elapsed ticks
+        now = int((self.loop.time() - self.origin) / self.tick)
+        while self.ticks < now and self.count:
+            self._advance()
+        self.ticks = max(self.ticks, now)
+        if self.count:
+            self._schedule()
+        else:
+            self.handle = None
+
+    def _advance(self):
+        self.ticks += 1
+        ticks = self.ticks
+        bits, mask = self.bits, self.mask
+        # cascade the due buckets of upper levels
+        for level in range(1, self.levels):
+            if ticks & ((1 << (bits * level)) - 1):
+                break
+            wheel = self.wheels[level]
+            index = (ticks >> (bits * level)) & mask
+            bucket, wheel[index] = wheel[index], {}
+            self.count -= len(bucket)
+            for timer in bucket:
+                self._add(timer)
+        wheel = self.wheels[0]
+        bucket, wheel[ticks & mask] = wheel[ticks & mask], {}
+        self.count -= len(bucket)
+        for timer in bucket:
+            timer.bucket = None
+        for timer in bucket:
+            callback, args = timer.callback, timer.args
+            if callback is None:
+                # cancelled by the former callbacks
+                continue
+            try:
+                callback(*args)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as exc:
+                self.loop.call_exception_handler({
+                    'message': f'Exception in timer callback {callback!r}',
+                    'exception': exc,
+                    'handle': timer,
+                })
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        for wheel in self.wheels:
+            for bucket in wheel:
+                for timer in bucket:
+                    timer.bucket = None
+                bucket.clear()
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return (
+            f'<TimingWheel tick={self.tick} slots={self.slots} '
+            f'levels={self.levels} timers={self.count}>'
+        )
+
+
+_wheel = None
+
+
+def get_timing_wheel(tick: Optional[float] = None) -> TimingWheel:
+    '''Return the timing wheel of the running loop, create it if needed.'''
+    global _wheel
+    loop = get_running_loop()
+    if _wheel is None or _wheel.loop is not loop:
+        _wheel = TimingWheel(
+            tick or settings.pymaid.TIMING_WHEEL_TICK,
+            settings.pymaid.TIMING_WHEEL_SLOTS,
+            settings.pymaid.TIMING_WHEEL_LEVELS,
+            loop,
+        )
+    return _wheel
+
+
+def get_timer():
+    '''Return the timing wheel if `TIMING_WHEEL` is enabled, else the loop.
+
+    Both provide `call_later` and `call_at`, and their handles `cancel`.
+    '''
+    if settings.pymaid.TIMING_WHEEL:
+        return get_timing_wheel()
+    return get_running_loop()
@@ -152,6 +152,22 @@ async def test_serial_handler_close_on_exception():
     assert d['deltas'] == []
 
 
+@pytest.mark.asyncio
+async def test_submit_after_closed():
+    d = {'count': 0, 'deltas': []}
+
+    handler = SerialHandler(close_on_exception=True)
+    handler.submit(lambda: 1 / 0)
+    await sleep(0)
+    assert handler.is_closed
+    pending = Handler.total_pending_tasks
+    handler.submit(inc, d, 1)
+    handler.submit(async_inc(d, 2))
+    assert Handler.total_pending_tasks == pending
+    await sleep(0)
+    assert d['count'] == 0
+
+
 @pytest.mark.asyncio
 async def test_parallel_handler_close_on_exception():
     d = {'count': 0, 'deltas': []}
@@ -164,3 +180,32 @@ async def test_parallel_handler_close_on_exception():
 
     assert d['count'] == 0
     assert d['deltas'] == []
+
+
+@pytest.mark.asyncio
+async def test_handler_watermarks():
+    paused, resumed = mock.MagicMock(), mock.MagicMock()
+    d = {'count': 0, 'deltas': []}
+
+    handler = SerialHandler(high_water=3, low_water=1)
+    handler.on_pause.append(paused)
+    handler.on_resume.append(resumed)
+    async with handler:
+        handler.submit(inc, d, 1)
+        handler.submit(inc, d, 2)
+        assert not handler.is_paused
+        handler.submit(inc, d, 3)
+        assert handler.is_paused
+        paused.assert_called_once_with(handler)
+        handler.submit(inc, d, 4)
+        paused.assert_called_once_with(handler)
+        await sleep(0)
+        assert not handler.is_paused
+        resumed.assert_called_once_with(handler)
+
+    assert d['count'] == 10
+
+
+def test_handler_invalid_watermarks():
+    with pytest.raises(ValueError):
+        SerialHandler(high_water=1, low_water=2)
@@ -0,0 +1,44 @@
+import pytest
+
+from pymaid.core import sleep
+from pymaid.ext.middleware import MiddlewareManager, RegistryMiddleware
+from pymaid.ext.monitor import MonitorServiceImpl
+from pymaid.rpc.pb import dial_stream, serve_stream
+
+
+@pytest.mark.asyncio
+async def test_registry_middleware():
+    def tag(registry, conn):
+        registry.bind(conn, 'id', conn.id)
+        registry.add(conn, 'room', conn.id % 2)
+
+    server = await serve_stream(
+        'memory://registry_middleware',
+        services=[MonitorServiceImpl()],
+        middleware_manager=MiddlewareManager([RegistryMiddleware(tag)]),
+    )
+    conns = [
+        await dial_stream('memory://registry_middleware') for _ in range(3)
+    ]
+    while len(server.transports) < 3:
+        await sleep(0.001)
+
+    registry = server.registry
+    server_conns = list(server.transports.values())
+    for conn in server_conns:
+        assert registry.get('id', conn.id) is conn
+    assert sum(
+        registry.count('room', key) for key in (0, 1)
+    ) == len(server_conns)
+
+    # cleaned up once lost
+    conns[0].close()
+    while len(server.transports) > 2:
+        await sleep(0.001)
+    assert len(registry.tags) == 2
+
+    for conn in conns[1:]:
+        conn.close()
+    server.close()
+    await server.wait_for_closed()
+    assert registry.tags == {}
@@ -0,0 +1,86 @@
+import pytest
+
+from pymaid.error import BaseEx
+from pymaid.ext.middleware import MiddlewareManager
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.middleware import HeartbeatMiddleware
+from pymaid.ext.monitor.monitor_pb2 import StatsRequest
+from pymaid.rpc.pb import dial_stream, serve_stream
+from pymaid.rpc.pb.router import PBRouterStub
+from pymaid.utils.lag import get_loop_lag_probe
+
+service = PBRouterStub(MonitorService_Stub)
+
+
+@pytest.mark.asyncio
+async def test_monitor_get_stats():
+    server = await serve_stream(
+        'tcp4://localhost:8895',
+        name='MonitorChannel',
+        services=[MonitorServiceImpl()],
+    )
+    conn = await dial_stream('tcp4://localhost:8895')
+
+    await service.GetStats(StatsRequest(), conn=conn)
+    stats = await service.GetStats(StatsRequest(top=1), conn=conn)
+    channel = next(
+        ch for ch in stats.channels if ch.name == 'MonitorChannel'
+    )
+    assert channel.transport_count == 1
+    assert len(channel.transports) == 1
+    # the first call is done, the second one is being handled
+    transport = channel.transports[0]
+    assert transport.messages_in == 2
+    assert transport.messages_out == 1
+    assert transport.bytes_in > 0
+    assert transport.bytes_out > 0
+    assert transport.recv_calls >= 2
+    assert transport.send_calls >= 1
+    assert channel.total.bytes_in == transport.bytes_in
+    assert len(stats.loop_lag.counts) == len(stats.loop_lag.bounds) + 1
+    assert not stats.lag_paused
+    # reading the stats does not start the probe
+    assert not get_loop_lag_probe().is_running
+
+    # round trip times are observed on the calling side
+    assert conn.rtt.count == 2
+    assert conn.messages_out == 2
+    assert conn.messages_in == 2
+
+    with pytest.raises(BaseEx):
+        await service.GetStats(StatsRequest(order_by='invalid'), conn=conn)
+
+    conn.close()
+    await conn.wait_for_closed()
+    server.close()
+    await server.wait_for_closed()
+
+    # counters of closed transports are kept in channel total
+    stats = server.get_stats()
+    assert stats['transport_count'] == 0
+    assert stats['total']['messages_in'] >= 3
+    assert stats['total']['bytes_in'] >= transport.bytes_in
+    assert stats['transports'] == []
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_middleware():
+    server = await serve_stream(
+        'memory://heartbeat',
+        services=[MonitorServiceImpl()],
+        middleware_manager=MiddlewareManager([HeartbeatMiddleware(60, 3)]),
+    )
+    conn = await dial_stream('memory://heartbeat')
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    # the attributes are slots of the transports
+    server_conn = next(iter(server.transports.values()))
+    assert server_conn.__dict__ == {}
+    assert server_conn.heartbeat_count == 0
+    server_conn.heartbeat_count = 1
+    server_conn.clear_heartbeat_counter()
+    assert server_conn.heartbeat_count == 0
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+    assert not hasattr(server_conn, 'heartbeat_timer')
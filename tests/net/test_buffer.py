@@ -0,0 +1,84 @@
+from pymaid.net.utils.buffer import ReadBuffer
+from pymaid.rpc.pb.protocol import Protocol
+from pymaid.rpc.pb.pymaid_pb2 import Context as Meta, ErrorMessage
+
+
+def test_read_buffer():
+    buffer = ReadBuffer(b'abc')
+    buffer.extend(b'def')
+    assert len(buffer) == 6
+    buffer.consume(2)
+    assert bytes(buffer.view()) == b'cdef'
+    # not compacted for a small prefix
+    assert buffer.offset == 2
+
+    size = ReadBuffer.COMPACT_THRESHOLD
+    buffer.extend(b'x' * size)
+    buffer.consume(size)
+    assert buffer.offset == 0
+    assert bytes(buffer.view()) == b'x' * 4
+
+
+def test_read_buffer_exported():
+    buffer = ReadBuffer(b'a' * ReadBuffer.COMPACT_THRESHOLD + b'b')
+    view = buffer.view()
+    payload = view[-1:]
+    view.release()
+
+    # cannot move the bytes in place, copied instead
+    buffer.extend(b'c')
+    buffer.consume(ReadBuffer.COMPACT_THRESHOLD)
+    assert bytes(buffer.view()) == b'bc'
+    assert payload == b'b'
+    buffer.consume(1)
+    assert bytes(buffer.view()) == b'c'
+
+
+def test_read_buffer_packets_in_pieces():
+    meta = Meta(transmission_id=1, packet_flags=Meta.PacketFlag.END)
+    message = ErrorMessage(code='code', message='m' * 1000)
+    data = Protocol.encode(meta, message) * 200
+
+    buffer = ReadBuffer()
+    received = []
+    for offset in range(0, len(data), 333):
+        buffer.extend(data[offset:offset + 333])
+        view = buffer.view()
+        used_size, messages = Protocol.feed_data(view)
+        view.release()
+        received.extend(
+            ErrorMessage.FromString(payload) for _, payload in messages
+        )
+        del messages
+        buffer.consume(used_size)
+        assert buffer.offset < ReadBuffer.COMPACT_THRESHOLD + 333
+    assert len(buffer) == 0
+    assert received == [message] * 200
+
+
+def test_read_buffer_reused():
+    buffer = ReadBuffer()
+    buffer.extend(b'abc')
+    data = buffer.data
+    buffer.consume(3)
+    assert len(buffer) == 0
+    assert buffer.offset == buffer.end == 0
+    # the same bytearray, nothing allocated
+    buffer.extend(b'de')
+    assert buffer.data is data
+    assert bytes(buffer.view()) == b'de'
+
+    # not overwritten while exported
+    view = buffer.view()
+    payload = view[:1]
+    view.release()
+    buffer.consume(2)
+    buffer.extend(b'fg')
+    assert buffer.data is not data
+    assert payload == b'd'
+    assert bytes(buffer.view()) == b'fg'
+
+    # too large to keep
+    buffer.extend(b'x' * (ReadBuffer.KEEP_CAPACITY + 1))
+    buffer.consume(len(buffer))
+    assert len(buffer.data) == 0
@@ -0,0 +1,79 @@
+import pytest
+
+from pymaid.core import Event, sleep
+from pymaid.net import dial_datagram, serve_datagram
+from pymaid.net.datagram import Datagram
+from pymaid.net.raw import HAS_UNIX_FAMILY
+
+
+class _EchoDatagram(Datagram):
+
+    def datagram_received(self, data, addr):
+        self.sendto(data, addr)
+
+
+class _TestDatagram(Datagram):
+
+    def init(self):
+        self.received = []
+        self.received_event = Event()
+
+    def datagram_received(self, data, addr):
+        self.received.append(data)
+        self.received_event.set()
+
+
+async def _echo(address):
+    server = await serve_datagram(address, transport_class=_EchoDatagram)
+    assert len(server.transports) == 1
+    assert next(iter(server.transports.values())).peername is None
+
+    client = await dial_datagram(address, transport_class=_TestDatagram)
+    assert client.peername is not None
+    messages = [b'%d' % idx for idx in range(100)]
+    for message in messages:
+        client.sendto(message)
+    # batched and sent at the end of this loop iteration
+    assert client.write_buffer_size == sum(map(len, messages))
+    while len(client.received) < len(messages):
+        client.received_event.clear()
+        await client.received_event.wait()
+    assert client.received == messages
+
+    with pytest.raises(ValueError):
+        client.sendto(b'', ('127.0.0.1', 1))
+    client.close()
+    server.close()
+    await server.wait_for_closed()
+    assert not server.transports
+
+
+@pytest.mark.asyncio
+async def test_datagram_udp4():
+    await _echo('udp4://127.0.0.1:8895')
+
+
+@pytest.mark.skipif(not HAS_UNIX_FAMILY, reason='does not support unix')
+@pytest.mark.asyncio
+async def test_datagram_unix():
+    await _echo('unix:///tmp/pymaid_test_datagram.sock')
+
+
+@pytest.mark.asyncio
+async def test_datagram_channel_pause():
+    server = await serve_datagram(
+        'udp4://127.0.0.1:8896', transport_class=_TestDatagram,
+    )
+    transport = next(iter(server.transports.values()))
+    server.pause()
+    client = await dial_datagram(
+        'udp4://127.0.0.1:8896', transport_class=_TestDatagram,
+    )
+    client.sendto(b'paused')
+    await sleep(0.01)
+    assert not transport.received
+    server.start()
+    await transport.received_event.wait()
+    assert transport.received == [b'paused']
+    client.close()
+    server.close()
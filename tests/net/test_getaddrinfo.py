@@ -2,7 +2,10 @@ import socket
 
 import pytest
 
-from pymaid.net.raw import getaddrinfo, HAS_IPv6_FAMILY, HAS_UNIX_FAMILY
+from pymaid.conf import settings
+from pymaid.core import gather
+from pymaid.net.raw import dns_cache, getaddrinfo
+from pymaid.net.raw import HAS_IPv6_FAMILY, HAS_UNIX_FAMILY
 from pymaid.net.raw import STREAM_OPTS, DATAGRAM_OPTS, NET_OPTS
 
 
@@ -147,3 +150,67 @@ async def test_getaddrinfo_any_unix():
         assert info[0] == socket.AF_UNIX, infos
         assert info[1] in (socket.SOCK_STREAM, socket.SOCK_DGRAM), infos
         assert info[-1] == '/localhost:8888', infos
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    calls = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counting_getaddrinfo(host, *args, **kwargs):
+        calls.append(host)
+        if host == 'not.exists':
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service unknown')
+        return getaddrinfo(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'getaddrinfo', counting_getaddrinfo)
+    dns_cache.flush()
+    yield calls
+    dns_cache.flush()
+
+
+@pytest.mark.asyncio
+async def test_getaddrinfo_cache(resolver):
+    # concurrent lookups share one resolution
+    results = await gather(*(
+        getaddrinfo('localhost:8888', *STREAM_OPTS['tcp4'])
+        for _ in range(10)
+    ))
+    assert resolver == ['localhost']
+    assert all(infos == results[0] for infos in results)
+
+    # cached
+    infos = await getaddrinfo('localhost:8888', *STREAM_OPTS['tcp4'])
+    assert infos == results[0]
+    assert resolver == ['localhost']
+    assert len(dns_cache) == 1
+
+    # different key
+    await getaddrinfo('localhost:8889', *STREAM_OPTS['tcp4'])
+    assert len(resolver) == 2
+
+    dns_cache.flush('localhost')
+    assert len(dns_cache) == 0
+    await getaddrinfo('localhost:8888', *STREAM_OPTS['tcp4'])
+    assert len(resolver) == 3
+
+
+@pytest.mark.asyncio
+async def test_getaddrinfo_negative_cache(resolver):
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            await getaddrinfo('not.exists:8888', *STREAM_OPTS['tcp4'])
+    assert resolver == ['not.exists']
+
+
+@pytest.mark.asyncio
+async def test_getaddrinfo_cache_ttl(resolver):
+    ttl = settings.pymaid.DNS_CACHE_TTL
+    settings.pymaid.DNS_CACHE_TTL = 0
+    try:
+        for _ in range(2):
+            await getaddrinfo('localhost:8888', *STREAM_OPTS['tcp4'])
+    finally:
+        settings.pymaid.DNS_CACHE_TTL = ttl
+    assert resolver == ['localhost', 'localhost']
+    assert len(dns_cache) == 0
@@ -0,0 +1,133 @@
+import pytest
+
+import pymaid.net.ws
+from pymaid.core import Event, sleep
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.monitor_pb2 import StatsRequest
+from pymaid.net import dial_stream, serve_stream
+from pymaid.net.memory import MemorySocket, listeners
+from pymaid.rpc import pb
+from pymaid.rpc.pb.router import PBRouterStub
+
+from tests.common.models import _TestStreamChannel, _TestStream
+
+
+class _EchoStream(_TestStream):
+
+    def data_received(self, data):
+        self.write_sync(data)
+
+
+class _SinkStream(_TestStream):
+
+    def init(self):
+        super().init()
+        self.received_size = 0
+
+    def data_received(self, data):
+        self.received_size += len(data)
+
+
+class _EchoWebSocket(pymaid.net.ws.WebSocket):
+
+    def data_received(self, data):
+        self.write_sync(data)
+
+
+class _TestWebSocket(pymaid.net.ws.WebSocket):
+
+    def init(self):
+        self.data_received_event = Event()
+
+    def data_received(self, data):
+        self.received_data = data
+        self.data_received_event.set()
+
+
+@pytest.mark.asyncio
+async def test_memory_stream():
+    server = await serve_stream(
+        'memory://echo',
+        channel_class=_TestStreamChannel,
+        transport_class=_EchoStream,
+    )
+    assert 'echo' in listeners
+    with pytest.raises(OSError):
+        await serve_stream('memory://echo', transport_class=_EchoStream)
+    with pytest.raises(ConnectionRefusedError):
+        await dial_stream('memory://nobody', transport_class=_TestStream)
+
+    stream = await dial_stream('memory://echo', transport_class=_TestStream)
+    assert isinstance(stream._sock, MemorySocket)
+    await stream.write(b'from pymaid')
+    await stream.data_received_event.wait()
+    assert stream.received_data == b'from pymaid'
+    assert server.connected_stream.peername == stream.sockname
+    assert stream.recv_calls and stream.send_calls
+
+    # the peer is notified of close
+    stream.close()
+    await server.connected_stream.wait_for_closed()
+    server.close()
+    await server.wait_for_closed()
+    assert 'echo' not in listeners
+
+
+@pytest.mark.asyncio
+async def test_memory_stream_backpressure():
+    server = await serve_stream(
+        'memory://sink',
+        channel_class=_TestStreamChannel,
+        transport_class=_SinkStream,
+    )
+    stream = await dial_stream('memory://sink', transport_class=_TestStream)
+    size = MemorySocket.BUFFER_SIZE * 4 + 1
+    await stream.write(b'a' * size)
+    # more than the buffer, the writer waits for the reader
+    assert stream.write_buffer_size > 0
+    await stream.wait_for_write_all()
+    for _ in range(100):
+        if server.connected_stream.received_size == size:
+            break
+        await sleep(0.01)
+    assert server.connected_stream.received_size == size
+
+    stream.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_memory_websocket():
+    server = await serve_stream(
+        'memory://ws', transport_class=_EchoWebSocket,
+    )
+    ws = await dial_stream('memory://ws', transport_class=_TestWebSocket)
+    await ws.wait_for_ready()
+    await ws.write(b'from pymaid')
+    await ws.data_received_event.wait()
+    assert ws.received_data == b'from pymaid'
+
+    ws.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_memory_rpc():
+    service = PBRouterStub(MonitorService_Stub)
+    server = await pb.serve_stream(
+        'memory://monitor',
+        name='MemoryChannel',
+        services=[MonitorServiceImpl()],
+    )
+    conn = await pb.dial_stream('memory://monitor')
+
+    stats = await service.GetStats(StatsRequest(), conn=conn)
+    assert any(ch.name == 'MemoryChannel' for ch in stats.channels)
+    assert conn.messages_in == 1
+
+    conn.close()
+    await conn.wait_for_closed()
+    server.close()
+    await server.wait_for_closed()
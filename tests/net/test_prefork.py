@@ -0,0 +1,166 @@
+import socket
+
+import pytest
+
+from pymaid.conf import settings
+from pymaid.core import sleep
+from pymaid.net import dial_stream, serve_stream
+from pymaid.net.prefork import MAX_FDS, PreforkMaster, recv_fds, send_fds
+
+from tests.common.models import _TestStreamChannel, _TestStream
+
+
+async def wait_until(predicate, timeout=1):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await sleep(0.01)
+    assert predicate()
+
+
+@pytest.mark.asyncio
+async def test_adopt():
+    server = await serve_stream(
+        'tcp4://localhost:8897',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+        start_serving=False,
+    )
+    left, right = socket.socketpair()
+    conn = server.adopt(left)
+    assert conn is server.connected_stream
+    assert conn.id in server.transports
+
+    right.sendall(b'from pymaid')
+    await conn.data_received_event.wait()
+    assert conn.received_data == b'from pymaid'
+    conn.close()
+    right.close()
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_prefork_handoff(monkeypatch, tmp_path):
+    address = 'tcp4://localhost:8898'
+    path = str(tmp_path / 'handoff')
+    master = PreforkMaster([address], path)
+    await master.start()
+    monkeypatch.setitem(settings.pymaid, 'PREFORK_HANDOFF_PATH', path)
+    monkeypatch.setitem(
+        settings.pymaid, 'PREFORK_ADDRESSES', ['tcp4://localhost:8898'],
+    )
+
+    workers = [
+        await serve_stream(
+            address,
+            channel_class=_TestStreamChannel,
+            transport_class=_TestStream,
+        )
+        for _ in range(2)
+    ]
+    # not listening by itself
+    assert all(worker.listeners == [worker.handoff] for worker in workers)
+    await wait_until(lambda: len(master.workers[master.keys[0]]) == 2)
+
+    streams = [
+        await dial_stream(address, transport_class=_TestStream)
+        for _ in range(4)
+    ]
+    await wait_until(lambda: master.handoff_count == 4)
+    await wait_until(lambda: sum(len(w.transports) for w in workers) == 4)
+    assert [len(worker.transports) for worker in workers] == [2, 2]
+
+    await streams[0].write(b'from pymaid')
+    await wait_until(lambda: any(
+        getattr(conn, 'received_data', None) == b'from pymaid'
+        for worker in workers for conn in worker.transports.values()
+    ))
+
+    # loads reported back, the next ones go to the idle worker
+    for stream in streams:
+        if stream.sockname[1] in {
+            conn.peername[1] for conn in workers[0].transports.values()
+        }:
+            stream.close()
+    await wait_until(lambda: not workers[0].transports)
+    await wait_until(
+        lambda: [link.load for link in master.workers[master.keys[0]]]
+        == [0, 2]
+    )
+    streams = [
+        await dial_stream(address, transport_class=_TestStream)
+        for _ in range(2)
+    ]
+    await wait_until(lambda: len(workers[0].transports) == 2)
+    assert len(workers[1].transports) == 2
+
+    for worker in workers:
+        worker.close()
+    await wait_until(lambda: not master.workers[master.keys[0]])
+    master.close()
+
+
+def test_send_fds():
+    left, right = socket.socketpair(socket.AF_UNIX)
+    a, b = socket.socketpair()
+    assert send_fds(left, b'\0', [a.fileno(), b.fileno()]) == 1
+    data, fds = recv_fds(right, MAX_FDS, MAX_FDS)
+    assert data == b'\0'
+    assert len(fds) == 2
+    dup_a, dup_b = (socket.socket(fileno=fd) for fd in fds)
+    dup_a.sendall(b'from pymaid')
+    assert b.recv(100) == b'from pymaid'
+    for sock in (left, right, a, b, dup_a, dup_b):
+        sock.close()
+
+
+@pytest.mark.asyncio
+async def test_prefork_paused_worker(monkeypatch, tmp_path):
+    address = 'tcp4://localhost:8903'
+    path = str(tmp_path / 'handoff')
+    master = PreforkMaster([address], path)
+    await master.start()
+    monkeypatch.setitem(settings.pymaid, 'PREFORK_HANDOFF_PATH', path)
+    monkeypatch.setitem(settings.pymaid, 'PREFORK_ADDRESSES', [address])
+
+    workers = [
+        await serve_stream(
+            address,
+            channel_class=_TestStreamChannel,
+            transport_class=_TestStream,
+        )
+        for _ in range(2)
+    ]
+    links = master.workers[master.keys[0]]
+    await wait_until(lambda: len(links) == 2)
+
+    # the paused worker is skipped, even being the least loaded
+    workers[0].pause('test')
+    await wait_until(lambda: links[0].paused)
+    streams = [
+        await dial_stream(address, transport_class=_TestStream)
+        for _ in range(2)
+    ]
+    await wait_until(lambda: len(workers[1].transports) == 2)
+    assert not workers[0].transports
+
+    # stop accepting when all workers are paused
+    workers[1].pause('test')
+    await wait_until(lambda: links[1].paused)
+    assert not master._listening
+    streams.append(await dial_stream(address, transport_class=_TestStream))
+    await sleep(0.05)
+    assert master.handoff_count == 2
+
+    # waited in the backlog, taken by the started one
+    workers[0].start()
+    await wait_until(lambda: len(workers[0].transports) == 1)
+    assert not links[0].paused
+    assert master.handoff_count == 3
+
+    for stream in streams:
+        stream.close()
+    for worker in workers:
+        worker.close()
+    await wait_until(lambda: not links)
+    master.close()
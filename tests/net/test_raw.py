@@ -3,7 +3,9 @@ import socket
 
 import pytest
 
-from pymaid.core import sleep
+from pymaid.core import get_running_loop, sleep, CancelledError
+from pymaid.net import raw
+from pymaid.net.raw import connect_racing, interleave_addr_infos
 from pymaid.net.raw import sock_connect, sock_listen
 from pymaid.net.raw import HAS_IPv6_FAMILY, HAS_UNIX_FAMILY
 
@@ -143,3 +145,52 @@ async def test_sock_connect_unix_stream():
         sock.close()
 
     os.unlink('/tmp/pymaid_test_connect.sock')
+
+
+def test_interleave_addr_infos():
+    v4 = [(socket.AF_INET, 0, 0, '', (f'127.0.0.{i}', 0)) for i in (1, 2)]
+    v6 = [(socket.AF_INET6, 0, 0, '', (f'::{i}', 0)) for i in (1, 2, 3)]
+
+    assert interleave_addr_infos(v4) == v4
+    assert interleave_addr_infos(v6 + v4) == [
+        v6[0], v4[0], v6[1], v4[1], v6[2],
+    ]
+    assert interleave_addr_infos(v6 + v4, socket.AF_INET) == [
+        v4[0], v6[0], v4[1], v6[1], v6[2],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sock_connect_racing(monkeypatch):
+    sockets = await sock_listen('tcp4', 'localhost:8995')
+    cancelled = []
+    raw_connect_addr_info = raw.connect_addr_info
+
+    async def connect_addr_info(addr_info):
+        if addr_info[-1][0] == '127.0.0.2':
+            # simulate a dead route
+            try:
+                await sleep(10)
+            except CancelledError:
+                cancelled.append(addr_info)
+                raise
+        return await raw_connect_addr_info(addr_info)
+
+    monkeypatch.setattr(raw, 'connect_addr_info', connect_addr_info)
+    addr_infos = [
+        (socket.AF_INET, socket.SOCK_STREAM, 0, '', ('127.0.0.2', 8995)),
+        (socket.AF_INET, socket.SOCK_STREAM, 0, '', ('127.0.0.1', 8995)),
+    ]
+    loop = get_running_loop()
+    start = loop.time()
+    sock = await connect_racing(addr_infos, 0.05)
+    assert loop.time() - start < 1
+    assert sock.getpeername() == ('127.0.0.1', 8995)
+    # the loser is cancelled
+    assert cancelled == addr_infos[:1]
+    sock.close()
+
+    for sock in sockets:
+        sock.close()
+    with pytest.raises(ConnectionRefusedError):
+        await connect_racing(addr_infos[1:] * 2, 0.05)
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pymaid.core import sleep
+from pymaid.net import dial_stream, serve_stream
+from pymaid.net.registry import Registry
+
+from tests.common.models import _TestStreamChannel, _TestStream
+
+
+def make_registry(count):
+    transports = {
+        id: SimpleNamespace(id=id) for id in range(1, count + 1)
+    }
+    return Registry(transports), list(transports.values())
+
+
+def test_registry_unique():
+    registry, (a, b) = make_registry(2)
+    assert registry.bind(a, 'user', 'cat') is None
+    assert registry.get('user', 'cat') is a
+    assert registry.select('user', 'cat') == [a]
+
+    # rebinding moves to the new key
+    registry.bind(a, 'user', 'dog')
+    assert registry.get('user', 'cat') is None
+    assert registry.keys(a, 'user') == {'dog'}
+
+    # the former one is replaced and unbound
+    assert registry.bind(b, 'user', 'dog') is a
+    assert registry.get('user', 'dog') is b
+    assert registry.keys(a, 'user') == set()
+
+    with pytest.raises(ValueError):
+        registry.add(b, 'user', 'cat')
+    with pytest.raises(ValueError):
+        registry.bind(SimpleNamespace(id=3), 'user', 'cat')
+
+    registry.remove(b)
+    assert registry.get('user', 'dog') is None
+    assert registry.indexes == {'user': {}}
+    assert registry.tags == {}
+
+
+def test_registry_multi():
+    registry, (a, b, c) = make_registry(3)
+    for conn in (a, b, c):
+        registry.add(conn, 'room', 1)
+    registry.add(a, 'room', 2)
+    assert registry.select('room', 1) == [a, b, c]
+    assert registry.count('room', 1) == 3
+    assert registry.keys(a, 'room') == {1, 2}
+    assert registry.get('room', 1) is None
+
+    registry.discard(b, 'room', 1)
+    assert registry.select('room', 1) == [a, c]
+    registry.discard(a, 'room')
+    assert registry.select('room', 2) == []
+    assert registry.keys(a, 'room') == set()
+
+    registry.remove(c)
+    assert registry.count('room', 1) == 0
+    assert registry.indexes == {'room': {}}
+    assert registry.tags == {}
+
+
+@pytest.mark.asyncio
+async def test_channel_registry():
+    server = await serve_stream(
+        'memory://registry',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+    )
+    streams = []
+    conns = []
+    for index in range(3):
+        streams.append(
+            await dial_stream('memory://registry', transport_class=_TestStream)
+        )
+        while len(server.transports) <= index:
+            await sleep(0.001)
+        conn = server.connected_stream
+        server.registry.bind(conn, 'user', index)
+        server.registry.add(conn, 'room', index % 2)
+        conns.append(conn)
+
+    assert server.broadcast(
+        b'from pymaid', server.registry.select('room', 0)
+    ) == 2
+    for index in (0, 2):
+        await streams[index].data_received_event.wait()
+    assert not hasattr(streams[1], 'received_data')
+
+    # cleaned up once lost
+    streams[0].close()
+    await conns[0].wait_for_closed()
+    assert server.registry.get('user', 0) is None
+    assert server.registry.select('room', 0) == [conns[2]]
+
+    server.close()
+    await server.wait_for_closed()
+    assert server.registry.tags == {}
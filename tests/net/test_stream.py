@@ -1,9 +1,10 @@
+import io
 import os
 import socket
 
 import pytest
 
-from pymaid.core import sleep
+from pymaid.core import create_task, gather, sleep
 from pymaid.net.raw import HAS_IPv6_FAMILY
 from pymaid.net.stream import Stream
 
@@ -64,3 +65,299 @@ async def test_stream_data_received_overrided():
 
     with pytest.raises(TypeError):
         Stream(sock1)
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_writelines():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    s1, s2 = _TestStream(sock1), _TestStream(sock2)
+    await s1.writelines([b'from ', memoryview(b'pymaid'), bytearray(b'!')])
+    await s2.data_received_event.wait()
+    assert s2.received_data == b'from pymaid!'
+    assert not s1.write_buffer
+    assert s1.write_buffer_size == 0
+    s1.close()
+    s2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_write_buffered():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    sock2.setblocking(False)
+    s1 = _TestStream(sock1)
+    chunk = bytearray(b'a' * 64 * 1024)
+    parts = [chunk for _ in range(64)]
+    assert not s1.writelines_sync(parts)
+    # mutable buffers are snapshotted
+    chunk[:] = b'b' * len(chunk)
+    assert s1.write_buffer_size > 0
+    received = bytearray()
+    while len(received) < 64 * len(chunk):
+        await sleep(0)
+        try:
+            received.extend(sock2.recv(1024 * 1024))
+        except BlockingIOError:
+            pass
+    assert received == b'a' * 64 * len(chunk)
+    assert not s1.write_buffer
+    assert s1.write_buffer_size == 0
+    s1.close()
+    sock2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_auto_cork():
+    class CorkedStream(_TestStream):
+        AUTO_CORK = True
+        CORK_THRESHOLD = 16
+
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    sock2.setblocking(False)
+    s1 = CorkedStream(sock1)
+    # only buffered, not sent yet
+    assert not s1.write_sync(b'from ')
+    assert not s1.write_sync(b'pymaid')
+    # coalesced until the end of this loop iteration
+    assert s1.write_buffer_size == 11
+    with pytest.raises(BlockingIOError):
+        sock2.recv(1024)
+    await sleep(0)
+    assert not s1.write_buffer
+    assert sock2.recv(1024) == b'from pymaid'
+
+    # reaching threshold flushes at once
+    assert not s1.write_sync(b'from ')
+    assert s1.write_sync(b'pymaid, flushed')
+    assert not s1.write_buffer
+    assert sock2.recv(1024) == b'from pymaid, flushed'
+    s1.close()
+    sock2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_recv_into():
+    class RecvIntoStream(_TestStream):
+        RECV_INTO = True
+        MIN_RECV_SIZE = 1024
+        INIT_RECV_SIZE = 1024
+        RECV_SHRINK_COUNT = 1
+
+        def data_received(self, data):
+            assert isinstance(data, memoryview)
+            super().data_received(bytes(data))
+
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    s2 = RecvIntoStream(sock2)
+    sock1.sendall(b'a' * 1024)
+    await s2.data_received_event.wait()
+    assert s2.received_data == b'a' * 1024
+    # filled up, buffer grows
+    assert s2._recv_size == 2048
+
+    s2.data_received_event.clear()
+    sock1.sendall(b'from pymaid')
+    await s2.data_received_event.wait()
+    assert s2.received_data == b'from pymaid'
+    # mostly empty, buffer shrinks
+    assert s2._recv_size == 1024
+    sock1.close()
+    s2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.parametrize('recv_into', [False, True])
+@pytest.mark.asyncio
+async def test_stream_read_budget(recv_into):
+    class BurstStream(_TestStream):
+        RECV_INTO = recv_into
+        MAX_SIZE = INIT_RECV_SIZE = MIN_RECV_SIZE = 1024
+        MAX_READS = 4
+
+        def init(self):
+            super().init()
+            self.chunks = []
+
+        def data_received(self, data):
+            self.chunks.append(bytes(data))
+
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    s2 = BurstStream(sock2)
+    sock1.sendall(b'a' * 1024 * 6)
+    await sleep(0.01)
+    # drained in two wakeups, each reads up to 4 times
+    assert s2.chunks == [b'a' * 1024 * 4, b'a' * 1024 * 2]
+
+    BurstStream.MAX_READ_BYTES = 1024 * 3
+    s2.chunks.clear()
+    sock1.sendall(b'b' * 1024 * 4)
+    await sleep(0.01)
+    # limited by bytes
+    assert s2.chunks == [b'b' * 1024 * 3, b'b' * 1024]
+    sock1.close()
+    s2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_pause_reading():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    s1, s2 = _TestStream(sock1), _TestStream(sock2)
+    s2.pause_reading()
+    assert not s2.is_reading
+    await s1.write(b'from pymaid')
+    await sleep(0.001)
+    assert not s2.data_received_event.is_set()
+
+    s2.resume_reading()
+    assert s2.is_reading
+    await s2.data_received_event.wait()
+    assert s2.received_data == b'from pymaid'
+    s1.close()
+    s2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_write_backpressure():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    sock2.setblocking(False)
+    s1 = _TestStream(sock1)
+    s1.set_write_buffer_limits(high=64 * 1024)
+    assert s1.get_write_buffer_limits() == (16 * 1024, 64 * 1024)
+
+    data = b'a' * 1024 * 1024
+    writers = [create_task(s1.write(data)) for _ in range(4)]
+    await sleep(0)
+    # all writers are blocked by the high water mark
+    assert s1._writing_paused
+    assert not any(writer.done() for writer in writers)
+    waiters = [create_task(s1.wait_for_write_all()) for _ in range(2)]
+
+    received = 0
+    while received < len(data) * 4:
+        await sleep(0)
+        try:
+            received += len(sock2.recv(1024 * 1024))
+        except BlockingIOError:
+            pass
+    await gather(*writers, *waiters)
+    assert not s1._writing_paused
+    assert s1.write_buffer_size == 0
+    s1.close()
+    sock2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_shutdown_after_buffer_sent():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    sock2.setblocking(False)
+    s1 = _TestStream(sock1)
+    data = b'a' * 1024 * 1024
+    assert not s1.write_sync(data)
+    s1.shutdown()
+
+    received = bytearray()
+    while 1:
+        await sleep(0)
+        try:
+            chunk = sock2.recv(1024 * 1024)
+        except BlockingIOError:
+            continue
+        if not chunk:
+            break
+        received.extend(chunk)
+    assert received == data
+    s1.close()
+    sock2.close()
+
+
+async def _recv_exactly(sock, size):
+    received = bytearray()
+    while len(received) < size:
+        await sleep(0)
+        try:
+            received.extend(sock.recv(1024 * 1024))
+        except BlockingIOError:
+            pass
+    return received
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_sendfile(tmp_path):
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    sock2.setblocking(False)
+    s1 = _TestStream(sock1)
+    content = os.urandom(4 * 1024 * 1024)
+    path = tmp_path / 'data'
+    path.write_bytes(content)
+
+    with open(path, 'rb') as fp:
+        s1.write_sync(b'head')
+        sending = create_task(s1.sendfile(fp, offset=1024))
+        await sleep(0)
+        # written during sendfile, should be sent after the file content
+        s1.write_sync(b'tail')
+        received = await _recv_exactly(sock2, len(content) + 8 - 1024)
+        assert await sending == len(content) - 1024
+        assert fp.tell() == len(content)
+    assert received == b'head' + content[1024:] + b'tail'
+
+    with open(path, 'rb') as fp:
+        assert await s1.sendfile(fp, count=100) == 100
+        assert fp.tell() == 100
+    assert await _recv_exactly(sock2, 100) == content[:100]
+    s1.close()
+    sock2.close()
+
+
+@pytest.mark.skipif(
+    not getattr(socket, 'AF_UNIX', None),
+    reason='does not support unix domain sock'
+)
+@pytest.mark.asyncio
+async def test_stream_sendfile_fallback():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    sock2.setblocking(False)
+    s1 = _TestStream(sock1)
+    content = os.urandom(1024 * 1024)
+    # BytesIO has no fileno, data is sent by chunks
+    fp = io.BytesIO(content)
+    sending = create_task(s1.sendfile(fp, offset=10, count=len(content) - 20))
+    received = await _recv_exactly(sock2, len(content) - 20)
+    assert await sending == len(content) - 20
+    assert received == content[10:-10]
+    s1.close()
+    sock2.close()
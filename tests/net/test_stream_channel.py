@@ -3,9 +3,12 @@ import socket
 
 import pytest
 
+from pymaid.conf import settings
 from pymaid.core import sleep
+from pymaid.ext.handler import Handler
 from pymaid.net import dial_stream, serve_stream, create_channel
 from pymaid.net.raw import HAS_IPv6_FAMILY, HAS_UNIX_FAMILY
+from pymaid.utils.lag import get_loop_lag_probe
 
 from tests.common.models import _TestStreamChannel, _TestStream
 
@@ -113,3 +116,106 @@ async def test_channel_serve_forever_should_be_nursed():
 
     with pytest.raises(RuntimeError):
         await ch.serve_forever()
+
+
+@pytest.mark.asyncio
+async def test_stream_channel_accept_budget(monkeypatch):
+    monkeypatch.setattr(settings.pymaid, 'MAX_ACCEPT', 2)
+    server = await serve_stream(
+        'tcp4://localhost:8896',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+        start_serving=False,
+    )
+    listener = server.listeners[0]
+    clients = []
+    for _ in range(5):
+        client = socket.create_connection(('127.0.0.1', 8896))
+        clients.append(client)
+
+    server.read_from_listener(listener)
+    assert len(server.transports) == 2
+    server.read_from_listener(listener)
+    assert len(server.transports) == 4
+
+    # overloaded, connections are shed
+    monkeypatch.setattr(settings.pymaid, 'ADMISSION_MAX_PENDING_TASKS', 10)
+    monkeypatch.setattr(Handler, 'total_pending_tasks', 11)
+    assert server.is_overloaded()
+    server.read_from_listener(listener)
+    assert len(server.transports) == 4
+    assert server.shed_count == 1
+    with pytest.raises(ConnectionResetError):
+        clients[-1].recv(1)
+
+    for client in clients:
+        client.close()
+    for transport in list(server.transports.values()):
+        transport.close()
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_channel_loop_lag_guard(monkeypatch):
+    monkeypatch.setattr(settings.pymaid, 'LOOP_LAG_PAUSE_THRESHOLD', 0.1)
+    server = await serve_stream(
+        'tcp4://localhost:8899',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+    )
+    guard = server.lag_guard
+    assert guard.resume_lag == 0.05
+    assert guard in get_loop_lag_probe().callbacks
+
+    guard(0.2)
+    assert guard.lagging
+    assert server.state == server.STATE.PAUSED
+    # between the thresholds, still paused
+    guard(0.08)
+    assert server.state == server.STATE.PAUSED
+    guard(0.01)
+    assert not guard.lagging
+    assert server.state == server.STATE.STARTED
+    assert guard.pause_count == 1
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_channel_broadcast():
+    server = await serve_stream(
+        'tcp4://localhost:8901',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+    )
+    streams = [
+        await dial_stream('tcp4://localhost:8901', transport_class=_TestStream)
+        for _ in range(3)
+    ]
+    await sleep(0.01)
+    assert len(server.transports) == 3
+    closing, skipped, target = server.transports.values()
+    closing.close()
+
+    data = bytearray(b'from pymaid')
+    count = server.broadcast(
+        [b'header|', data], predicate=lambda conn: conn is not skipped,
+    )
+    assert count == 1
+    # snapshot is taken, mutation afterwards does not matter
+    data[:] = b'mutated'
+    assert server.broadcast(b'!', transports=[target]) == 1
+
+    for _ in range(10):
+        received = [
+            stream.received_data for stream in streams
+            if hasattr(stream, 'received_data')
+        ]
+        if b''.join(received) == b'header|from pymaid!':
+            break
+        await sleep(0.01)
+    assert b''.join(received) == b'header|from pymaid!'
+
+    for stream in streams:
+        if stream.state < stream.STATE.CLOSING:
+            stream.close()
+    server.close()
@@ -0,0 +1,188 @@
+import shutil
+import socket
+import ssl
+import subprocess
+
+import pytest
+
+from pymaid.core import TimeoutError, get_running_loop, sleep, wait_for
+from pymaid.net import dial_stream, serve_stream
+from pymaid.net.tls import session_cache
+
+from tests.common.models import _TestStreamChannel, _TestStream
+
+
+@pytest.fixture(scope='module')
+def certfile(tmp_path_factory):
+    if not shutil.which('openssl'):
+        pytest.skip('openssl command is required to generate certificate')
+    path = tmp_path_factory.mktemp('tls')
+    cert, key = str(path / 'cert.pem'), str(path / 'key.pem')
+    subprocess.run(
+        [
+            'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+            '-keyout', key, '-out', cert, '-days', '1',
+            '-subj', '/CN=localhost',
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def make_contexts(certfile):
+    cert, key = certfile
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert, key)
+    # session tickets of TLSv1.3 arrive after handshake,
+    # use TLSv1.2 to make session resumption deterministic
+    server_context.maximum_version = ssl.TLSVersion.TLSv1_2
+    client_context = ssl.create_default_context(cafile=cert)
+    return server_context, client_context
+
+
+@pytest.mark.asyncio
+async def test_tls_stream(certfile):
+    server_context, client_context = make_contexts(certfile)
+    session_cache.clear()
+    server = await serve_stream(
+        'tcp4://localhost:8893',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+        ssl_context=server_context,
+    )
+
+    stream = await dial_stream(
+        'tcp4://localhost:8893',
+        transport_class=_TestStream,
+        ssl_context=client_context,
+    )
+    assert stream.ssl_object.version() == 'TLSv1.2'
+    assert not stream.ssl_object.session_reused
+
+    # write before server handshake done is buffered and sent afterwards
+    await stream.write(b'from pymaid')
+    await server.connected_stream.data_received_event.wait()
+    assert server.connected_stream.received_data == b'from pymaid'
+
+    await server.connected_stream.write(b'from server')
+    await stream.data_received_event.wait()
+    assert stream.received_data == b'from server'
+
+    stream.close()
+    await stream.wait_for_closed()
+    assert len(session_cache) == 1
+
+    # reconnect should resume the cached session
+    stream = await dial_stream(
+        'tcp4://localhost:8893',
+        transport_class=_TestStream,
+        ssl_context=client_context,
+    )
+    assert stream.ssl_object.session_reused
+    stream.close()
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_tls_session_per_context(certfile):
+    server_context, client_context = make_contexts(certfile)
+    _, other_context = make_contexts(certfile)
+    session_cache.clear()
+    server = await serve_stream(
+        'tcp4://localhost:8902',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+        ssl_context=server_context,
+    )
+
+    stream = await dial_stream(
+        'tcp4://localhost:8902',
+        transport_class=_TestStream,
+        ssl_context=client_context,
+    )
+    stream.close()
+    await stream.wait_for_closed()
+    assert len(session_cache) == 1
+
+    # the session of the other context is not used
+    stream = await dial_stream(
+        'tcp4://localhost:8902',
+        transport_class=_TestStream,
+        ssl_context=other_context,
+    )
+    assert not stream.ssl_object.session_reused
+    stream.close()
+    await stream.wait_for_closed()
+    assert len(session_cache) == 2
+
+    stream = await dial_stream(
+        'tcp4://localhost:8902',
+        transport_class=_TestStream,
+        ssl_context=client_context,
+    )
+    assert stream.ssl_object.session_reused
+    stream.close()
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_tls_handshake_failed(certfile):
+    server_context, _ = make_contexts(certfile)
+    server = await serve_stream(
+        'tcp4://localhost:8894',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+        ssl_context=server_context,
+    )
+
+    # certificate is not trusted
+    with pytest.raises(ssl.SSLCertVerificationError):
+        await dial_stream(
+            'tcp4://localhost:8894',
+            transport_class=_TestStream,
+            ssl_context=True,
+        )
+    await sleep(0.01)
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_tls_pending_writes_flow_control(certfile):
+    server_context, client_context = make_contexts(certfile)
+    server = await serve_stream(
+        'tcp4://localhost:8904',
+        channel_class=_TestStreamChannel,
+        transport_class=_TestStream,
+        ssl_context=server_context,
+    )
+
+    # the client never starts the handshake
+    sock = socket.create_connection(('localhost', 8904))
+    await sleep(0.01)
+    stream = server.connected_stream
+    stream.set_write_buffer_limits(high=1024)
+    stream._writelines_sync((b'x' * 2048,))
+    assert stream._tls.pending_writes
+    assert stream.write_buffer_size >= 2048
+    # writers wait for the handshake
+    with pytest.raises(TimeoutError):
+        await wait_for(stream.drain(), 0.05)
+
+    def handshake_and_read():
+        tls_sock = client_context.wrap_socket(
+            sock, server_hostname='localhost',
+        )
+        received = b''
+        while len(received) < 2048:
+            received += tls_sock.recv(4096)
+        tls_sock.close()
+        return received
+
+    received = get_running_loop().run_in_executor(None, handshake_and_read)
+    await wait_for(stream.drain(), 1)
+    assert await wait_for(received, 1) == b'x' * 2048
+    assert stream.write_buffer_size == 0
+
+    server.close()
+    await server.wait_for_closed()
@@ -1,8 +1,14 @@
+import os
 import socket
 
 import pytest
 
+from pymaid.ext.handler import SerialHandler
+from pymaid.net.stream import Stream
 from pymaid.rpc.connection import Connection
+from pymaid.rpc.pb.context import ContextManager
+from pymaid.rpc.pb.protocol import Protocol
+from pymaid.rpc.pb.router import PBRouter
 
 from tests.common.models import _TestStream
 
@@ -40,3 +46,53 @@ def test_transport_pipeline():
 
     with pytest.raises(RuntimeError):
         Cls = Cls | Cls
+
+
+@pytest.mark.asyncio
+async def test_transport_idle_footprint():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    conn = (Stream | Connection)(
+        sock1,
+        protocol=Protocol(),
+        handler=SerialHandler(),
+        router=PBRouter(),
+        context_manager=ContextManager(initiative=False),
+    )
+    # attributes are slots, nothing is created for an idle connection
+    assert conn.__dict__ == {}
+    assert conn.write_buffer is None
+    assert conn.handler.task is None
+    assert conn.context_manager.contexts == {}
+    assert conn.family == socket.AF_UNIX
+
+    assert conn.write_sync(b'data')
+    assert conn.write_buffer is None
+    assert sock2.recv(4) == b'data'
+
+    closed = conn.closed_event
+    conn.close()
+    assert closed.is_set()
+    await conn.wait_for_closed()
+    sock2.close()
+
+
+@pytest.mark.asyncio
+async def test_transport_extra_attributes():
+    sock1, sock2 = socket.socketpair(socket.AF_UNIX.value)
+    conn = (Stream | Connection)(
+        sock1,
+        protocol=Protocol(),
+        handler=SerialHandler(),
+        router=PBRouter(),
+        context_manager=ContextManager(initiative=False),
+    )
+    # e.g. tagged by the connection pools
+    conn.pid = os.getpid()
+    assert conn.pid == os.getpid()
+    assert conn.__dict__ == {'pid': os.getpid()}
+    del conn.pid
+    assert not hasattr(conn, 'pid')
+
+    conn.close()
+    await conn.wait_for_closed()
+    sock2.close()
@@ -122,3 +122,17 @@ def test_unix_uri():
     with pytest.raises(ValueError):
         # no path
         parse_uri('unix://')
+
+
+def test_memory_uri():
+    uri = parse_uri('memory://Echo/path')
+
+    assert uri.scheme == 'memory'
+    assert uri.host == 'Echo'
+    assert uri.port is None
+    assert uri.path == '/path'
+    assert uri.address == 'Echo'
+
+    with pytest.raises(ValueError):
+        # no name
+        parse_uri('memory:///path')
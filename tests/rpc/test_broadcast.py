@@ -0,0 +1,138 @@
+import pytest
+
+from pymaid.conf import settings
+from pymaid.core import sleep
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.monitor_pb2 import StatsRequest
+from pymaid.net import dial_stream
+from pymaid.rpc import pb
+from pymaid.rpc.method import UnaryUnaryMethodStub
+from pymaid.rpc.pb import broadcast, serve_stream
+from pymaid.rpc.pb.router import PBRouterStub
+from pymaid.rpc.pb.protocol import Protocol
+from pymaid.rpc.pb.pymaid_pb2 import Context as Meta, ErrorMessage, Void
+
+from tests.common.models import _TestStream
+
+
+def make_stub(response_class=Void):
+    return UnaryUnaryMethodStub(
+        'Notify',
+        'pymaid.Test.Notify',
+        ErrorMessage,
+        response_class,
+        options={
+            'flags': Meta.PacketFlag.NULL,
+            'void_response': response_class is Void,
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_broadcast():
+    server = await serve_stream('tcp4://localhost:8900', services=[])
+    streams = [
+        await dial_stream('tcp4://localhost:8900', transport_class=_TestStream)
+        for _ in range(3)
+    ]
+    for _ in range(10):
+        if len(server.transports) == 3:
+            break
+        await sleep(0.01)
+    conns = list(server.transports.values())
+    # the first one has pushed before
+    conns[0].context_manager.next_transmission_id()
+
+    notify = make_stub()
+    count = broadcast(
+        server, notify, code='code', message='message',
+        predicate=lambda conn: conn is not conns[2],
+    )
+    assert count == 2
+
+    for _ in range(10):
+        if sum(hasattr(stream, 'received_data') for stream in streams) == 2:
+            break
+        await sleep(0.01)
+    transmission_ids = []
+    for stream in streams:
+        if not hasattr(stream, 'received_data'):
+            continue
+        _, messages = Protocol.feed_data(stream.received_data)
+        meta, payload = messages[0]
+        assert meta.service_method == 'pymaid.Test.Notify'
+        assert meta.packet_type == Meta.REQUEST
+        assert meta.packet_flags & Meta.PacketFlag.END
+        assert not meta.packet_flags & Meta.PacketFlag.CHUNK
+        assert ErrorMessage.FromString(payload) == ErrorMessage(
+            code='code', message='message',
+        )
+        transmission_ids.append(meta.transmission_id)
+    # ids of the passive side are even
+    assert sorted(transmission_ids) == [2, 4]
+    assert conns[0].messages_out == 1
+
+    with pytest.raises(ValueError):
+        broadcast(server, make_stub(ErrorMessage))
+
+    for stream in streams:
+        stream.close()
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_large(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    monkeypatch.setitem(settings.pymaid, 'PB_CHUNK_SIZE', 4096)
+    server = await serve_stream(
+        'memory://broadcast_large', services=[MonitorServiceImpl()],
+    )
+    service = PBRouterStub(MonitorService_Stub)
+    conns = [
+        await pb.dial_stream('memory://broadcast_large') for _ in range(2)
+    ]
+    received = []
+    for conn in conns:
+        # framing v2 negotiated
+        await service.GetStats(StatsRequest(top=0), conn=conn)
+        assert conn.framing_v2
+        conn.router.feed_messages = (
+            lambda conn, messages: received.extend(
+                (meta, bytes(payload)) for meta, payload in messages
+            ) or []
+        )
+
+    notify = make_stub()
+    message = 'x' * (Protocol.MAX_PACKET_LENGTH * 2)
+    assert broadcast(server, notify, code='code', message=message) == 2
+    for _ in range(10):
+        if len(received) == 2:
+            break
+        await sleep(0.01)
+    assert len(received) == 2
+    for meta, payload in received:
+        assert meta.service_method == 'pymaid.Test.Notify'
+        assert ErrorMessage.FromString(payload).message == message
+    # chunked
+    server_conn = next(iter(server.transports.values()))
+    assert server_conn.messages_out == 2
+    assert conns[0].messages_in > len(message) // 4096
+
+    # refused up front, the peer does not support framing v2
+    stream = await dial_stream(
+        'memory://broadcast_large', transport_class=_TestStream,
+    )
+    for _ in range(10):
+        if len(server.transports) == 3:
+            break
+        await sleep(0.01)
+    with pytest.raises(ValueError):
+        broadcast(server, notify, code='code', message=message)
+    assert not hasattr(stream, 'received_data')
+    assert len(received) == 2
+
+    stream.close()
+    for conn in conns:
+        conn.close()
+    server.close()
+    await server.wait_for_closed()
@@ -0,0 +1,137 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pymaid.conf import settings
+from pymaid.core import create_task, get_running_loop, sleep, wait_for
+from pymaid.core import TimeoutError
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.monitor_pb2 import StatsRequest
+from pymaid.rpc import pb
+from pymaid.rpc.context import Context
+from pymaid.rpc.method import StreamUnaryMethod, StreamUnaryMethodStub
+from pymaid.rpc.pb.pymaid_pb2 import ErrorMessage
+from pymaid.rpc.pb.router import PBRouterStub
+
+
+@pytest.mark.parametrize('timing_wheel', [False, True])
+@pytest.mark.asyncio
+async def test_context_timeout(monkeypatch, timing_wheel):
+    monkeypatch.setattr(settings.pymaid, 'TIMING_WHEEL', timing_wheel)
+    monkeypatch.setattr(settings.pymaid, 'TIMING_WHEEL_TICK', 0.005)
+    conn = SimpleNamespace(id=1)
+
+    context = Context(conn=conn, transmission_id=1, method=None, timeout=0.01)
+    async with context:
+        await sleep(0.05)
+        assert context.is_cancelled
+        assert context.is_closed
+
+    # no timeout
+    context = Context(conn=conn, transmission_id=3, method=None, timeout=0)
+    async with context:
+        assert context.timer is None
+        await sleep(0.02)
+        assert not context.is_cancelled
+    assert context.is_closed
+
+
+@pytest.mark.asyncio
+async def test_context_timeout_reason():
+    context = Context(
+        conn=SimpleNamespace(id=1), transmission_id=1, method=None,
+        timeout=0.01,
+    )
+    async with context:
+        # waiting for the response
+        context.waiter = waiter = get_running_loop().create_future()
+        with pytest.raises(TimeoutError):
+            await waiter
+
+
+@pytest.mark.asyncio
+async def test_context_throttle(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'REQUEST_QUEUE_HIGH_WATER', 2)
+    monkeypatch.setitem(settings.pymaid, 'REQUEST_QUEUE_LOW_WATER', 0)
+    server = await pb.serve_stream(
+        'memory://context_throttle', services=[MonitorServiceImpl()],
+    )
+    conn = await pb.dial_stream('memory://context_throttle')
+    # client streaming contexts
+    method = SimpleNamespace(
+        full_name='Service.Method', client_streaming=True,
+        server_streaming=False, options={},
+    )
+    manager = conn.context_manager
+    first = manager.new_inbound_context(2, method=method, conn=conn)
+    second = manager.new_inbound_context(4, method=method, conn=conn)
+
+    first.put_request(1)
+    first.put_request(2)
+    # the second one may be waiting for the requests
+    assert conn.is_reading
+    second.put_request(1)
+    second.put_request(2)
+    # all backed up
+    assert not conn.is_reading
+
+    # the response of an outbound call should be read
+    outbound = manager.new_outbound_context(method=method, conn=conn)
+    assert conn.is_reading
+    manager.release_context(outbound.transmission_id)
+    second.put_request(3)
+    assert not conn.is_reading
+
+    assert await first.recv_message() == 1
+    assert await first.recv_message() == 2
+    assert conn.is_reading
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_handler_throttle_waiting_context(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PENDING_TASKS_HIGH_WATER', 1)
+    monkeypatch.setitem(settings.pymaid, 'PENDING_TASKS_LOW_WATER', 0)
+    options = {'flags': 0, 'void_request': False, 'void_response': False}
+
+    async def join(context):
+        messages = []
+        async for request in context:
+            messages.append(request.message)
+        await context.send_message(ErrorMessage(message=''.join(messages)))
+
+    router = pb.router.PBRouter(services=[MonitorServiceImpl()])
+    router.routes['test.Join'] = StreamUnaryMethod(
+        'Join', 'test.Join', join, ErrorMessage, ErrorMessage,
+        options=options,
+    )
+    server = await pb.serve_stream(
+        'memory://handler_throttle', router=router,
+    )
+    conn = await pb.dial_stream('memory://handler_throttle')
+    stub = StreamUnaryMethodStub(
+        'Join', 'test.Join', ErrorMessage, ErrorMessage, options=options,
+    )
+    service = PBRouterStub(MonitorService_Stub)
+
+    async with stub.open(conn=conn) as context:
+        await context.send_message(ErrorMessage(message='from '))
+        await sleep(0.01)
+        # queued behind the streaming one, the serial handler is at high water
+        stats = create_task(service.GetStats(StatsRequest(top=0), conn=conn))
+        await sleep(0.01)
+        server_conn = next(iter(server.transports.values()))
+        assert server_conn.handler.is_paused
+        # still read, the running one is waiting for it
+        assert server_conn.is_reading
+        await context.send_message(ErrorMessage(message='pymaid'), end=True)
+        response = await wait_for(context.recv_message(), 1)
+    assert response.message == 'from pymaid'
+    await wait_for(stats, 1)
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
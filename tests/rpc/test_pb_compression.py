@@ -0,0 +1,160 @@
+import threading
+import zlib
+
+import pytest
+
+from pymaid.conf import settings
+from pymaid.core import wait_for
+from pymaid.error import BaseEx
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.monitor_pb2 import StatsRequest
+from pymaid.net.stream import Stream
+from pymaid.rpc import connection, pb
+from pymaid.rpc.pb.compression import (
+    compress, decompress, get_codec, register_codec,
+)
+from pymaid.rpc.pb.error import PBError
+from pymaid.rpc.pb.pymaid_pb2 import Context as Meta
+from pymaid.rpc.pb.router import PBRouterStub
+
+GET_STATS = 'pymaid.ext.monitor.MonitorService.GetStats'
+
+# threads compressed in
+compressed_in = []
+
+
+def counting_compress(data):
+    compressed_in.append(threading.get_ident())
+    return zlib.compress(data)
+
+
+register_codec(
+    'counting', 200, counting_compress, get_codec('zlib').decompress,
+)
+
+
+async def serve(address):
+    return await pb.serve_stream(
+        address, name='CompressionChannel', services=[MonitorServiceImpl()],
+    )
+
+
+@pytest.mark.asyncio
+async def test_compress():
+    payload = b'pymaid' * 1000
+    data = await compress('zlib', payload)
+    assert data[0] == 1
+    assert len(data) < len(payload)
+    assert decompress(data, len(payload)) == payload
+
+    with pytest.raises(PBError.PacketTooLarge):
+        decompress(data, len(payload) - 1)
+    with pytest.raises(PBError.InvalidPayload):
+        decompress(data[:-10], len(payload))
+    with pytest.raises(PBError.InvalidPayload):
+        decompress(b'\xff' + data[1:], len(payload))
+    with pytest.raises(ValueError):
+        await compress('unknown', payload)
+
+    with pytest.raises(ValueError):
+        register_codec('zlib', 100, zlib.compress, zlib.decompress)
+    with pytest.raises(ValueError):
+        register_codec('zlib2', 1, zlib.compress, zlib.decompress)
+    with pytest.raises(ValueError):
+        register_codec('zlib2', 256, zlib.compress, zlib.decompress)
+
+
+@pytest.mark.asyncio
+async def test_compression(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_COMPRESSION', True)
+    # the error of the large request is sent back in framing v2
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    monkeypatch.setitem(
+        settings.pymaid, 'PB_COMPRESSION_METHODS', {GET_STATS: 'counting'},
+    )
+    monkeypatch.setitem(settings.pymaid, 'PB_COMPRESSION_THRESHOLD', 64)
+    service = PBRouterStub(MonitorService_Stub)
+    assert service.GetStats.options['compression'] == 'counting'
+    server = await serve('memory://compression')
+    conn = await pb.dial_stream('memory://compression')
+    del compressed_in[:]
+
+    # the request is not compressed, the server is unknown yet
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    assert conn.compression
+    # the response is compressed
+    assert len(compressed_in) == 1
+
+    server_conn = next(iter(server.transports.values()))
+    bytes_in = server_conn.bytes_in
+    with pytest.raises(BaseEx) as info:
+        await service.GetStats(StatsRequest(order_by='x' * 10000), conn=conn)
+    assert info.value.data == {'order_by': 'x' * 10000}
+    assert len(compressed_in) == 2
+    assert server_conn.bytes_in - bytes_in < 1000
+    # compressed in the event loop
+    assert set(compressed_in) == {threading.get_ident()}
+
+    monkeypatch.setitem(settings.pymaid, 'PB_COMPRESSION_OFFLOAD_SIZE', 0)
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    assert compressed_in[-1] != threading.get_ident()
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_compression_v1_peer(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_COMPRESSION', True)
+    monkeypatch.setitem(
+        settings.pymaid, 'PB_COMPRESSION_METHODS', {GET_STATS: 'zlib'},
+    )
+    monkeypatch.setitem(settings.pymaid, 'PB_COMPRESSION_THRESHOLD', 0)
+    service = PBRouterStub(MonitorService_Stub)
+    server = await serve('memory://compression_v1')
+    # connections without compression support
+    conn = await pb.dial_stream(
+        'memory://compression_v1',
+        transport_class=Stream | connection.Connection,
+    )
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    await service.GetStats(StatsRequest(), conn=conn)
+    server_conn = next(iter(server.transports.values()))
+    assert not server_conn.compression
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_compression_disabled(monkeypatch):
+    monkeypatch.setitem(
+        settings.pymaid, 'PB_COMPRESSION_METHODS', {GET_STATS: 'zlib'},
+    )
+    monkeypatch.setitem(settings.pymaid, 'PB_COMPRESSION_THRESHOLD', 0)
+    assert not settings.pymaid.PB_COMPRESSION
+    service = PBRouterStub(MonitorService_Stub)
+    server = await serve('memory://compression_disabled')
+    conn = await pb.dial_stream('memory://compression_disabled')
+
+    # the peer advertises compression, but it is disabled locally
+    async with service.GetStats.open(conn=conn) as context:
+        await conn.send_message(
+            Meta(
+                transmission_id=context.transmission_id,
+                service_method=GET_STATS,
+                packet_type=Meta.REQUEST,
+                packet_flags=Meta.PacketFlag.END | Meta.PacketFlag.COMPRESSION,
+            ),
+            StatsRequest(top=0),
+        )
+        # not compressed, or refused by the disabled client
+        await wait_for(context.recv_message(), 1)
+    server_conn = next(iter(server.transports.values()))
+    assert not server_conn.compression
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
@@ -0,0 +1,210 @@
+import pytest
+
+from pymaid.conf import settings
+from pymaid.core import create_task, gather, sleep, wait_for
+from pymaid.error import BaseEx
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.monitor_pb2 import StatsRequest
+from pymaid.net.stream import Stream
+from pymaid.rpc import connection, pb
+from pymaid.rpc.pb.error import PBError
+from pymaid.rpc.pb.protocol import Protocol
+from pymaid.rpc.pb.pymaid_pb2 import Context as Meta
+from pymaid.rpc.pb.router import PBRouterStub
+
+service = PBRouterStub(MonitorService_Stub)
+
+
+async def serve(address):
+    return await pb.serve_stream(
+        address, name='FramingChannel', services=[MonitorServiceImpl()],
+    )
+
+
+@pytest.mark.asyncio
+async def test_framing_v2(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    monkeypatch.setitem(settings.pymaid, 'PB_CHUNK_SIZE', 64)
+    server = await serve('memory://framing_v2')
+    conn = await pb.dial_stream('memory://framing_v2')
+    assert not conn.framing_v2
+
+    # the response is chunked already, the server knows the client
+    stats = await service.GetStats(StatsRequest(), conn=conn)
+    assert stats.ByteSize() > 64
+    assert conn.framing_v2
+    server_conn = next(iter(server.transports.values()))
+    assert server_conn.framing_v2
+    bytes_in = server_conn.bytes_in
+
+    # the request is joined before routing
+    with pytest.raises(BaseEx) as info:
+        await service.GetStats(StatsRequest(order_by='x' * 10000), conn=conn)
+    assert info.value.data == {'order_by': 'x' * 10000}
+    assert server_conn.bytes_in - bytes_in > 10000
+    assert server_conn.messages_in > 10000 // 64
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_framing_v2_interleaving(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    monkeypatch.setitem(settings.pymaid, 'PB_CHUNK_SIZE', 1024)
+    server = await serve('memory://framing_v2_interleaving')
+    conn = await pb.dial_stream('memory://framing_v2_interleaving')
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    assert conn.framing_v2
+
+    done = []
+
+    async def call(coro, name):
+        try:
+            await coro
+        except BaseEx:
+            pass
+        done.append(name)
+
+    large = create_task(call(
+        service.GetStats(StatsRequest(order_by='x' * 200000), conn=conn),
+        'large',
+    ))
+    small = create_task(call(
+        service.GetStats(StatsRequest(top=0), conn=conn), 'small',
+    ))
+    await wait_for(large, 5)
+    await small
+    # not blocked by the large one
+    assert done == ['small', 'large']
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_framing_v2_reassembly_limit(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    monkeypatch.setitem(settings.pymaid, 'PB_CHUNK_SIZE', 64)
+    monkeypatch.setitem(settings.pymaid, 'PB_MAX_REASSEMBLY_SIZE', 1000)
+    server = await serve('memory://framing_v2_limit')
+    conn = await pb.dial_stream('memory://framing_v2_limit')
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+
+    with pytest.raises(Exception):
+        await wait_for(
+            service.GetStats(StatsRequest(order_by='x' * 2000), conn=conn), 1,
+        )
+    # the server closed the connection
+    await wait_for(conn.wait_for_closed(), 1)
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_framing_v1_peer(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    server = await serve('memory://framing_v1')
+    # connections without framing v2 support
+    conn = await pb.dial_stream(
+        'memory://framing_v1',
+        transport_class=Stream | connection.Connection,
+    )
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    await service.GetStats(StatsRequest(), conn=conn)
+    server_conn = next(iter(server.transports.values()))
+    assert not server_conn.framing_v2
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_framing_v2_disabled():
+    assert not settings.pymaid.PB_FRAMING_V2
+    server = await serve('memory://framing_v2_disabled')
+    conn = await pb.dial_stream('memory://framing_v2_disabled')
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    await service.GetStats(StatsRequest(), conn=conn)
+    server_conn = next(iter(server.transports.values()))
+    assert not conn.framing_v2
+    assert not server_conn.framing_v2
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_framing_v2_chunk_size(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    monkeypatch.setitem(
+        settings.pymaid, 'PB_CHUNK_SIZE', Protocol.MAX_CHUNK_LENGTH + 1,
+    )
+    server = await serve('memory://framing_v2_chunk_size')
+    with pytest.raises(ValueError):
+        await pb.dial_stream('memory://framing_v2_chunk_size')
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_framing_v2_same_transmission(monkeypatch):
+    monkeypatch.setitem(settings.pymaid, 'PB_FRAMING_V2', True)
+    monkeypatch.setitem(settings.pymaid, 'PB_CHUNK_SIZE', 64)
+    server = await serve('memory://framing_v2_same_transmission')
+    conn = await pb.dial_stream('memory://framing_v2_same_transmission')
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    assert conn.framing_v2
+    received = []
+    server.router.feed_messages = lambda conn, messages: received.extend(
+        (meta, bytes(payload)) for meta, payload in messages
+    ) or []
+
+    # e.g. concurrent sending of a streaming context
+    messages = [
+        StatsRequest(order_by=char * 1000) for char in 'ab'
+    ] + [StatsRequest(order_by='c')]
+    await gather(*(
+        conn.send_message(Meta(transmission_id=101), message)
+        for message in messages
+    ))
+    for _ in range(10):
+        if len(received) == 3:
+            break
+        await sleep(0.01)
+    assert [
+        StatsRequest.FromString(payload) for _, payload in received
+    ] == messages
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_framing_v1_packet_too_large():
+    server = await serve('memory://framing_v1_too_large')
+    conn = await pb.dial_stream('memory://framing_v1_too_large')
+    assert not conn.framing_v2
+
+    # refused before sending, instead of closed by the peer
+    with pytest.raises(BaseEx) as info:
+        await service.GetStats(
+            StatsRequest(order_by='x' * Protocol.MAX_PACKET_LENGTH), conn=conn,
+        )
+    # the registry may be cleared by the other tests, see test_error
+    assert info.value.code.endswith(PBError.PacketTooLarge.code)
+    with pytest.raises(BaseEx):
+        await service.GetStats(StatsRequest(order_by='x' * 70000), conn=conn)
+    # still working
+    await service.GetStats(StatsRequest(top=0), conn=conn)
+    server_conn = next(iter(server.transports.values()))
+    assert server_conn.bytes_in < Protocol.MAX_PACKET_LENGTH
+
+    conn.close()
+    server.close()
+    await server.wait_for_closed()
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from google.protobuf.message import DecodeError
+
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.monitor_pb2 import StatsRequest
+from pymaid.rpc import pb
+from pymaid.rpc.pb.meta import FastMeta
+from pymaid.rpc.pb.protocol import FastProtocol, Protocol
+from pymaid.rpc.pb.pymaid_pb2 import Context as Meta, ErrorMessage
+from pymaid.rpc.pb.router import PBRouterStub
+
+
+def random_fields():
+    return {
+        'transmission_id': random.choice(
+            [0, 1, 127, 128, 300, 2 ** 32 - 1, random.randrange(2 ** 32)]
+        ),
+        'packet_type': random.choice([0, Meta.REQUEST, Meta.RESPONSE]),
+        'packet_flags': random.choice([0, 1, 2, 4, 5, 6, 7]),
+        'priority': random.choice([0, Meta.MID, Meta.HIGH]),
+        'service_method': random.choice(['', 'pymaid.Service.Method', 'ä']),
+        'is_cancelled': random.choice([False, True]),
+        'is_failed': random.choice([False, True]),
+    }
+
+
+def test_fast_meta_wire_compatible():
+    for _ in range(1000):
+        fields = random_fields()
+        meta, fast_meta = Meta(**fields), FastMeta(**fields)
+        data = meta.SerializeToString()
+        assert fast_meta.SerializeToString() == data
+        assert FastMeta.FromString(data) == meta
+        assert FastMeta.FromString(memoryview(data)) == fast_meta
+
+    # unknown fields are skipped
+    data = Meta(transmission_id=1, service_method='a').SerializeToString()
+    unknown = b'\x40\x96\x01' + b'\x4a\x02ab' + b'\x51' + b'\x00' * 8
+    assert FastMeta.FromString(unknown + data) == FastMeta(
+        transmission_id=1, service_method='a'
+    )
+
+    for data in (b'\x08', b'\x08\x80', b'\x2a\x05abc', b'\x0f'):
+        with pytest.raises(DecodeError):
+            FastMeta.FromString(data)
+
+
+def test_fast_protocol():
+    meta = FastMeta(
+        transmission_id=1,
+        service_method='pymaid.Service.Method',
+        packet_type=Meta.REQUEST,
+        packet_flags=Meta.PacketFlag.END,
+    )
+    message = ErrorMessage(code='code', message='message')
+    data = FastProtocol.encode(meta, message)
+    assert data == Protocol.encode(
+        Meta(
+            transmission_id=1,
+            service_method='pymaid.Service.Method',
+            packet_type=Meta.REQUEST,
+            packet_flags=Meta.PacketFlag.END,
+        ),
+        message,
+    )
+    used_size, messages = FastProtocol.feed_data(data)
+    assert used_size == len(data)
+    assert isinstance(messages[0][0], FastMeta)
+    assert messages[0][0] == meta
+
+
+@pytest.mark.asyncio
+async def test_fast_protocol_rpc():
+    service = PBRouterStub(MonitorService_Stub)
+    server = await pb.serve_stream(
+        'memory://fast_meta',
+        services=[MonitorServiceImpl()],
+        protocol_class=FastProtocol,
+    )
+    # either protocol works with the other one
+    for protocol_class in (Protocol, FastProtocol):
+        conn = await pb.dial_stream(
+            'memory://fast_meta', protocol_class=protocol_class,
+        )
+        stats = await service.GetStats(StatsRequest(), conn=conn)
+        assert stats.channels
+        conn.close()
+        await conn.wait_for_closed()
+    server.close()
+    await server.wait_for_closed()
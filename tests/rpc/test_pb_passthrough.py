@@ -0,0 +1,91 @@
+import pytest
+
+from pymaid.error import BaseEx
+from pymaid.ext.monitor import MonitorServiceImpl, MonitorService_Stub
+from pymaid.ext.monitor.error import MonitorError
+from pymaid.ext.monitor.monitor_pb2 import Stats, StatsRequest
+from pymaid.rpc import pb
+from pymaid.rpc.method import UnaryUnaryMethodStub
+from pymaid.rpc.pb.error import PBError
+from pymaid.rpc.pb.passthrough import PassthroughMethod, RawMessage
+from pymaid.rpc.pb.router import PBRouter, PBRouterStub
+
+GET_STATS = 'pymaid.ext.monitor.MonitorService.GetStats'
+
+service = PBRouterStub(MonitorService_Stub)
+
+
+@pytest.mark.asyncio
+async def test_passthrough():
+    backend = await pb.serve_stream(
+        'memory://passthrough_backend',
+        name='BackendChannel',
+        services=[MonitorServiceImpl()],
+    )
+    upstream = await pb.dial_stream('memory://passthrough_backend')
+
+    router = PBRouter()
+    router.include_passthrough('pymaid.ext.monitor.*', upstream)
+    gateway = await pb.serve_stream(
+        'memory://passthrough_gateway', name='GatewayChannel', router=router,
+    )
+    route = gateway.router.get_route(GET_STATS)
+    assert isinstance(route, PassthroughMethod)
+    assert route.request_class is RawMessage
+    assert route.response_class is RawMessage
+    assert gateway.router.get_route('.' + GET_STATS) is not None
+    assert gateway.router.get_route('pymaid.Other.GetStats') is None
+
+    conn = await pb.dial_stream('memory://passthrough_gateway')
+    stats = await service.GetStats(StatsRequest(top=1), conn=conn)
+    assert isinstance(stats, Stats)
+    names = {channel.name for channel in stats.channels}
+    assert {'BackendChannel', 'GatewayChannel'} <= names
+    backend_conn = next(iter(backend.transports.values()))
+    assert backend_conn.messages_in == 1
+
+    # relayed as is
+    with pytest.raises(BaseEx) as info:
+        await service.GetStats(StatsRequest(order_by='x'), conn=conn)
+    # the registry may be cleared by the other tests, see test_error
+    assert info.value.code.endswith(MonitorError.InvalidOrderBy.code)
+    assert info.value.data == {'order_by': 'x'}
+    assert backend_conn.messages_in == 2
+    # still working
+    await service.GetStats(StatsRequest(), conn=conn)
+    assert not conn.context_manager.contexts
+    assert not upstream.context_manager.contexts
+
+    conn.close()
+    upstream.close()
+    gateway.close()
+    backend.close()
+    await gateway.wait_for_closed()
+    await backend.wait_for_closed()
+
+
+@pytest.mark.asyncio
+async def test_passthrough_failed():
+
+    async def unavailable():
+        raise ConnectionRefusedError('backend is down')
+
+    router = PBRouter()
+    router.include_passthrough('backend.*', unavailable)
+    gateway = await pb.serve_stream(
+        'memory://passthrough_failed', router=router,
+    )
+    conn = await pb.dial_stream('memory://passthrough_failed')
+    method = UnaryUnaryMethodStub(
+        'Method', 'backend.Service.Method', StatsRequest, Stats,
+        options={'flags': 0},
+    )
+    with pytest.raises(BaseEx) as info:
+        await method(StatsRequest(), conn=conn)
+    assert info.value.code.endswith(PBError.PassthroughFailed.code)
+    assert 'backend is down' in info.value.message
+    assert info.value.data['name'] == 'backend.Service.Method'
+
+    conn.close()
+    gateway.close()
+    await gateway.wait_for_closed()
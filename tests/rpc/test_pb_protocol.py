@@ -0,0 +1,94 @@
+import pytest
+
+from pymaid.rpc.pb.error import PBError
+from pymaid.rpc.pb.protocol import Protocol
+from pymaid.rpc.pb.pymaid_pb2 import Context as Meta, ErrorMessage
+
+
+def test_encode_parts():
+    meta = Meta(
+        transmission_id=1,
+        service_method='pymaid.Service.Method',
+        packet_type=Meta.REQUEST,
+        packet_flags=Meta.PacketFlag.END,
+    )
+    message = ErrorMessage(code='code', message='message')
+    parts = Protocol.encode_parts(meta, message)
+    assert len(parts) == 3
+    assert b''.join(parts) == Protocol.encode(meta, message)
+
+    used_size, messages = Protocol.feed_data(b''.join(parts) * 2)
+    assert used_size == 2 * len(b''.join(parts))
+    assert len(messages) == 2
+    for decoded_meta, payload in messages:
+        assert decoded_meta == meta
+        assert ErrorMessage.FromString(payload) == message
+
+
+def test_encode_shared():
+    meta = Meta(
+        service_method='pymaid.Service.Method',
+        packet_type=Meta.REQUEST,
+        packet_flags=Meta.PacketFlag.END,
+    )
+    message = ErrorMessage(code='code', message='message')
+    encode = Protocol.encode_shared(meta, message)
+    for transmission_id in (0, 1, 2, 127, 128, 300, 2 ** 32 - 1):
+        meta.transmission_id = transmission_id
+        parts = encode(transmission_id)
+        assert b''.join(parts) == Protocol.encode(meta, message)
+        used_size, messages = Protocol.feed_data(b''.join(parts))
+        assert messages[0][0].transmission_id == transmission_id
+
+    # shared among the calls
+    assert encode(1)[1] is encode(3)[1]
+    assert encode(1)[2] is encode(3)[2]
+
+    # framing v2
+    message = ErrorMessage(code='code', message='m' * 1000)
+    encode = Protocol.encode_shared(meta, message)
+    for chunk_size in (100, 1024, 4096):
+        meta.transmission_id = 300
+        parts = encode(300, chunk_size)
+        assert b''.join(parts) == b''.join(
+            b''.join(packet) for packet in Protocol.encode_chunks(
+                meta, message.SerializeToString(), chunk_size,
+            )
+        )
+
+
+def test_encode_chunks():
+    meta = Meta(
+        transmission_id=300,
+        service_method='pymaid.Service.Method',
+        packet_type=Meta.REQUEST,
+        packet_flags=Meta.PacketFlag.END,
+    )
+    message = ErrorMessage(code='code', message='m' * 100000)
+    payload = message.SerializeToString()
+
+    data = b''.join(
+        b''.join(parts)
+        for parts in Protocol.encode_chunks(meta, payload, 1000)
+    )
+    used_size, messages = Protocol.feed_data(data)
+    assert used_size == len(data)
+    # framing v2 lengths, larger than v1 allows
+    assert len(messages) == (len(payload) + 999) // 1000
+    for chunk_meta, chunk in messages[:-1]:
+        assert chunk_meta.transmission_id == 300
+        assert chunk_meta.packet_flags == Meta.PacketFlag.CHUNK
+        assert len(chunk) == 1000
+    assert messages[-1][0] == meta
+    assert b''.join(chunk for _, chunk in messages) == payload
+
+    # not chunked
+    parts, = Protocol.encode_chunks(meta, payload, len(payload))
+    _, messages = Protocol.feed_data(b''.join(parts))
+    assert messages[0][0] == meta
+    assert ErrorMessage.FromString(messages[0][1]) == message
+
+    with pytest.raises(PBError.PacketTooLarge):
+        Protocol.feed_data(Protocol.pack_header_v2(
+            Protocol.V2_MARK, 10, Protocol.MAX_CHUNK_LENGTH + 1,
+        ))
@@ -206,6 +206,11 @@ class ErrorTest(TestCase):
         self.assertEqual(ex.code, 'Unknown_Error2')
         self.assertEqual(ex.__class__.__name__, 'Unknown_Error2')
 
+        again = error.ErrorManager.assemble(
+            'Error2', 'cannot find defination', {}
+        )
+        self.assertIs(again.__class__, ex.__class__)
+
     def test_magic_args__message_(self):
         class Error1(error.Error):
             code = 'Error1'
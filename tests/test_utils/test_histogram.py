@@ -0,0 +1,36 @@
+import pytest
+
+from pymaid.utils.histogram import Histogram
+
+
+def test_histogram_observe():
+    histogram = Histogram([0.1, 1, 0.01])
+    assert histogram.bounds == (0.01, 0.1, 1)
+    assert histogram.percentile(99) == 0.0
+
+    for value in (0.005, 0.01, 0.05, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(5.565)
+    assert histogram.percentile(40) == 0.01
+    assert histogram.percentile(50) == 0.1
+    assert histogram.percentile(80) == 1
+    assert histogram.percentile(100) == float('inf')
+
+
+def test_histogram_merge():
+    h1, h2 = Histogram(), Histogram()
+    h1.observe(0.001)
+    h2.observe(0.001)
+    h2.observe(20)
+
+    merged = h1.copy()
+    merged.merge(h2)
+    assert merged.count == 3
+    assert merged.counts[-1] == 1
+    assert h1.count == 1
+    assert merged.to_dict()['counts'] == merged.counts
+
+    with pytest.raises(ValueError):
+        merged.merge(Histogram([1]))
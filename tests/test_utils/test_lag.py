@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from pymaid.core import sleep
+from pymaid.utils.lag import get_loop_lag_probe
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_probe():
+    probe = get_loop_lag_probe(0.01)
+    assert probe is get_loop_lag_probe()
+    # started explicitly
+    assert not probe.is_running
+    probe.start()
+    assert probe.is_running
+    samples = []
+    probe.callbacks.append(samples.append)
+
+    await sleep(0.03)
+    assert samples
+    assert max(samples) < 0.05
+    assert probe.histogram.count >= len(samples)
+    assert probe.percentile(50) < 0.05
+
+    # blocks the loop
+    del samples[:]
+    time.sleep(0.1)
+    await sleep(0.02)
+    assert max(samples) >= 0.05
+
+    probe.stop()
+    assert not probe.is_running
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_probe_window():
+    probe = get_loop_lag_probe(0.01)
+    probe.window = 0.05
+    probe.rotate_time = probe.loop.time() + probe.window
+    probe.start()
+
+    # blocks the loop
+    time.sleep(0.1)
+    await sleep(0.02)
+    assert probe.percentile(100) >= 0.05
+    # rotated out after two windows
+    await sleep(0.15)
+    assert probe.percentile(100) < 0.05
+    assert probe.histogram.count < 20
+
+    probe.stop()
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+import pymaid
+from pymaid.conf import settings
+from pymaid.utils.timeout import timeout
+from pymaid.utils.wheel import TimingWheel, get_timer, get_timing_wheel
+
+
+@pytest.mark.asyncio
+async def test_timing_wheel_cascade():
+    # 4 * 4 ticks covered, the others are rescheduled on the way
+    wheel = TimingWheel(1000, slots=4, levels=2)
+    fired = []
+    timers = {}
+    for delay in random.sample(range(1, 100), 50):
+        timers[delay] = wheel.call_at(
+            wheel.origin + delay * 1000, fired.append, delay,
+        )
+        # rounding error of loop time may cost one more tick
+        assert timers[delay].expires - delay in (0, 1)
+    assert len(wheel) == 50
+
+    # drive the wheel by hand
+    for tick in range(1, 101):
+        wheel._advance()
+        assert sorted(fired) == sorted(
+            delay for delay, timer in timers.items() if timer.expires == tick
+        )
+        del fired[:]
+    assert len(wheel) == 0
+    wheel.close()
+
+
+@pytest.mark.asyncio
+async def test_timing_wheel_cancel():
+    wheel = TimingWheel(0.01)
+    fired = []
+
+    def cancel_the_next():
+        fired.append(1)
+        timer.cancel()
+
+    wheel.call_later(0.02, cancel_the_next)
+    # cancelled by the former callback in the same bucket
+    timer = wheel.call_later(0.02, fired.append, 2)
+    far = wheel.call_later(1000, fired.append, 3)
+    assert len(wheel) == 3
+    far.cancel()
+    assert far.cancelled()
+    assert len(wheel) == 2
+
+    await pymaid.sleep(0.05)
+    assert fired == [1]
+    assert timer.cancelled()
+    assert len(wheel) == 0
+    # stop ticking once empty
+    assert wheel.handle is None
+
+    # not early after idle
+    times = []
+    wheel.call_later(0.02, lambda: times.append(wheel.loop.time()))
+    start = wheel.loop.time()
+    await pymaid.sleep(0.05)
+    assert times[0] - start >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_timing_wheel_backend(monkeypatch):
+    assert get_timer() is pymaid.get_running_loop()
+    monkeypatch.setattr(settings.pymaid, 'TIMING_WHEEL', True)
+    monkeypatch.setattr(settings.pymaid, 'TIMING_WHEEL_TICK', 0.005)
+    wheel = get_timer()
+    assert wheel is get_timing_wheel()
+    assert isinstance(wheel, TimingWheel)
+
+    with pytest.raises(pymaid.TimeoutError):
+        async with timeout(0.01) as t:
+            assert len(wheel) == 1
+            await pymaid.sleep(1)
+    assert t.expired
+
+    async with timeout(0.1):
+        await pymaid.sleep(0.01)
+    assert len(wheel) == 0